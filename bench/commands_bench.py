@@ -0,0 +1,239 @@
+"""Benchmark: editor commands over a synthetic portfolio.
+
+Generates a portfolio (see `portfolio_generator`), opens it in an editor
+window (offscreen), and times each scenario: a command, or a model function
+the command relies on, run `repeat` times. Results are written as JSON: the
+portfolio parameters and size, and the shortest, median and longest time of
+each scenario, in seconds.
+
+Given the results of an earlier run as a baseline, scenarios whose shortest
+time grew by more than the tolerance are reported, and the exit status is 1,
+so that regressions are caught as portfolios grow.
+
+Usage: python bench/commands_bench.py [--life-areas N] [--tasks-per-file N]
+       [--repeat N] [--output results.json] [--baseline results.json]
+       [--tolerance 0.25] [--scenario NAME ...]
+
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+from model.logic import Editor  # noqa: E402
+from model.prepare_todays_tasks import prepare_todays_tasks  # noqa: E402
+from portfolio_generator import (DEFAULTS, count_lines,  # noqa: E402
+                                 generate_portfolio)
+from view.top_level_window import TopLevelWindow  # noqa: E402
+
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.25
+
+
+class Bench:
+    """Editor window on a synthetic portfolio, and the scenarios timed.
+
+    Dialogs are replaced by functions returning fixed answers, and messages
+    are collected in `messages`.
+
+    """
+
+    def __init__(self, config_path, today):
+        self.today = today
+        self.messages = []
+        self.view = TopLevelWindow()
+        self.view.show_message = (
+            lambda message, *args, **kwargs: self.messages.append(message))
+        self.view.show_prepare_day_plan = (
+            lambda *args: (today.day, today.month, today.year))
+        self.view.show_log_progress = lambda: "Benchmark entry"
+        self.editor = Editor(self.view, config_path)
+        # Time the writes, not the wait for more saves to coalesce
+        self.editor.file_writer.delay = 0
+        self.settings = self.editor.settings
+        self.view.setup()
+        self.editor.setup()
+        self.editor.extract_auxiliaries()
+        self.editor.wait_for_saves()
+        self.done_tasks = iter(self.open_tasks())
+
+    def scenarios(self):
+        """Return `(name, prepare, run)` of each scenario.
+
+        `prepare` is called before each run, and not timed.
+
+        """
+
+        editor = self.editor
+        nothing = self.nothing
+        return [
+            ('prepare_todays_tasks', nothing, self.prepare_todays_tasks),
+            ('extract_auxiliaries', nothing, editor.extract_auxiliaries),
+            ('extract_daily', nothing, editor.extract_daily),
+            ('extract_booked', nothing, editor.extract_booked),
+            ('extract_periodic', nothing, editor.extract_periodic),
+            ('extract_shlist', nothing, editor.extract_shlist),
+            ('generate_ttl', self.focus_life_area, editor.generate_ttl),
+            ('generate_ttls', self.forget_ttls, editor.generate_ttls),
+            ('mark_done_at_origin', nothing, self.mark_done_at_origin),
+            ('analyse_tasks', self.focus_daily_tasks, editor.analyse_tasks),
+            ('schedule_tasks', self.forget_schedule, editor.schedule_tasks),
+            ('schedule_tasks_after_edit', self.edit_last_task,
+             editor.schedule_tasks),
+            ('log_progress', nothing, editor.log_progress),
+        ]
+
+    def time(self, prepare, run, repeat):
+        """Return the time each of `repeat` runs took, in seconds."""
+
+        times = []
+        for _ in range(repeat):
+            prepare()
+            self.editor.wait_for_saves()
+            start = time.perf_counter()
+            run()
+            # Files saved in the background are part of the command
+            self.editor.wait_for_saves()
+            times.append(time.perf_counter() - start)
+        return times
+
+    # Scenarios
+
+    def nothing(self):
+        pass
+
+    def prepare_todays_tasks(self):
+        prepare_todays_tasks(self.today.day, self.today.month,
+                             self.today.year, self.settings,
+                             self.editor.tokenizer)
+
+    def focus_life_area(self):
+        path = self.settings.portfolio_files[0]
+        self.view.tabs.setCurrentWidget(self.editor.find_widget(path))
+        self.editor.portfolio_file_changed(path)
+
+    def forget_ttls(self):
+        for path in self.settings.portfolio_files:
+            self.editor.portfolio_file_changed(path)
+
+    def open_tasks(self):
+        """Return the open tasks of life areas without a due date."""
+
+        tokenizer = self.editor.tokenizer
+        tasks = []
+        for path in self.settings.portfolio_files:
+            with open(path, encoding=self.editor.encoding) as file_:
+                for task in tokenizer.parse_lines(file_.read()):
+                    if tokenizer.is_active(task) and task.due is None:
+                        tasks.append(task)
+        return tasks
+
+    def mark_done_at_origin(self):
+        self.editor.mark_done_at_origin(next(self.done_tasks))
+
+    def focus_daily_tasks(self):
+        settings = self.settings
+        path = os.path.join(
+            settings.portfolio_base_dir,
+            self.today.strftime('%Y%m%d') + settings.atlas_files_extension)
+        self.view.tabs.setCurrentWidget(self.editor.find_widget(path))
+        return self.view.current_tab
+
+    def forget_schedule(self):
+        self.focus_daily_tasks().schedule = None
+
+    def edit_last_task(self):
+        tab = self.focus_daily_tasks()
+        tokenizer = self.editor.tokenizer
+        for row in range(tab.lines() - 1, -1, -1):
+            task = tokenizer.parse(tab.line(row))
+            if tokenizer.is_active(task):
+                tab.replace_line(row, task.line.replace(
+                    self.settings.dur_prop,
+                    self.settings.dur_prop + '1', 1))
+                return
+
+
+def compare(results, baseline, tolerance):
+    """Return the scenarios slower than in `baseline`, with both times."""
+
+    slower = []
+    for name, result in results['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if before and result['min'] > before['min'] * (1 + tolerance):
+            slower.append((name, before['min'], result['min']))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time editor commands over a synthetic portfolio.")
+    for name, default in DEFAULTS.items():
+        parser.add_argument('--' + name.replace('_', '-'),
+                            type=type(default), default=default)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--output', help="JSON file (standard output)")
+    parser.add_argument('--baseline', help="JSON results to compare with")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--scenario', nargs='*',
+                        help="Scenarios to run (all)")
+    arguments = parser.parse_args()
+    parameters = {name: getattr(arguments, name) for name in DEFAULTS}
+    today = datetime.date.today()
+    app = QApplication(sys.argv[:1])
+    directory = tempfile.mkdtemp(prefix='atlas-bench-')
+    try:
+        config_path = generate_portfolio(directory, today, **parameters)
+        results = {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'parameters': parameters,
+            'portfolio_lines': count_lines(directory),
+            'repeat': arguments.repeat,
+            'scenarios': {},
+        }
+        bench = Bench(config_path, today)
+        for name, prepare, run in bench.scenarios():
+            if arguments.scenario and name not in arguments.scenario:
+                continue
+            times = bench.time(prepare, run, arguments.repeat)
+            results['scenarios'][name] = {
+                'min': min(times),
+                'median': statistics.median(times),
+                'max': max(times),
+            }
+            print(f"{name:28} {min(times) * 1000:10.1f} ms", file=sys.stderr)
+        results['messages'] = bench.messages
+    finally:
+        shutil.rmtree(directory)
+    del app
+    text = json.dumps(results, indent=2)
+    if arguments.output:
+        with open(arguments.output, 'w') as file_:
+            file_.write(text + '\n')
+    else:
+        print(text)
+    if arguments.baseline:
+        with open(arguments.baseline) as file_:
+            slower = compare(results, json.load(file_), arguments.tolerance)
+        for name, before, after in slower:
+            print(f"Slower: {name} {before * 1000:.1f} ms -> "
+                  f"{after * 1000:.1f} ms", file=sys.stderr)
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
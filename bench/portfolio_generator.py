@@ -0,0 +1,235 @@
+"""Synthetic portfolio generator.
+
+Writes a portfolio directory of the given size: life area files, an empty
+set of auxiliary files, a progress log, today's daily tasks file, and a
+daily files archive, with a configuration file pointing to them, made from
+the test configuration file.
+
+Usage: python bench/portfolio_generator.py directory [life_areas]
+       [tasks_per_file]
+
+"""
+
+import datetime
+import os
+import random
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'src'))
+
+from model.progress_log import format_entry  # noqa: E402
+from model.settings import read_config, Settings  # noqa: E402
+
+CONFIG_FILE = os.path.join(
+    HERE, '..', 'test', 'config_parser', 'config_file.ini')
+CONFIG_NAME = 'config.ini'
+# Size of the portfolio, and share of life area tasks of each kind
+DEFAULTS = {
+    'life_areas': 14,
+    'tasks_per_file': 500,
+    'due_ratio': 0.2,
+    'rec_ratio': 0.15,
+    'daily_ratio': 0.03,
+    'shlist_ratio': 0.05,
+    'ttl_ratio': 0.1,
+    'done_ratio': 0.2,
+    'day_tasks': 100,
+    'log_entries': 1000,
+    'archive_days': 365,
+    'seed': 0,
+}
+WORDS = ("call write review fix buy clean plan read pay book renew order "
+         "check send prepare update cancel visit backup sort").split()
+
+
+def generate_portfolio(directory, today, **parameters):
+    """Write a synthetic portfolio to `directory`.
+
+    Parameters
+    ----------
+    directory : str
+        Directory to write to, created if needed.
+    today : datetime.date
+        Day of the daily tasks file, and of the last log entry.
+    parameters
+        Any of `DEFAULTS`.
+
+    Returns
+    -------
+    str
+        Path of the configuration file.
+
+    """
+
+    parameters = dict(DEFAULTS, **parameters)
+    rnd = random.Random(parameters['seed'])
+    base = os.path.join(os.path.abspath(directory), '')
+    for sub_directory in ('auxiliaries', 'log', 'archive', 'backup'):
+        os.makedirs(base + sub_directory, exist_ok=True)
+    config = read_config(CONFIG_FILE)
+    user = config['USER']
+    user['portfolio_base_dir'] = base
+    user['backup_dir'] = base + 'backup/'
+    user['daily_files_archive_dir'] = base + 'archive/'
+    settings = Settings(user)
+    tags = [token for token in settings.tokens_in_sorting_order
+            if token.startswith(settings.tag_prefix)]
+    paths = []
+    for number in range(parameters['life_areas']):
+        tag = tags[number % len(tags)]
+        name = tag[1:] + (str(number // len(tags)) if number >= len(tags)
+                          else '')
+        paths.append(base + name + settings.atlas_files_extension)
+        write(paths[-1], life_area(rnd, settings, tag, today, parameters))
+    user['portfolio_files'] = '\n'.join(paths)
+    user['tab_order'] = '\n'.join(
+        paths + ['${portfolio_log_file}', '${booked_file}', '${daily_file}',
+                 '${periodic_file}', '${shlist_file}'])
+    settings = Settings(user)
+    for path in (settings.daily_file, settings.booked_file,
+                 settings.periodic_file, settings.shlist_file,
+                 settings.today_file, settings.earned_times_file):
+        write(path, '')
+    write(settings.portfolio_log_file,
+          log(rnd, settings, today, parameters['log_entries']))
+    daily_name = today.strftime('%Y%m%d') + settings.atlas_files_extension
+    write(base + daily_name,
+          daily_tasks(rnd, settings, today, parameters['day_tasks']))
+    for days_ago in range(1, parameters['archive_days'] + 1):
+        day = today - datetime.timedelta(days=days_ago)
+        write(base + 'archive/' + day.strftime('%Y%m%d')
+              + settings.atlas_files_extension,
+              daily_tasks(rnd, settings, day, rnd.randint(5, 30)))
+    config_path = base + CONFIG_NAME
+    with open(config_path, 'w', encoding='UTF-8') as file_:
+        config.write(file_)
+    return config_path
+
+
+def life_area(rnd, settings, tag, today, parameters):
+    """Return the text of a life area file."""
+
+    heading = settings.heading_prefix + settings.space
+    lines = [heading + settings.ttl_heading, '',
+             heading + settings.incoming_heading, '',
+             heading + "Tasks"]
+    for number in range(parameters['tasks_per_file']):
+        lines.append(task(rnd, settings, tag, number, today, parameters))
+    return '\n'.join(lines) + '\n'
+
+
+def task(rnd, settings, tag, number, today, parameters):
+    """Return a life area task, of a random kind."""
+
+    prefix = settings.open_task_prefix
+    if rnd.random() < parameters['ttl_ratio']:
+        prefix = settings.top_task_prefix
+    words = [prefix, rnd.choice(WORDS).capitalize(), rnd.choice(WORDS),
+             '{}{}'.format(tag[1:], number),
+             '{}{}'.format(settings.dur_prop, rnd.randint(1, 12) * 5)]
+    kind = rnd.random()
+    for ratio, name in ((parameters['due_ratio'], 'due'),
+                        (parameters['rec_ratio'], 'rec'),
+                        (parameters['daily_ratio'], 'daily'),
+                        (parameters['shlist_ratio'], 'shlist')):
+        if kind < ratio:
+            break
+        kind -= ratio
+    else:
+        name = None
+    due = today + datetime.timedelta(days=rnd.randint(-30, 90))
+    if name in ('due', 'rec'):
+        words.append(settings.due_prop + due.isoformat())
+    if name == 'rec':
+        words.append('{}{}{}'.format(settings.rec_prop, rnd.randint(1, 6),
+                                     rnd.choice('dwmy')))
+    elif name == 'daily':
+        words.append(settings.daily_rec_prop_val)
+    elif name == 'shlist':
+        words.append(settings.shlist_cat)
+    words.append(tag)
+    if rnd.random() < 0.2:
+        words.append(settings.work_tag)
+    line = settings.space.join(words)
+    if name is None and rnd.random() < parameters['done_ratio']:
+        line = (settings.done_task_prefix + settings.space
+                + (today - datetime.timedelta(days=rnd.randint(1, 365)))
+                .isoformat() + settings.space + line)
+    return line
+
+
+def daily_tasks(rnd, settings, day, number_of_tasks):
+    """Return the text of the daily tasks file of `day`."""
+
+    heading = settings.heading_prefix + settings.space
+    proposed = [heading + "{} for {}".format(
+        settings.tasks_proposed_heading, day.isoformat())]
+    done = [heading + "{} on {}".format(settings.tasks_done_heading,
+                                        day.isoformat())]
+    for number in range(number_of_tasks):
+        line = settings.space.join((
+            rnd.choice((settings.open_task_prefix, settings.top_task_prefix)),
+            rnd.choice(WORDS).capitalize(), rnd.choice(WORDS), str(number),
+            '{}{}'.format(settings.dur_prop, rnd.randint(1, 12) * 5),
+            rnd.choice((settings.work_tag, '+home'))))
+        kind = rnd.random()
+        if kind < 0.3:
+            done.append(settings.space.join(
+                (settings.done_task_prefix, day.isoformat(), line)))
+        elif kind < 0.4:
+            done.append(settings.space.join(
+                (settings.for_rescheduling_task_prefix, day.isoformat(),
+                 line)))
+        else:
+            proposed.append(line)
+    return '\n'.join(proposed + done) + '\n'
+
+
+def log(rnd, settings, today, number_of_entries):
+    """Return the text of a log, newest entry first, up to `today`."""
+
+    lines = []
+    stamp = datetime.datetime.combine(today, datetime.time(8))
+    for _ in range(number_of_entries):
+        previous = stamp - datetime.timedelta(hours=rnd.randint(1, 24))
+        lines.extend(format_entry(
+            stamp, previous,
+            settings.space.join(rnd.choice(WORDS) for _ in range(8)),
+            settings))
+        stamp = previous
+    return '\n'.join(lines) + '\n'
+
+
+def write(path, text):
+    with open(path, 'w', encoding='UTF-8') as file_:
+        file_.write(text)
+
+
+def count_lines(directory):
+    """Return the number of lines of the files under `directory`."""
+
+    lines = 0
+    for dir_path, _, file_names in os.walk(directory):
+        for file_name in file_names:
+            if file_name != CONFIG_NAME:
+                with open(os.path.join(dir_path, file_name), 'rb') as file_:
+                    lines += sum(1 for _ in file_)
+    return lines
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    parameters = {}
+    if len(sys.argv) > 2:
+        parameters['life_areas'] = int(sys.argv[2])
+    if len(sys.argv) > 3:
+        parameters['tasks_per_file'] = int(sys.argv[3])
+    config_path = generate_portfolio(sys.argv[1], datetime.date.today(),
+                                     **parameters)
+    print(f"{config_path}: {count_lines(sys.argv[1])} lines")
+
+
+if __name__ == '__main__':
+    main()
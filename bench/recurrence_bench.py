@@ -0,0 +1,97 @@
+"""Benchmark: projecting tasks over a horizon vs a per-day, per-task check.
+
+The per-day check is what preparing a day plan for every day of the horizon
+amounts to: advance each task's due date, one period at a time, and compare it
+with the day.
+
+Usage: python bench/recurrence_bench.py [number_of_tasks] [days]
+
+"""
+
+import datetime
+import os
+import random
+import sys
+import time
+from dateutil.relativedelta import relativedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'src'))
+
+from model.recurrence import Projection  # noqa: E402
+from model.settings import load_settings  # noqa: E402
+from model.tokenizer import Tokenizer  # noqa: E402
+
+CONFIG_FILE = os.path.join(
+    HERE, '..', 'test', 'config_parser', 'config_file.ini')
+DEFAULT_NUMBER_OF_TASKS = 2000
+DEFAULT_DAYS = 365
+START = datetime.date(2020, 1, 1)
+
+
+def periodic_tasks(number_of_tasks, seed=0):
+    """Return random periodic and booked tasks, due from `START`."""
+
+    rnd = random.Random(seed)
+    tasks = []
+    for n in range(number_of_tasks):
+        due = START + datetime.timedelta(days=rnd.randint(0, 60))
+        task = "- Task {} due:{:%Y-%m-%d} dur:{} +home".format(
+            n, due, rnd.randint(5, 60))
+        if rnd.random() < 0.8:
+            task += " rec:{}{}".format(rnd.randint(2, 14), rnd.choice('dmy'))
+        tasks.append(task)
+    return tasks
+
+
+def per_day_minutes(tasks, days, tokenizer):
+    """Planned minutes per day, one date computation at a time."""
+
+    minutes = [0] * days
+    for task in map(tokenizer.parse, tasks):
+        due = task.due_date
+        while True:
+            offset = (due - START).days
+            if offset >= days:
+                break
+            minutes[offset] += task.duration or 0
+            if task.rec is None:
+                break
+            count, period, _ = task.rec
+            if period == 'm':
+                due += relativedelta(months=count)
+            elif period == 'y':
+                due += relativedelta(years=count)
+            else:
+                due += relativedelta(days=count)
+    return minutes
+
+
+def main():
+    number_of_tasks = (int(sys.argv[1]) if len(sys.argv) > 1
+                       else DEFAULT_NUMBER_OF_TASKS)
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_DAYS
+    settings = load_settings(CONFIG_FILE)
+    tokenizer = Tokenizer(settings)
+    tasks = periodic_tasks(number_of_tasks)
+    tokenizer.parse_lines('\n'.join(tasks))
+
+    start = time.perf_counter()
+    legacy = per_day_minutes(tasks, days, tokenizer)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    projection = Projection(tasks, START, days, settings, tokenizer)
+    new = projection.minutes_per_day()
+    new_time = time.perf_counter() - start
+
+    # Month steps are taken from the first due date here, not one at a time
+    print(f"{number_of_tasks} tasks x {days} days: "
+          f"per task and day {legacy_time * 1000:8.1f} ms, "
+          f"projection {new_time * 1000:8.1f} ms "
+          f"({legacy_time / new_time:.0f}x); "
+          f"{sum(legacy)} vs {int(new.sum())} planned minutes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Micro-benchmark: live ConfigParser lookups vs compiled settings.
+
+Runs the per-line checks done by the extract and analyse commands over a
+synthetic portfolio, once looking options up in the live configuration section
+(as the editor used to do) and once using `model.settings.Settings`.
+
+Usage: python bench/settings_bench.py [config_file] [number_of_lines]
+
+"""
+
+import os
+import random
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'src'))
+
+from model.settings import read_config, Settings  # noqa: E402
+
+DEFAULT_CONFIG_FILE = os.path.join(
+    HERE, '..', 'test', 'config_parser', 'config_file.ini')
+DEFAULT_NUMBER_OF_LINES = 50000
+
+
+def synthetic_lines(number_of_lines, seed=0):
+    """Return a list of portfolio-like lines."""
+
+    rnd = random.Random(seed)
+    templates = (
+        "- Task {n} dur:{d} +home",
+        "t Top task {n} dur:{d} +work",
+        "- Daily {n} rec:1d dur:{d} +home",
+        "- Booked {n} due:2020-01-{day:02} dur:{d} +car",
+        "- Periodic {n} due:2020-01-{day:02} rec:2w dur:{d} +home",
+        "- Shopping {n} dur:{d} +home @shlist",
+        "x 2020-01-01 - Done {n} dur:{d} +home",
+        "10:30 - Scheduled {n} dur:{d} +work",
+        "# Heading {n}",
+        "",
+    )
+    return [rnd.choice(templates).format(n=n, d=rnd.randint(5, 90),
+                                         day=rnd.randint(1, 28))
+            for n in range(number_of_lines)]
+
+
+def per_line_live(cfg, lines):
+    """Per-line checks, looking options up in the live section."""
+
+    count = 0
+    for line in lines:
+        if not line:
+            continue
+        if cfg['path_probe'] in cfg['portfolio_files'].split('\n'):
+            count += 1
+        line = line.replace(cfg['space'][1], cfg['space'][1])
+        if (cfg['daily_rec_prop_val'] in line
+                and line[0] in cfg['active_task_prefixes'].split('\n')):
+            count += 1
+        for word in line.split(cfg['space'][1]):
+            if (len(word) == 1
+                    and word[0] in cfg['active_task_prefixes'].split('\n')):
+                count += 1
+            elif word[:1] in cfg['reserved_word_prefixes'].split('\n'):
+                count += 1
+    return count
+
+
+def per_line_compiled(settings, path_probe, lines):
+    """Per-line checks, using compiled settings."""
+
+    count = 0
+    for line in lines:
+        if not line:
+            continue
+        if settings.is_portfolio_file(path_probe):
+            count += 1
+        line = line.replace(settings.space, settings.space)
+        if (settings.daily_rec_prop_val in line
+                and line[0] in settings.active_task_prefixes):
+            count += 1
+        for word in line.split(settings.space):
+            if len(word) == 1 and word[0] in settings.active_task_prefixes:
+                count += 1
+            elif word[:1] in settings.reserved_word_prefixes:
+                count += 1
+    return count
+
+
+def main():
+    config_file = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CONFIG_FILE
+    number_of_lines = (int(sys.argv[2]) if len(sys.argv) > 2
+                       else DEFAULT_NUMBER_OF_LINES)
+    config = read_config(config_file)
+    cfg = config['USER']
+    settings = Settings(cfg)
+    path_probe = settings.portfolio_files[-1]
+    config.set('USER', 'path_probe', path_probe)
+    lines = synthetic_lines(number_of_lines)
+    assert (per_line_live(cfg, lines)
+            == per_line_compiled(settings, path_probe, lines))
+    live = min(timeit.repeat(lambda: per_line_live(cfg, lines),
+                             number=1, repeat=3))
+    compiled = min(timeit.repeat(
+        lambda: per_line_compiled(settings, path_probe, lines),
+        number=1, repeat=3))
+    print(f"lines:              {number_of_lines}")
+    print(f"live ConfigParser:  {live:8.3f} s "
+          f"({live / number_of_lines * 1e6:7.2f} us/line)")
+    print(f"compiled Settings:  {compiled:8.3f} s "
+          f"({compiled / number_of_lines * 1e6:7.2f} us/line)")
+    print(f"speed-up:           {live / compiled:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
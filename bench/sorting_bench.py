@@ -0,0 +1,98 @@
+"""Benchmark: token-priority sort vs the previous nested-loop sort.
+
+The previous implementation looped over tokens x tasks and checked membership
+in a growing result list, which is quadratic to cubic in the number of tasks,
+so it is only run up to `legacy_max` tasks.
+
+Usage: python bench/sorting_bench.py [number_of_tasks] [legacy_max]
+
+"""
+
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'src'))
+
+from model.settings import load_settings  # noqa: E402
+from model.sorting import sort_tasks  # noqa: E402
+from model.tokenizer import Tokenizer  # noqa: E402
+
+CONFIG_FILE = os.path.join(
+    HERE, '..', 'test', 'config_parser', 'config_file.ini')
+DEFAULT_NUMBER_OF_TASKS = 100000
+DEFAULT_LEGACY_MAX = 20000
+
+
+def legacy_sort_tasks(tasks, tokens_in_sorting_order, cat_prefix):
+    """The sort previously used by `prepare_todays_tasks`."""
+
+    sorted_tasks = []
+    for token in tokens_in_sorting_order:
+        for task in tasks:
+            if (cat_prefix in token
+                    and token in task
+                    and task not in sorted_tasks):
+                sorted_tasks.append(task)
+            elif (token in task
+                    and task not in sorted_tasks
+                    and cat_prefix not in task):
+                sorted_tasks.append(task)
+    return sorted_tasks
+
+
+def candidate_tasks(settings, number_of_tasks, seed=0):
+    """Return unique, randomly tagged candidate tasks."""
+
+    rnd = random.Random(seed)
+    tags = [token for token in settings.tokens_in_sorting_order
+            if token.startswith(settings.tag_prefix)]
+    cats = [token for token in settings.tokens_in_sorting_order
+            if token.startswith(settings.cat_prefix)]
+    tasks = []
+    for n in range(number_of_tasks):
+        task = "- Task {} dur:{} {}".format(
+            n, rnd.randint(5, 120), rnd.choice(tags))
+        if rnd.random() < 0.2:
+            task += " " + rnd.choice(cats)
+        if rnd.random() < 0.1:
+            task += " due:2020-01-{:02}".format(rnd.randint(1, 28))
+        tasks.append(task)
+    return tasks
+
+
+def timed(function, *args):
+    """Return (result, seconds) of calling `function(*args)`."""
+
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    number_of_tasks = (int(sys.argv[1]) if len(sys.argv) > 1
+                       else DEFAULT_NUMBER_OF_TASKS)
+    legacy_max = (int(sys.argv[2]) if len(sys.argv) > 2
+                  else DEFAULT_LEGACY_MAX)
+    settings = load_settings(CONFIG_FILE)
+    tasks = candidate_tasks(settings, number_of_tasks)
+
+    # Same set of tasks is kept, only the order within a token may differ
+    sample = tasks[:min(legacy_max, number_of_tasks)]
+    legacy, legacy_time = timed(
+        legacy_sort_tasks, sample, settings.tokens_in_sorting_order,
+        settings.cat_prefix)
+    new, new_time = timed(sort_tasks, sample, settings, Tokenizer(settings))
+    assert sorted(legacy) == sorted(new)
+    print(f"{len(sample):>7} tasks: legacy {legacy_time:8.3f} s, "
+          f"new {new_time:8.3f} s ({legacy_time / new_time:.0f}x)")
+
+    _, new_time = timed(sort_tasks, tasks, settings, Tokenizer(settings))
+    print(f"{number_of_tasks:>7} tasks: new {new_time:8.3f} s "
+          f"(legacy not run above {legacy_max} tasks)")
+
+
+if __name__ == '__main__':
+    main()
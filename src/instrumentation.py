@@ -0,0 +1,357 @@
+"""Measure how long Atlas commands take.
+
+Set the `ATLAS_INSTRUMENT` environment variable to time every command run
+from the menus (or their shortcuts)::
+
+    ATLAS_INSTRUMENT=1 python main.py portfolio.ini
+
+For each command, the wall time of each run is kept in a latency histogram,
+with the time spent in the editor buffers (reading or changing the text of a
+tab) and in disk I/O (opening, reading and writing files). Only the time of
+the GUI thread is counted: files saved in the background are not. The report
+(see `CommandInstrumentation.format_report()`) is shown by the "Other >
+Performance" command, and when Atlas quits it is written to standard error
+(or appended to the file named by the variable, if it is not `1`).
+
+Without the variable, commands are still timed, as it takes next to nothing,
+but buffer and disk I/O times are not measured (the hooks measuring them are
+not installed), and no report is written when Atlas quits.
+
+Each command run is also logged, as a JSON object (`command`, and times in
+ms: `total`, `buffer` and `disk`), by the `atlas.commands` logger.
+
+"""
+
+import bisect
+import builtins
+import functools
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+
+ENVIRONMENT_VARIABLE = 'ATLAS_INSTRUMENT'
+# Upper bounds of the histogram buckets, in ms; the last bucket has none
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+# Commands taking longer are reported as over the budget, in ms
+INTERACTIVE_BUDGET = 100
+# Methods of buffer classes timed as buffer reads and writes
+BUFFER_METHODS = ('text', 'setText', 'line', 'replace_line',
+                  'insert_line_after', 'delete_line', 'swap_lines',
+                  'append_line', 'replace_lines', 'set_lines', 'reload')
+BUFFER, DISK = 'buffer', 'disk'
+COMMAND_LOGGER = logging.getLogger('atlas.commands')
+
+
+class _TimedFile:
+    """File object wrapper timing I/O (see `CommandInstrumentation`)."""
+
+    def __init__(self, file_, instrumentation):
+        self._file = file_
+        self._instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._instrumentation.timed(DISK, self._file.__exit__,
+                                           *exc_info)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._instrumentation.timed(DISK, next, self._file)
+
+    def read(self, *args):
+        return self._instrumentation.timed(DISK, self._file.read, *args)
+
+    def readline(self, *args):
+        return self._instrumentation.timed(DISK, self._file.readline, *args)
+
+    def readlines(self, *args):
+        return self._instrumentation.timed(DISK, self._file.readlines,
+                                           *args)
+
+    def write(self, text):
+        return self._instrumentation.timed(DISK, self._file.write, text)
+
+    def writelines(self, lines):
+        return self._instrumentation.timed(DISK, self._file.writelines,
+                                           lines)
+
+    def close(self):
+        return self._instrumentation.timed(DISK, self._file.close)
+
+
+class CommandStatistics:
+    """Latencies of the runs of a command.
+
+    Attributes
+    ----------
+    histogram : list of int
+        Number of runs in each bucket of `BUCKETS`, and over the last bound.
+    runs : int
+        Number of runs.
+    total, longest : float
+        Total and longest wall time, in seconds.
+    times : dict
+        Total time spent in `BUFFER` and `DISK` operations, in seconds.
+
+    """
+
+    def __init__(self):
+        self.histogram = [0] * (len(BUCKETS) + 1)
+        self.runs = 0
+        self.total = 0.0
+        self.longest = 0.0
+        self.times = {BUFFER: 0.0, DISK: 0.0}
+
+    def add(self, seconds, times):
+        """Add a run of `seconds`, with the time of its operations."""
+
+        self.histogram[bisect.bisect_left(BUCKETS, seconds * 1000)] += 1
+        self.runs += 1
+        self.total += seconds
+        self.longest = max(self.longest, seconds)
+        for category, value in times.items():
+            self.times[category] += value
+
+    @property
+    def over_budget(self):
+        """Number of runs longer than `INTERACTIVE_BUDGET`."""
+
+        return sum(self.histogram[
+            bisect.bisect_left(BUCKETS, INTERACTIVE_BUDGET) + 1:])
+
+
+class CommandInstrumentation:
+    """Latency statistics of commands.
+
+    Attributes
+    ----------
+    commands : dict
+        `CommandStatistics` of each command run, by name.
+
+    """
+
+    def __init__(self, report_path=None):
+        self.report_path = report_path
+        self.commands = {}
+        # Time spent in each category by the command running, if any
+        self._times = None
+        self._busy = False
+        self._thread = threading.get_ident()
+        self._open = None
+        self._buffer_methods = []
+
+    @classmethod
+    def from_environment(cls):
+        """Return an installed instrumentation if requested, otherwise None.
+
+        Its hooks are installed on the thread calling this, the GUI thread.
+
+        """
+
+        value = os.environ.get(ENVIRONMENT_VARIABLE)
+        if not value:
+            return None
+        instrumentation = cls(None if value == '1' else value)
+        instrumentation.install()
+        return instrumentation
+
+    # Hooks (`open()` and buffer methods replaced by timing wrappers)
+
+    @property
+    def hooked(self):
+        """Whether buffer and disk I/O times are measured."""
+
+        return self._open is not None
+
+    def install(self, buffer_classes=()):
+        """Start timing disk I/O, and the buffer methods of `buffer_classes`.
+
+        Classes may be added by calling again.
+
+        """
+
+        if self._open is None:
+            self._open = builtins.open
+            builtins.open = self._timed_open
+        for class_ in buffer_classes:
+            for name in BUFFER_METHODS:
+                method = getattr(class_, name, None)
+                if method is None:
+                    continue
+                self._buffer_methods.append(
+                    (class_, name, class_.__dict__.get(name)))
+                setattr(class_, name, self._timed_method(method))
+
+    def uninstall(self):
+        """Stop timing disk I/O and buffer methods."""
+
+        if self._open is not None:
+            builtins.open = self._open
+            self._open = None
+        for class_, name, method in reversed(self._buffer_methods):
+            if method is None:
+                delattr(class_, name)
+            else:
+                setattr(class_, name, method)
+        self._buffer_methods = []
+
+    def _timed_open(self, *args, **kwargs):
+        if self._times is None or threading.get_ident() != self._thread:
+            return self._open(*args, **kwargs)
+        return _TimedFile(self.timed(DISK, self._open, *args, **kwargs),
+                          self)
+
+    def _timed_method(self, method):
+        instrumentation = self
+
+        @functools.wraps(method)
+        def timed_method(*args, **kwargs):
+            return instrumentation.timed(BUFFER, method, *args, **kwargs)
+
+        return timed_method
+
+    # Measures
+
+    def timed(self, category, function, *args, **kwargs):
+        """Call `function`, adding its time to `category` if measuring.
+
+        Only the time of the outermost operation is counted, as operations
+        may call others (such as a buffer method reading lines).
+
+        """
+
+        if (self._times is None or self._busy
+                or threading.get_ident() != self._thread):
+            return function(*args, **kwargs)
+        self._busy = True
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self._times[category] += time.perf_counter() - start
+            self._busy = False
+
+    def wrap(self, name, function):
+        """Return `function`, timed as command `name`.
+
+        Arguments not taken by `function` (the `checked` argument of
+        `QAction.triggered`) are dropped, as PyQt does for slots.
+
+        """
+
+        try:
+            parameters = inspect.signature(function).parameters.values()
+        except ValueError:
+            # No signature (some built-in functions): pass all arguments
+            parameters = [inspect.Parameter('args',
+                                            inspect.Parameter.VAR_POSITIONAL)]
+        if any(parameter.kind == parameter.VAR_POSITIONAL
+               for parameter in parameters):
+            count = None
+        else:
+            count = sum(1 for parameter in parameters
+                        if parameter.kind in (parameter.POSITIONAL_ONLY,
+                                              parameter.POSITIONAL_OR_KEYWORD))
+        instrumentation = self
+
+        @functools.wraps(function)
+        def command(*args):
+            return instrumentation.run(name, function, *args[:count])
+
+        return command
+
+    def wrap_actions(self, actions):
+        """Return `actions` (functions by name), each timed as a command."""
+
+        return {name: self.wrap(name, function)
+                for name, function in actions.items()}
+
+    def run(self, name, function, *args):
+        """Call `function`, recording and logging its latency as `name`.
+
+        A command run by another (such as `generate_ttls()` by
+        `prepare_day_plan()`) is part of it, and not recorded apart.
+
+        """
+
+        if self._times is not None:
+            return function(*args)
+        self._times = {BUFFER: 0.0, DISK: 0.0}
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            times, self._times = self._times, None
+            self.commands.setdefault(name, CommandStatistics()).add(
+                elapsed, times)
+            COMMAND_LOGGER.info(json.dumps({
+                'command': name,
+                'total': round(elapsed * 1000, 3),
+                BUFFER: round(times[BUFFER] * 1000, 3),
+                DISK: round(times[DISK] * 1000, 3),
+            }))
+
+    # Report
+
+    def format_report(self):
+        """Return the report, as text."""
+
+        lines = ["Atlas command latency (ms; budget {} ms)".format(
+                     INTERACTIVE_BUDGET), ""]
+        if not self.hooked:
+            lines.extend(["Buffer and disk I/O times are only measured with "
+                          "{} set.".format(ENVIRONMENT_VARIABLE), ""])
+        if not self.commands:
+            lines.append("No command run yet.")
+            return '\n'.join(lines) + '\n'
+        lines.append("{:28} {:>5} {:>5} {:>8} {:>8} {:>8} {:>8}".format(
+            "Command", "Runs", "Over", "Mean", "Max", "Buffer", "Disk"))
+        by_total = sorted(self.commands.items(),
+                          key=lambda item: item[1].total, reverse=True)
+        for name, command in by_total:
+            lines.append(
+                "{:28} {:5} {:5} {:8.1f} {:8.1f} {:8.1f} {:8.1f}".format(
+                    name, command.runs, command.over_budget,
+                    command.total / command.runs * 1000,
+                    command.longest * 1000,
+                    command.times[BUFFER] / command.runs * 1000,
+                    command.times[DISK] / command.runs * 1000))
+        lines.append("")
+        lines.append("Histograms (runs up to each bound, in ms):")
+        bounds = ['<={}'.format(bound) for bound in BUCKETS]
+        bounds.append('>{}'.format(BUCKETS[-1]))
+        for name, command in by_total:
+            buckets = ['{}:{}'.format(bound, runs)
+                       for bound, runs in zip(bounds, command.histogram)
+                       if runs]
+            lines.append("  {:26} {}".format(name, ' '.join(buckets)))
+        return '\n'.join(lines) + '\n'
+
+    def report(self):
+        """Write the report to standard error or `report_path`.
+
+        Nothing is written unless the hooks are installed (see
+        `from_environment()`).
+
+        """
+
+        if not self.hooked:
+            return
+        if self.report_path:
+            with open(self.report_path, 'a') as report_file:
+                report_file.write(self.format_report())
+        else:
+            sys.stderr.write(self.format_report())
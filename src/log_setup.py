@@ -0,0 +1,63 @@
+"""Write the Atlas log in the background, to a bounded set of files.
+
+Log records are put in a queue by the thread logging them (the GUI thread,
+mostly), and written by a listener thread (see `start_logging()`), so that
+logging never waits for the disk. The log file is rotated once it reaches
+`MAX_BYTES`, and `BACKUP_COUNT` older files are kept (`atlas.log.1`, ...).
+
+The log is written next to the configuration file, or to the file named by
+the `ATLAS_LOG_FILE` environment variable::
+
+    ATLAS_LOG_FILE=/tmp/atlas.log python main.py portfolio.ini
+
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+
+ENVIRONMENT_VARIABLE = 'ATLAS_LOG_FILE'
+LOG_FILE_NAME = 'atlas.log'
+MAX_BYTES = 1 << 20
+BACKUP_COUNT = 5
+FORMAT = '%(asctime)s:%(name)s:%(levelname)s:%(message)s'
+
+
+def log_file_path(config_path):
+    """Return the path of the log of the portfolio of `config_path`."""
+
+    path = os.environ.get(ENVIRONMENT_VARIABLE)
+    if path:
+        return path
+    return os.path.join(os.path.dirname(os.path.abspath(config_path)),
+                        LOG_FILE_NAME)
+
+
+def start_logging(path, level=logging.DEBUG):
+    """Send the records of the root logger to a rotating log file `path`.
+
+    Records are written by a listener thread, stopped (once the records
+    queued are written) when the interpreter exits.
+
+    Returns
+    -------
+    logging.handlers.QueueListener
+        The listener thread.
+
+    """
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding='UTF-8',
+        delay=True)
+    file_handler.setFormatter(logging.Formatter(FORMAT))
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, file_handler)
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.setLevel(level)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -1,21 +1,35 @@
 import sys
 import logging
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QColor
-from PyQt5.QtGui import QPalette
-from PyQt5.QtWidgets import QApplication
-from view.top_level_window import TopLevelWindow
-from model.logic import Editor
+from instrumentation import CommandInstrumentation
+from log_setup import log_file_path, start_logging
+from startup_profile import StartupProfile
 
 
 def run():
-    logging.basicConfig(
-            filename='atlas.log', level=logging.DEBUG,
-            format='%(asctime)s:%(name)s:%(levelname)s:%(message)s')
-    logging.info("Starting Atlas")
+    # Imported here, so that a start-up profile (see `startup_profile`) can
+    # time them
+    profile = StartupProfile.from_environment()
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QColor
+    from PyQt5.QtGui import QPalette
+    from PyQt5.QtWidgets import QApplication
+    from view.editor_pane import EditorPane
+    from view.top_level_window import TopLevelWindow
+    from model.logic import Editor
+    if profile:
+        profile.mark('imports')
+    # Commands are always timed and logged, and measured in detail on
+    # request (see `instrumentation`)
+    instrumentation = CommandInstrumentation.from_environment()
+    if instrumentation:
+        instrumentation.install([EditorPane])
+    else:
+        instrumentation = CommandInstrumentation()
     portfolio_file = 'example-portfolio/example.json'
     if len(sys.argv) > 1:
         portfolio_file = sys.argv[1]
+    start_logging(log_file_path(portfolio_file))
+    logging.info("Starting Atlas")
     app = QApplication(sys.argv)
     app.setApplicationName('Atlas')
     app.setAttribute(Qt.AA_UseHighDpiPixmaps)
@@ -29,10 +43,16 @@ def run():
 
     editor_window = TopLevelWindow()
     # editor_window.menuBar().addMenu("&File")
-    editor = Editor(editor_window, portfolio_file)
+    editor = Editor(editor_window, portfolio_file, instrumentation)
     editor_window.closeEvent = editor.quit
+    if profile:
+        profile.report_on_first_paint(editor_window)
     editor_window.setup()
+    if profile:
+        profile.mark('window set up')
     editor.setup()
+    if profile:
+        profile.mark('portfolio opened')
     sys.exit(app.exec_())
 
 
@@ -0,0 +1,71 @@
+"""Extract auxiliary task lists from portfolio files.
+
+Auxiliary files collect tasks with particular properties from all portfolio
+(life area) files, so that day plans can be prepared from them:
+
+* daily: tasks that recur every day (`rec:1d`);
+* booked: tasks with a due date that do not recur;
+* periodic: recurring tasks, other than daily ones;
+* shlist: tasks in the shopping list category.
+
+`extract_auxiliaries()` classifies every line once and routes it to all the
+auxiliary lists it belongs to.
+
+"""
+
+
+AUXILIARIES = ('daily', 'booked', 'periodic', 'shlist')
+
+
+def auxiliary_file(settings, name):
+    """Return the path of auxiliary file `name` (e.g. 'daily')."""
+
+    return getattr(settings, name + '_file')
+
+
+def extract_auxiliaries(texts, settings, tokenizer, names=AUXILIARIES):
+    """Extract auxiliary task lists in a single pass.
+
+    Parameters
+    ----------
+    texts : iterable of str
+        Contents of portfolio files.
+    settings : model.settings.Settings
+        Portfolio settings.
+    tokenizer : model.tokenizer.Tokenizer
+        Tokenizer used to parse task definitions.
+    names : iterable of str
+        Auxiliary lists to extract (see `AUXILIARIES`).
+
+    Returns
+    -------
+    dict
+        Auxiliary list name -> list of task definitions, in portfolio order.
+
+    """
+
+    extracted = {name: [] for name in names}
+    daily = extracted.get('daily')
+    booked = extracted.get('booked')
+    periodic = extracted.get('periodic')
+    shlist = extracted.get('shlist')
+    shlist_cat = settings.shlist_cat
+    parse = tokenizer.parse
+    is_active = tokenizer.is_active
+    is_daily = tokenizer.is_daily
+    for text in texts:
+        for line in text.split('\n'):
+            task = parse(line)
+            if not is_active(task):
+                continue
+            if task.rec is not None:
+                if is_daily(task):
+                    if daily is not None:
+                        daily.append(line)
+                elif periodic is not None:
+                    periodic.append(line)
+            elif task.due is not None and booked is not None:
+                booked.append(line)
+            if shlist is not None and shlist_cat in task.cats:
+                shlist.append(line)
+    return extracted
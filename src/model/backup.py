@@ -0,0 +1,395 @@
+"""Incremental, deduplicated backups of the portfolio directory.
+
+A backup store is a directory holding:
+
+* `objects/`, the contents of backed up files, each stored once under its
+  SHA-256 digest (`objects/ab/cdef...`), however many files and snapshots
+  share it;
+* `snapshots/`, one JSON manifest per backup (`YYYYMMDDHHMMSS.json`),
+  mapping the relative path of each file to its digest, size, modification
+  time and permissions.
+
+A backup only reads and stores the files that changed since the previous
+snapshot: a file whose size and modification time are the same as in the
+previous manifest is taken to have the same contents, and files whose
+contents are already in the store are not stored again. The cost of a backup
+thus depends on what changed, not on the size of the portfolio. Files derived
+from others (indexes and caches, rebuilt when missing) can be left out, by
+name (see `walk_files()`), so that rewriting them does not add to it.
+
+Old snapshots are pruned by a retention policy (see `BackupStore.prune()`),
+after which objects no snapshot refers to any longer are deleted.
+
+Alternatively, `write_archive()` streams the whole directory into a single
+compressed tar archive (xz or gzip), with a `SHA256SUMS` member listing the
+checksum of every other member, and checks the archive against it (see
+`verify_archive()`) before putting it in place.
+
+"""
+
+import datetime
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+
+
+SNAPSHOT_NAME_FORMAT = '%Y%m%d%H%M%S'
+MANIFEST_VERSION = 1
+
+# Archives: compression (a `tarfile` compression name), and checksums member
+ARCHIVE_COMPRESSION = 'xz'
+ARCHIVE_EXTENSIONS = {'xz': '.tar.xz', 'gz': '.tar.gz'}
+CHECKSUMS_MEMBER = 'SHA256SUMS'
+CHUNK_SIZE = 1 << 16
+
+
+def walk_files(source_dir, exclude_dir=None, exclude_names=()):
+    """Yield `(relative_path, path)` of the files under `source_dir`.
+
+    Relative paths use `/` as separator. Directory `exclude_dir`, if given,
+    is skipped, and so are files whose name matches one of the shell-style
+    patterns `exclude_names` (such as `'*.idx'`).
+
+    """
+
+    excluded = os.path.realpath(exclude_dir) if exclude_dir else None
+    for dir_path, dir_names, file_names in os.walk(source_dir):
+        dir_names[:] = sorted(
+            dir_name for dir_name in dir_names
+            if os.path.realpath(os.path.join(dir_path, dir_name)) != excluded)
+        relative_dir = os.path.relpath(dir_path, source_dir)
+        for file_name in sorted(file_names):
+            if any(fnmatch.fnmatch(file_name, pattern)
+                   for pattern in exclude_names):
+                continue
+            relative_path = os.path.normpath(
+                os.path.join(relative_dir, file_name))
+            yield (relative_path.replace(os.sep, '/'),
+                   os.path.join(dir_path, file_name))
+
+
+class _HashingReader:
+    """File wrapper computing the SHA-256 digest of what is read."""
+
+    def __init__(self, file_):
+        self._file = file_
+        self.hash = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        self.hash.update(data)
+        return data
+
+
+def write_archive(source_dir, archive_path, compression=ARCHIVE_COMPRESSION,
+                  exclude_dir=None, progress=None, exclude_names=()):
+    """Back up `source_dir` to a compressed tar archive.
+
+    Files are streamed into the archive one chunk at a time, and their
+    checksums are added as a last `SHA256SUMS` member. The archive is
+    written to a temporary file, verified, and then renamed to
+    `archive_path`.
+
+    Parameters
+    ----------
+    source_dir : str
+        Directory to back up.
+    archive_path : str
+        Path of the archive. Its directory is created if needed.
+    compression : str
+        `'xz'` (smaller) or `'gz'` (faster).
+    exclude_dir : str, optional
+        Directory not to back up, such as the backup directory.
+    progress : callable, optional
+        Called as `progress(files_done, files_total)` after each file.
+    exclude_names : sequence of str, optional
+        Patterns of the names of files not to back up (see `walk_files()`).
+
+    Returns
+    -------
+    dict
+        Number of `files` archived, and the size of the archive in `bytes`.
+
+    Raises
+    ------
+    OSError
+        If a file cannot be read, or the archive cannot be written.
+    ValueError
+        If the written archive does not match its checksums.
+
+    """
+
+    files = list(walk_files(source_dir, exclude_dir, exclude_names))
+    os.makedirs(os.path.dirname(archive_path) or '.', exist_ok=True)
+    temp_path = '{}.{}.tmp'.format(archive_path, os.getpid())
+    try:
+        checksums = []
+        # Flushed to disk through the handle it is written with: on Windows,
+        # `os.fsync()` fails on a handle opened for reading
+        with open(temp_path, 'wb') as temp_file:
+            with tarfile.open(fileobj=temp_file,
+                              mode='w|' + compression) as archive:
+                for done, (relative_path, path) in enumerate(files, 1):
+                    info = archive.gettarinfo(path, arcname=relative_path)
+                    with open(path, 'rb') as file_:
+                        reader = _HashingReader(file_)
+                        archive.addfile(info, reader)
+                    checksums.append('{}  {}\n'.format(
+                        reader.hash.hexdigest(), relative_path))
+                    if progress is not None:
+                        progress(done, len(files))
+                data = ''.join(checksums).encode('utf-8')
+                info = tarfile.TarInfo(CHECKSUMS_MEMBER)
+                info.size = len(data)
+                info.mtime = int(datetime.datetime.now().timestamp())
+                archive.addfile(info, io.BytesIO(data))
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        verify_archive(temp_path)
+        os.replace(temp_path, archive_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return {'files': len(files), 'bytes': os.path.getsize(archive_path)}
+
+
+def verify_archive(archive_path):
+    """Check the members of an archive against its `SHA256SUMS` member.
+
+    Returns
+    -------
+    int
+        Number of members checked.
+
+    Raises
+    ------
+    ValueError
+        If a member is missing, unlisted, or does not match its checksum.
+
+    """
+
+    digests = {}
+    listed = None
+    with tarfile.open(archive_path, 'r|*') as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            reader = _HashingReader(archive.extractfile(member))
+            data = b''.join(iter(lambda: reader.read(CHUNK_SIZE), b''))
+            if member.name == CHECKSUMS_MEMBER:
+                listed = dict(reversed(line.split('  ', 1)) for line
+                              in data.decode('utf-8').splitlines())
+            else:
+                digests[member.name] = reader.hash.hexdigest()
+    if listed is None:
+        raise ValueError("No {} member in '{}'".format(
+            CHECKSUMS_MEMBER, archive_path))
+    for name in sorted(set(digests) | set(listed)):
+        if digests.get(name) != listed.get(name):
+            raise ValueError("Checksum mismatch for '{}' in '{}'".format(
+                name, archive_path))
+    return len(digests)
+
+
+class BackupStore:
+    """Content-addressed store of portfolio snapshots.
+
+    Parameters
+    ----------
+    backup_dir : str
+        Directory of the store. It is created on the first backup.
+
+    """
+
+    def __init__(self, backup_dir):
+        self.backup_dir = backup_dir
+        self.objects_dir = os.path.join(backup_dir, 'objects')
+        self.snapshots_dir = os.path.join(backup_dir, 'snapshots')
+
+    # Snapshots
+
+    def snapshots(self):
+        """Return the names of the snapshots, oldest first."""
+
+        if not os.path.isdir(self.snapshots_dir):
+            return []
+        return sorted(name[:-len('.json')]
+                      for name in os.listdir(self.snapshots_dir)
+                      if name.endswith('.json'))
+
+    def read_manifest(self, name):
+        """Return the files of snapshot `name`, by relative path."""
+
+        with open(self._manifest_path(name), encoding='utf-8') as file_:
+            return json.load(file_)['files']
+
+    def back_up(self, source_dir, now=None, exclude_names=()):
+        """Take a snapshot of `source_dir`.
+
+        The store itself is skipped, if it is inside `source_dir`.
+
+        Parameters
+        ----------
+        source_dir : str
+            Directory to back up.
+        now : datetime.datetime, optional
+            Time of the snapshot; the current time by default.
+        exclude_names : sequence of str, optional
+            Patterns of the names of files not to back up (see
+            `walk_files()`).
+
+        Returns
+        -------
+        dict
+            `name` of the snapshot, number of `files` in it, and the number
+            of files (`stored_files`) and bytes (`stored_bytes`) added to
+            the store.
+
+        """
+
+        now = now or datetime.datetime.now()
+        snapshots = self.snapshots()
+        previous = self.read_manifest(snapshots[-1]) if snapshots else {}
+        files = {}
+        stored_files = stored_bytes = 0
+        for relative_path, path in walk_files(source_dir, self.backup_dir,
+                                              exclude_names):
+            stat = os.stat(path)
+            entry = previous.get(relative_path)
+            if (entry is not None and entry['size'] == stat.st_size
+                    and entry['mtime_ns'] == stat.st_mtime_ns
+                    and os.path.exists(self._object_path(entry['sha256']))):
+                digest = entry['sha256']
+            else:
+                with open(path, 'rb') as file_:
+                    data = file_.read()
+                digest = hashlib.sha256(data).hexdigest()
+                if self._store_object(digest, data):
+                    stored_files += 1
+                    stored_bytes += len(data)
+            files[relative_path] = {
+                'sha256': digest,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'mode': stat.st_mode & 0o777,
+            }
+        name = now.strftime(SNAPSHOT_NAME_FORMAT)
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'created': now.isoformat(),
+            'source': os.path.abspath(source_dir),
+            'files': files,
+        }
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        self._write_atomically(
+            self._manifest_path(name),
+            json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8'))
+        return {'name': name, 'files': len(files),
+                'stored_files': stored_files, 'stored_bytes': stored_bytes}
+
+    def restore(self, name, target_dir):
+        """Recreate the files of snapshot `name` under `target_dir`."""
+
+        for relative_path, entry in self.read_manifest(name).items():
+            path = os.path.join(target_dir, *relative_path.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copyfile(self._object_path(entry['sha256']), path)
+            os.chmod(path, entry['mode'])
+            os.utime(path, ns=(entry['mtime_ns'], entry['mtime_ns']))
+
+    # Retention
+
+    def prune(self, keep_last, keep_daily, keep_monthly):
+        """Delete the snapshots the retention policy does not keep.
+
+        Kept are the `keep_last` most recent snapshots, plus the most
+        recent snapshot of each of the `keep_daily` most recent days, and
+        of each of the `keep_monthly` most recent months, that have any.
+        Objects no longer used by any snapshot are then deleted.
+
+        Returns
+        -------
+        list of str
+            Names of the deleted snapshots.
+
+        """
+
+        snapshots = self.snapshots()
+        keep = set(snapshots[-keep_last:] if keep_last > 0 else [])
+        for period_length, count in ((8, keep_daily), (6, keep_monthly)):
+            newest = {}
+            for name in snapshots:
+                newest[name[:period_length]] = name
+            periods = sorted(newest)
+            for period in periods[-count:] if count > 0 else []:
+                keep.add(newest[period])
+        removed = [name for name in snapshots if name not in keep]
+        for name in removed:
+            os.remove(self._manifest_path(name))
+        if removed:
+            self.collect_garbage()
+        return removed
+
+    def collect_garbage(self):
+        """Delete the objects no snapshot refers to.
+
+        Returns
+        -------
+        int
+            Number of deleted objects.
+
+        """
+
+        used = set()
+        for name in self.snapshots():
+            used.update(entry['sha256']
+                        for entry in self.read_manifest(name).values())
+        removed = 0
+        if not os.path.isdir(self.objects_dir):
+            return removed
+        for prefix in os.listdir(self.objects_dir):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            for rest in os.listdir(prefix_dir):
+                if prefix + rest not in used:
+                    os.remove(os.path.join(prefix_dir, rest))
+                    removed += 1
+            if not os.listdir(prefix_dir):
+                os.rmdir(prefix_dir)
+        return removed
+
+    # Utility functions
+
+    def _manifest_path(self, name):
+        return os.path.join(self.snapshots_dir, name + '.json')
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _store_object(self, digest, data):
+        """Add `data` to the store, unless it is there already."""
+
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._write_atomically(path, data)
+        return True
+
+    @staticmethod
+    def _write_atomically(path, data):
+        temp_path = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            with open(temp_path, 'wb') as file_:
+                file_.write(data)
+                file_.flush()
+                os.fsync(file_.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
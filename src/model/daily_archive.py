@@ -0,0 +1,233 @@
+"""Indexed store of archived daily tasks files.
+
+`Editor.move_daily_tasks_file()` moves daily tasks files (`20200131.pmd.txt`)
+to the `daily_files_archive_dir` directory. `DailyArchive` keeps them in a
+single SQLite database in that directory (`STORE_NAME`), keyed by day, with
+the original text of each file and a row for each task in it: its state (task
+prefix: done, open, rescheduled...) and its text, without properties, tags or
+categories. Tasks are indexed by text, so that the history of a task, or how
+often it was rescheduled, is found without opening any file.
+
+Each file is parsed once: the size and modification time of the file it was
+read from are kept with each day, and `DailyArchive.ingest_directory()` only
+reads files that are new or changed since. Days stay in the store when their
+file is removed from the directory.
+
+"""
+
+import os
+import re
+import sqlite3
+
+
+STORE_NAME = 'dailies.sqlite3'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    day TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    day TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    task TEXT NOT NULL,
+    PRIMARY KEY (day, line)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tasks_by_task ON tasks (task, day);
+CREATE INDEX IF NOT EXISTS tasks_by_state ON tasks (state, task);
+"""
+
+# Date put after the prefix of tasks marked as done or for rescheduling
+_MARKED_ON = re.compile(r'\s*\d{4}-\d{2}-\d{2}')
+
+
+def daily_tasks(text, tokenizer, settings):
+    """Return the tasks of daily tasks file `text`.
+
+    Returns
+    -------
+    list of tuple
+        `(line_number, state, task_text)` of each task, where `state` is the
+        task prefix. Headings, information and other lines are left out.
+
+    """
+
+    states = set(settings.active_task_prefixes)
+    states.update((settings.done_task_prefix, settings.paused_task_prefix,
+                   settings.for_rescheduling_task_prefix,
+                   settings.rescheduled_periodic_task_prefix))
+    tasks = []
+    for line_number, line in enumerate(text.split('\n')):
+        task = tokenizer.parse(line)
+        if task.prefix not in states or task.body[1:2] != settings.space:
+            continue
+        rest = task.body[2:]
+        # `x 2020-01-31 - Task text`
+        match = _MARKED_ON.match(rest)
+        if match:
+            rest = rest[match.end():]
+        text_ = tokenizer.parse(rest.lstrip(settings.space)).text
+        if text_:
+            tasks.append((line_number, task.prefix, text_))
+    return tasks
+
+
+class DailyArchive:
+    """SQLite store of archived daily tasks files.
+
+    Parameters
+    ----------
+    path : str
+        Path of the database, created if needed.
+    tokenizer : model.tokenizer.Tokenizer
+        Parses the tasks of the files.
+    encoding : str
+        Encoding of the daily tasks files.
+
+    """
+
+    def __init__(self, path, tokenizer, encoding):
+        self.path = path
+        self.tokenizer = tokenizer
+        self.settings = tokenizer.settings
+        self.encoding = encoding
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        """Close the database."""
+
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def day_of(self, path):
+        """Return the day (`YYYYMMDD`) of a daily tasks file, or None."""
+
+        day = os.path.basename(path).split('.')[0]
+        if len(day) == 8 and self.settings.daily_file_name.match(day):
+            return day
+        return None
+
+    # Ingestion
+
+    def ingest(self, path):
+        """Store daily tasks file `path`, unless stored as it is already.
+
+        Returns
+        -------
+        bool
+            Whether the file was read.
+
+        """
+
+        with self.connection:
+            return self._ingest(path, self.day_of(path), os.stat(path))
+
+    def ingest_directory(self, directory):
+        """Store the daily tasks files of `directory` that are new or changed.
+
+        Returns
+        -------
+        list of str
+            Days read.
+
+        """
+
+        stored = {day: (size, mtime_ns) for day, size, mtime_ns
+                  in self.connection.execute(
+                      "SELECT day, size, mtime_ns FROM days")}
+        read = []
+        with self.connection:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    day = self.day_of(entry.name)
+                    if day is None or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    if stored.get(day) == (stat.st_size, stat.st_mtime_ns):
+                        continue
+                    if self._ingest(entry.path, day, stat):
+                        read.append(day)
+        return sorted(read)
+
+    # Queries
+
+    def days(self):
+        """Return the days stored, oldest first."""
+
+        return [day for day, in self.connection.execute(
+            "SELECT day FROM days ORDER BY day")]
+
+    def text(self, day):
+        """Return the original text of the file of `day`, or None."""
+
+        row = self.connection.execute(
+            "SELECT text FROM days WHERE day = ?", (day,)).fetchone()
+        return row[0] if row else None
+
+    def tasks(self, day, state=None):
+        """Return the texts of the tasks of `day`, optionally in `state`."""
+
+        query = "SELECT task FROM tasks WHERE day = ?"
+        parameters = [day]
+        if state is not None:
+            query += " AND state = ?"
+            parameters.append(state)
+        return [task for task, in self.connection.execute(
+            query + " ORDER BY line", parameters)]
+
+    def history(self, task):
+        """Return `(day, state)` of each appearance of `task`, oldest first."""
+
+        return self.connection.execute(
+            "SELECT day, state FROM tasks WHERE task = ? ORDER BY day, line",
+            (task,)).fetchall()
+
+    def reschedule_counts(self, limit=None):
+        """Return the tasks rescheduled most often.
+
+        Returns
+        -------
+        list of tuple
+            `(task_text, times_rescheduled, last_day)`, the most often
+            rescheduled first.
+
+        """
+
+        settings = self.settings
+        return self.connection.execute(
+            "SELECT task, COUNT(*), MAX(day) FROM tasks"
+            " WHERE state IN (?, ?) GROUP BY task"
+            " ORDER BY COUNT(*) DESC, task LIMIT ?",
+            (settings.for_rescheduling_task_prefix,
+             settings.rescheduled_periodic_task_prefix,
+             -1 if limit is None else limit)).fetchall()
+
+    # Utility functions
+
+    def _ingest(self, path, day, stat):
+        if day is None:
+            return False
+        row = self.connection.execute(
+            "SELECT size, mtime_ns FROM days WHERE day = ?", (day,)).fetchone()
+        if row == (stat.st_size, stat.st_mtime_ns):
+            return False
+        with open(path, encoding=self.encoding) as file_:
+            text = file_.read()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO days VALUES (?, ?, ?, ?)",
+            (day, stat.st_size, stat.st_mtime_ns, text))
+        self.connection.execute("DELETE FROM tasks WHERE day = ?", (day,))
+        self.connection.executemany(
+            "INSERT INTO tasks VALUES (?, ?, ?, ?)",
+            ((day,) + task
+             for task in daily_tasks(text, self.tokenizer, self.settings)))
+        return True
@@ -0,0 +1,247 @@
+"""Columnar store of earned times, with aggregations by period.
+
+Each line of the earned times file records the time earned on a day, as
+extracted from its daily tasks file (see `Editor.extract_earned_time()`)::
+
+    20200131 > Total earned time (earned work time) = 05:30 (03:15)
+
+`EarnedTimes` holds these as three arrays: the day (as a Gregorian ordinal),
+the total minutes earned, and the minutes earned on work tasks. The arrays
+are saved next to the text file (its path followed by `STORE_SUFFIX`), as
+fixed-size records after a header recording the size and modification time
+of the text file they were read from, and are only parsed from the text
+file again when it was changed by other means than `EarnedTimes.append()`.
+
+Totals by week, month or year, and rolling averages, are computed with array
+operations, whatever the number of days.
+
+NumPy is required.
+
+"""
+
+import datetime
+import os
+import re
+
+import numpy as np
+
+
+STORE_SUFFIX = '.bin'
+# Header: format version, size and modification time of the text file
+_HEADER = np.dtype([('version', '<i8'), ('size', '<i8'), ('mtime_ns', '<i8')])
+_RECORD = np.dtype([('date', '<i4'), ('total', '<i4'), ('work', '<i4')])
+_VERSION = 1
+# `datetime64[D]` counts days from 1970-01-01, a Thursday
+_EPOCH = datetime.date(1970, 1, 1).toordinal()
+_EPOCH_WEEKDAY = 3
+PERIODS = {'month': 'datetime64[M]', 'year': 'datetime64[Y]'}
+
+
+def line_pattern(settings):
+    """Return the regular expression matching an earned times line."""
+
+    time = r'(\d+){}(\d{{2}})'.format(re.escape(settings.time_separator))
+    return re.compile(r'(\d{{8}})\s.*?{}\s*\({}\)\s*$'.format(time, time))
+
+
+def parse_line(line, pattern):
+    """Return `(ordinal, total_minutes, work_minutes)` of `line`, or None."""
+
+    match = pattern.match(line)
+    if not match:
+        return None
+    day, hours, minutes, work_hours, work_minutes = match.groups()
+    try:
+        ordinal = datetime.datetime.strptime(day, '%Y%m%d').toordinal()
+    except ValueError:
+        return None
+    return (ordinal, int(hours) * 60 + int(minutes),
+            int(work_hours) * 60 + int(work_minutes))
+
+
+class EarnedTimes:
+    """Earned times per day, as arrays.
+
+    Days extracted more than once count once, with the last extraction.
+
+    Parameters
+    ----------
+    path : str
+        Path of the earned times text file.
+    settings : model.settings.Settings
+        Portfolio settings.
+
+    Attributes
+    ----------
+    records : numpy.ndarray
+        Records of the text file, in the order of its lines.
+    dates : numpy.ndarray
+        Days, as Gregorian ordinals, in increasing order.
+    total : numpy.ndarray
+        Minutes earned on each day.
+    work : numpy.ndarray
+        Minutes earned on work tasks on each day.
+
+    """
+
+    def __init__(self, path, settings):
+        self.path = path
+        self.store_path = path + STORE_SUFFIX
+        self.pattern = line_pattern(settings)
+        records = self._read_store()
+        if records is None:
+            records = self._read_text()
+            self._write_store(records)
+        self._set_columns(records)
+
+    def append(self, line):
+        """Append `line` to the text file, and its day to the arrays."""
+
+        signature = self._text_signature()
+        in_sync = signature is not None and self._read_header() == signature
+        with open(self.path, 'a') as file_:
+            file_.write(line + '\n')
+        if not in_sync:
+            # Changed by other means: read it all again
+            records = self._read_text()
+            self._write_store(records)
+            self._set_columns(records)
+            return
+        parsed = parse_line(line, self.pattern)
+        records = np.array([parsed] if parsed else [], dtype=_RECORD)
+        with open(self.store_path, 'r+b') as file_:
+            file_.seek(0, os.SEEK_END)
+            file_.write(records.tobytes())
+            file_.seek(0)
+            file_.write(self._header().tobytes())
+        self._set_columns(np.concatenate((self.records, records)))
+
+    # Aggregations
+
+    def days(self):
+        """Return the days, as a `datetime64[D]` array."""
+
+        return (self.dates - _EPOCH).astype('datetime64[D]')
+
+    def totals_by(self, period):
+        """Return the minutes earned per week, month or year.
+
+        Parameters
+        ----------
+        period : str
+            `week` (weeks start on Monday), `month` or `year`.
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            The first day of each period with earned time (`datetime64[D]`),
+            and the total and work minutes earned in it.
+
+        """
+
+        days = self.days()
+        if period == 'week':
+            weekdays = (days.astype(np.int64) + _EPOCH_WEEKDAY) % 7
+            starts = days - weekdays.astype('timedelta64[D]')
+        else:
+            starts = days.astype(PERIODS[period]).astype('datetime64[D]')
+        periods, inverse = np.unique(starts, return_inverse=True)
+        total = np.bincount(inverse, weights=self.total,
+                            minlength=len(periods)).astype(np.int64)
+        work = np.bincount(inverse, weights=self.work,
+                           minlength=len(periods)).astype(np.int64)
+        return periods, total, work
+
+    def rolling_average(self, window):
+        """Return the average minutes earned over the last `window` days.
+
+        Days without a record count as zero minutes.
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            Every day from the first to the last day recorded
+            (`datetime64[D]`), and the average total and work minutes
+            earned over the `window` days up to it (fewer at the start).
+
+        """
+
+        if not len(self.dates):
+            empty = np.zeros(0)
+            return empty.astype('datetime64[D]'), empty, empty
+        first = self.dates[0]
+        length = self.dates[-1] - first + 1
+        days = (np.arange(length) + first - _EPOCH).astype('datetime64[D]')
+        averages = []
+        for column in (self.total, self.work):
+            daily = np.zeros(length, dtype=np.int64)
+            daily[self.dates - first] = column
+            sums = np.cumsum(daily)
+            sums[window:] = sums[window:] - sums[:-window]
+            averages.append(sums / np.minimum(np.arange(1, length + 1),
+                                              window))
+        return days, averages[0], averages[1]
+
+    # Utility functions
+
+    def _set_columns(self, records):
+        self.records = records
+        # The last record of a day wins: keep the first of the reversed ones
+        dates, first = np.unique(records['date'][::-1], return_index=True)
+        last = len(records) - 1 - first
+        self.dates = dates.astype(np.int64)
+        self.total = records['total'][last].astype(np.int64)
+        self.work = records['work'][last].astype(np.int64)
+
+    def _text_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _header(self):
+        size, mtime_ns = self._text_signature()
+        return np.array([(_VERSION, size, mtime_ns)], dtype=_HEADER)
+
+    def _read_header(self):
+        try:
+            header = np.fromfile(self.store_path, dtype=_HEADER, count=1)
+        except (OSError, ValueError):
+            return None
+        if len(header) != 1 or header['version'][0] != _VERSION:
+            return None
+        return (int(header['size'][0]), int(header['mtime_ns'][0]))
+
+    def _read_store(self):
+        signature = self._text_signature()
+        if signature is None or self._read_header() != signature:
+            return None
+        return np.fromfile(self.store_path, dtype=_RECORD,
+                           offset=_HEADER.itemsize)
+
+    def _read_text(self):
+        parsed = []
+        try:
+            with open(self.path) as file_:
+                for line in file_:
+                    record = parse_line(line.rstrip('\n'), self.pattern)
+                    if record is not None:
+                        parsed.append(record)
+        except FileNotFoundError:
+            pass
+        return np.array(parsed, dtype=_RECORD)
+
+    def _write_store(self, records):
+        if self._text_signature() is None:
+            return
+        temp_path = '{}.{}.tmp'.format(self.store_path, os.getpid())
+        try:
+            with open(temp_path, 'wb') as file_:
+                file_.write(self._header().tobytes())
+                file_.write(records.tobytes())
+            os.replace(temp_path, self.store_path)
+        except OSError:
+            # The store is only a cache of the text file
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
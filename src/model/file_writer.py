@@ -0,0 +1,165 @@
+"""Write files in the background, atomically, coalescing repeated writes.
+
+`FileWriter.write()` takes a snapshot of the text to write and returns at
+once; the file is written by a worker thread. Writes of the same path are
+done one at a time, after a short delay, and only the latest text is
+written: a command that saves a file several times in a row (or several
+commands in quick succession) costs a single write.
+
+Each write goes to a temporary file next to the target, which then replaces
+the target (see `atomic_write()`), so that a crash never leaves a truncated
+file behind.
+
+"""
+
+import concurrent.futures
+import logging
+import os
+import shutil
+import threading
+import time
+
+
+# Seconds a write waits for more recent text for the same path
+COALESCING_DELAY = 0.2
+MAX_WORKERS = 4
+
+
+def atomic_write(path, text, encoding):
+    """Write `text` to `path` through a temporary file.
+
+    The temporary file is flushed to disk, given the permissions of the file
+    it replaces (if any), and renamed over `path`.
+
+    """
+
+    temp_path = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        with open(temp_path, 'w', encoding=encoding) as temp_file:
+            temp_file.write(text)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class _PendingWrite:
+    """Latest text to write to a path, and whom to tell once written."""
+
+    __slots__ = ('text', 'callbacks')
+
+    def __init__(self, text):
+        self.text = text
+        self.callbacks = []
+
+
+class FileWriter:
+    """Background file writer.
+
+    Parameters
+    ----------
+    encoding : str
+        Encoding of written files.
+    delay : float
+        Seconds a write waits, so that more recent text for the same path is
+        written instead (see `COALESCING_DELAY`).
+    max_workers : int
+        Number of worker threads (files written in parallel).
+
+    """
+
+    def __init__(self, encoding, delay=COALESCING_DELAY,
+                 max_workers=MAX_WORKERS):
+        self.encoding = encoding
+        self.delay = delay
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='file-writer')
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._writing = {}
+        self._futures = set()
+
+    def write(self, path, text, callback=None):
+        """Write `text` to `path` in the background.
+
+        `callback(path, text, error)` is called from a worker thread once
+        `path` has been written, with the text actually written (the latest
+        one given for `path`) and None, or the exception raised.
+
+        """
+
+        with self._lock:
+            pending = self._pending.get(path)
+            if pending is None:
+                pending = self._pending[path] = _PendingWrite(text)
+            else:
+                pending.text = text
+            if callback is not None:
+                pending.callbacks.append(callback)
+            if path not in self._writing:
+                self._writing[path] = None
+                future = self._executor.submit(self._write_path, path)
+                self._futures.add(future)
+                future.add_done_callback(self._futures.discard)
+
+    def pending(self, path):
+        """Return the text waiting to be written to `path`, or None.
+
+        Files being written should be read through this method first, as
+        their contents on disk may not be up to date yet.
+
+        """
+
+        with self._lock:
+            pending = self._pending.get(path)
+            if pending is not None:
+                return pending.text
+            return self._writing.get(path)
+
+    def flush(self, timeout=None):
+        """Wait until all writes requested so far are done."""
+
+        while True:
+            with self._lock:
+                futures = set(self._futures)
+            if not futures:
+                return
+            done, not_done = concurrent.futures.wait(futures, timeout)
+            if not_done:
+                return
+
+    def shutdown(self):
+        """Finish all writes, then stop the worker threads."""
+
+        self.flush()
+        self._executor.shutdown()
+
+    def _write_path(self, path):
+        """Write the latest text for `path`, until there is none left."""
+
+        while True:
+            if self.delay:
+                time.sleep(self.delay)
+            with self._lock:
+                pending = self._pending.pop(path)
+                self._writing[path] = pending.text
+            error = None
+            try:
+                atomic_write(path, pending.text, self.encoding)
+            except Exception as ex:
+                error = ex
+            for callback in pending.callbacks:
+                try:
+                    callback(path, pending.text, error)
+                except Exception:
+                    logging.exception("Callback for '%s' failed", path)
+            # More recent text may have come in while writing
+            with self._lock:
+                if path not in self._pending:
+                    del self._writing[path]
+                    return
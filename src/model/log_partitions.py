@@ -0,0 +1,271 @@
+"""Progress log partitions, and paged reading of long files.
+
+With the `log_partition` setting set to `year` (or `month`), the log file
+only keeps the entries of the current year (or month). When the first entry
+of a new period is logged, the entries of earlier periods are moved out of
+the log file into partition files next to it, named after their period
+(`log.pmd.txt` becomes `log-2019.pmd.txt`, or `log-2019-12.pmd.txt`; see
+`LogPartitions.rotate()`). Only the log file is opened in the editor. A log
+with entries of earlier periods (such as one kept whole before the setting was
+set) is partitioned when the portfolio is opened.
+
+Partitions are not edited any more. They are read through `PagedLines`,
+which reads the lines asked for, a page at a time, using the byte offsets of
+the lines in the file (`LineIndex`). The offsets are saved next to the file,
+so that a partition is only scanned once.
+
+"""
+
+import collections
+import glob
+import os
+import re
+from array import array
+
+from model.file_writer import atomic_write
+from model.progress_log import (find_first_stamp, find_last_stamp,
+                                join_entries, parse_stamp, split_entries)
+
+
+PERIOD_FORMATS = {'year': '%Y', 'month': '%Y-%m'}
+INDEX_SUFFIX = '.idx'
+# Lines read at a time, and pages kept in memory, by `PagedLines`
+PAGE_SIZE = 256
+CACHED_PAGES = 16
+
+
+class LogPartitions:
+    """Partitions of the log file by period.
+
+    Parameters
+    ----------
+    path : str
+        Path of the log file, holding the current partition.
+    period : str
+        `year` or `month`.
+    settings : model.settings.Settings
+        Portfolio settings.
+    encoding : str
+        Encoding of the log files.
+
+    """
+
+    def __init__(self, path, period, settings, encoding):
+        if period not in PERIOD_FORMATS:
+            raise ValueError("Unknown log partition period '{}'".format(
+                period))
+        self.path = path
+        self.period = period
+        self.settings = settings
+        self.encoding = encoding
+        directory, name = os.path.split(path)
+        stem, dot, extension = name.partition('.')
+        self._directory = directory
+        self._name_format = stem + '-{}' + dot + extension
+        self._name_pattern = re.compile(
+            re.escape(stem) + r'-(\d{4}(?:-\d{2})?)'
+            + re.escape(dot + extension) + '$')
+
+    def key(self, stamp):
+        """Return the period of `stamp`, such as `2019` or `2019-12`."""
+
+        return stamp.strftime(PERIOD_FORMATS[self.period])
+
+    def partition_path(self, key):
+        """Return the path of the partition of period `key`."""
+
+        return os.path.join(self._directory, self._name_format.format(key))
+
+    def partitions(self):
+        """Return `(key, path)` of the existing partitions, oldest first."""
+
+        found = []
+        pattern = os.path.join(glob.escape(self._directory),
+                               self._name_format.format('*'))
+        for path in glob.glob(pattern):
+            match = self._name_pattern.match(os.path.basename(path))
+            if match:
+                found.append((match.group(1), path))
+        return sorted(found)
+
+    def has_past_entries(self, now):
+        """Check if the log file has entries of periods before that of `now`.
+
+        Only its first and last entries are read: whichever the order of the
+        log file, the oldest entry is one of them.
+
+        """
+
+        current = self.key(now)
+        for find_stamp in (find_first_stamp, find_last_stamp):
+            stamp = find_stamp(self.path, self.settings, self.encoding)
+            if stamp is not None and self.key(stamp) < current:
+                return True
+        return False
+
+    def rotate(self, now, newest_first):
+        """Move the entries of periods before that of `now` to partitions.
+
+        Entries are added to existing partitions, keeping the order of the
+        log file: newest first if `newest_first`, oldest first otherwise.
+        Partitions are written before the log file, so that entries are never
+        only in memory.
+
+        Returns
+        -------
+        list of str
+            Keys of the partitions written.
+
+        """
+
+        with open(self.path, encoding=self.encoding) as file_:
+            text = file_.read()
+        header, entries, final_newline = split_entries(text, self.settings)
+        current = self.key(now)
+        kept = []
+        moved = collections.OrderedDict()
+        for entry in entries:
+            key = self.key(parse_stamp(entry[0], self.settings))
+            if key == current:
+                kept.append(entry)
+            else:
+                moved.setdefault(key, []).append(entry)
+        for key, key_entries in moved.items():
+            path = self.partition_path(key)
+            old_entries = []
+            if os.path.exists(path):
+                with open(path, encoding=self.encoding) as file_:
+                    _, old_entries, _ = split_entries(file_.read(),
+                                                      self.settings)
+            if newest_first:
+                key_entries = key_entries + old_entries
+            else:
+                key_entries = old_entries + key_entries
+            atomic_write(path, join_entries([], key_entries, True),
+                         self.encoding)
+        if moved:
+            atomic_write(self.path,
+                         join_entries(header, kept, final_newline or not kept),
+                         self.encoding)
+        return sorted(moved)
+
+
+class LineIndex:
+    """Byte offsets of the lines of a file.
+
+    The offsets are saved to a file next to it (the file path followed by
+    `INDEX_SUFFIX`), and only computed again when the file changes.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+
+    Attributes
+    ----------
+    offsets : array.array
+        Offset of the start of each line, followed by the size of the file.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        stat = os.stat(path)
+        self.signature = array('q', [stat.st_size, stat.st_mtime_ns])
+        self.offsets = self._load()
+        if self.offsets is None:
+            self.offsets = self._build()
+            self._save()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def span(self, first, last):
+        """Return the byte range of lines `first` up to `last` (excluded)."""
+
+        return self.offsets[first], self.offsets[last]
+
+    def _build(self):
+        offsets = array('q', [0])
+        position = 0
+        with open(self.path, 'rb') as file_:
+            for line in file_:
+                position += len(line)
+                offsets.append(position)
+        return offsets
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'rb') as file_:
+                data = file_.read()
+        except OSError:
+            return None
+        offsets = array('q')
+        try:
+            offsets.frombytes(data)
+        except ValueError:
+            return None
+        if offsets[:2] != self.signature or len(offsets) < 3:
+            return None
+        return offsets[2:]
+
+    def _save(self):
+        temp_path = '{}.{}.tmp'.format(self.index_path, os.getpid())
+        try:
+            with open(temp_path, 'wb') as file_:
+                (self.signature + self.offsets).tofile(file_)
+            os.replace(temp_path, self.index_path)
+        except OSError:
+            # The index is only a cache
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+class PagedLines:
+    """Read-only lines of a file, read from disk a page at a time.
+
+    Only the offsets of the lines, and the `cached_pages` most recently read
+    pages of `page_size` lines, are held in memory.
+
+    """
+
+    def __init__(self, path, encoding, page_size=PAGE_SIZE,
+                 cached_pages=CACHED_PAGES):
+        self.path = path
+        self.encoding = encoding
+        self.page_size = page_size
+        self.cached_pages = cached_pages
+        self.index = LineIndex(path)
+        self._pages = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.index)
+
+    def line(self, row):
+        """Return line `row`, without its line ending."""
+
+        page_number, row_in_page = divmod(row, self.page_size)
+        return self._page(page_number)[row_in_page]
+
+    def _page(self, page_number):
+        page = self._pages.get(page_number)
+        if page is not None:
+            self._pages.move_to_end(page_number)
+            return page
+        first = page_number * self.page_size
+        last = min(first + self.page_size, len(self.index))
+        start, end = self.index.span(first, last)
+        with open(self.path, 'rb') as file_:
+            file_.seek(start)
+            data = file_.read(end - start)
+        lines = data.split(b'\n')
+        # The line ending of the last line read
+        if lines[-1] == b'' and len(lines) > last - first:
+            lines.pop()
+        page = [line.decode(self.encoding, 'replace').rstrip('\r')
+                for line in lines]
+        self._pages[page_number] = page
+        if len(self._pages) > self.cached_pages:
+            self._pages.popitem(last=False)
+        return page
@@ -23,18 +23,28 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 """
 
-import configparser
+import concurrent.futures
 import datetime
 import json
 import logging
 import os
-import re
 import shutil
+import sqlite3
 import sys
-from dateutil.relativedelta import relativedelta
 from pathlib import Path
 from PyQt5.QtWidgets import QMessageBox
-import model.prepare_todays_tasks
+from model.auxiliaries import (AUXILIARIES, auxiliary_file,
+                               extract_auxiliaries)
+from model.backup import ARCHIVE_EXTENSIONS, BackupStore, write_archive
+from model.file_writer import FileWriter
+from model.log_partitions import LogPartitions, PagedLines
+from model.settings import read_config, Settings
+from model.origin_index import OriginIndex
+from model.progress_log import (AppendOnlyLog, entries_newest_first,
+                                format_entry, parse_stamp)
+from model.schedule import Schedule
+from model.task_statistics import TaskStatistics, WITHOUT_DURATION
+from model.tokenizer import Tokenizer
 
 
 LINE_ENDING = '\n'
@@ -44,17 +54,6 @@ FILE_CHANGED_ASTERISK = '*'
 ENCODING = 'UTF-8'
 
 
-def sort_tasks(tasks, tags_in_sorting_order):
-    """Function docstring."""
-
-    sorted_tasks = []
-    for tag in tags_in_sorting_order:
-        for task in tasks:
-            if tag in task:
-                sorted_tasks.append(task)
-    return sorted_tasks
-
-
 class Editor:
     """Editor logic.
 
@@ -66,10 +65,12 @@ class Editor:
         Application main window.
     settings_file : str
         JSON file with portfolio settings.
+    instrumentation : instrumentation.CommandInstrumentation, optional
+        Times the commands run from the menus, if given.
 
     """
 
-    def __init__(self, view, settings_file):
+    def __init__(self, view, settings_file, instrumentation=None):
         """Initiates Editor instance variables.
 
         Parameters
@@ -78,17 +79,38 @@ class Editor:
             Application main window.
         settings_file : str
             JSON file with portfolio settings.
+        instrumentation : instrumentation.CommandInstrumentation, optional
+            Times the commands run from the menus, if given.
 
         Notes
         -----
         The role of `current_path` should be reviewed.
 
-        `settings` is a dictionary of portfolio settings, read from the
-        settings file.
+        `settings` holds portfolio settings, compiled once from the settings
+        file (see `read_settings_file()`).
 
         `WORKING_MODE` is a remnant of a previous implementation, and it
         should be removed.
 
+        Files are saved in the background by `file_writer` (see
+        `save_file()`), and backup archives are written by `backup_executor`
+        (see `back_up_archive()`).
+
+        `disk_contents` holds a hash of the contents of each file, as last
+        read or written by Atlas. Open files are watched, and reloaded when
+        their contents on disk differ from it (see `file_changed_on_disk()`).
+
+        `search_index` is the full-text index of portfolio files, opened by
+        the first search, and updated when files are saved (see
+        `search_portfolio()`).
+
+        `ttl_up_to_date` holds the paths of open portfolio files whose TTL has
+        been generated, and which have not been edited since (see
+        `generate_ttl()`).
+
+        `instrumentation`, if set, wraps every menu command (see
+        `setup_menu()`), and its report is shown by `performance()`.
+
         """
 
         self.encoding = 'UTF-8'
@@ -96,35 +118,68 @@ class Editor:
         self._view = view
         self.current_path = ''
         self.mode = WORKING_MODE
+        self.ttl_up_to_date = set()
+        self.file_writer = FileWriter(self.encoding)
+        self.backup_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='backup')
+        self.backup_future = None
+        self.disk_contents = {}
+        self.search_index = None
+        self.instrumentation = instrumentation
         self.config_file = Path(settings_file)
         self.read_settings_file(self.config_file)
 
     def read_settings_file(self, settings_file):
-        """Read portfolio JSON settins file and store settings
+        """Read portfolio configuration file and compile settings.
 
-        Settings are stored in `settings` dictionary. Dictionary keys are
-        literally the same as JSON properties.
+        The parsed configuration is kept in `config` (it is written back when
+        saving session settings), and its `USER` section is compiled once into
+        `settings`, a read-only `model.settings.Settings` instance whose
+        attribute names are the same as configuration option names.
 
         """
 
-        self.config = configparser.ConfigParser(
-                interpolation=configparser.ExtendedInterpolation())
-        self.config.read(settings_file)
-        self.cfg = self.config['USER']
-        self.active_task_prefixes = (
-                self.cfg['active_task_prefixes'].split('\n'))
-        self.portfolio_files = self.cfg['portfolio_files'].split('\n')
+        self.config = read_config(settings_file)
+        self.settings = Settings(self.config['USER'])
+        self.tokenizer = Tokenizer(self.settings)
+        self.origin_index = OriginIndex(
+            self.settings, self.tokenizer, self.tab_text)
+        # Only set when log entries are appended, or the log is partitioned
+        # (see `log_progress()`)
+        self.progress_log = None
+        if self.settings.log_storage == 'append':
+            self.progress_log = AppendOnlyLog(
+                self.settings.portfolio_log_file, self.settings,
+                self.encoding)
+            try:
+                # The log may have been kept newest first until now
+                self.progress_log.put_oldest_first()
+            except OSError as ex:
+                logging.error("Log not put oldest first. Error: %s", ex)
+        self.log_partitions = None
+        if self.settings.log_partition:
+            self.log_partitions = LogPartitions(
+                self.settings.portfolio_log_file,
+                self.settings.log_partition, self.settings, self.encoding)
 
     def setup(self):
         """Function docstring."""
 
         self.setup_menu()
+        self._view.tab_created.connect(self.setup_tab)
+        self._view.file_saved.connect(self.file_saved)
+        self._view.backup_progress.connect(self.backup_progress)
+        self._view.backup_finished.connect(self.backup_finished)
+        self._view.file_changed_on_disk.connect(self.file_changed_on_disk)
+        self._view.tabs.currentChanged.connect(self.show_task_statistics)
         self.open_portfolio()
+        self.show_task_statistics()
 
     def setup_menu(self):
         """Set up the drop-down menu.
 
-        All Atlas commands (functions) are shown in drop-down menus.
+        All Atlas commands (functions) are shown in drop-down menus. With
+        instrumentation, they are timed (see `performance()`).
 
         """
 
@@ -134,6 +189,7 @@ class Editor:
         menu_actions['open_file'] = self.open_file
         menu_actions['save_file'] = self.save_file
         menu_actions['save_file_as'] = self.save_file_as
+        menu_actions['search_portfolio'] = self.search_portfolio
         menu_actions['close_file'] = self.close_file
         menu_actions['quit'] = self.quit
         # Move
@@ -159,26 +215,53 @@ class Editor:
         menu_actions['analyse_tasks'] = self.analyse_tasks
         menu_actions['schedule_tasks'] = self.schedule_tasks
         menu_actions['extract_earned_time'] = self.extract_earned_time
+        menu_actions['review_earned_time'] = self.review_earned_time
         # Logs
         menu_actions['log_progress'] = self.log_progress
         menu_actions['log_expense'] = self.log_expense
+        menu_actions['browse_log_archive'] = self.browse_log_archive
         menu_actions['back_up'] = self.back_up
+        menu_actions['back_up_archive'] = self.back_up_archive
         # Other
         menu_actions['sort_periodic_tasks'] = self.sort_periodic_tasks
         menu_actions['extract_daily'] = self.extract_daily
         menu_actions['extract_booked'] = self.extract_booked
         menu_actions['extract_periodic'] = self.extract_periodic
         menu_actions['extract_shlist'] = self.extract_shlist
+        menu_actions['task_history'] = self.task_history
+        menu_actions['rescheduled_tasks'] = self.rescheduled_tasks
+        menu_actions['performance'] = self.performance
+        if self.instrumentation is not None:
+            menu_actions = self.instrumentation.wrap_actions(menu_actions)
         self._view.setup_menu(menu_actions)
 
     def open_portfolio(self):
-        """Function docstring."""
+        """Open portfolio files, and today's daily tasks file if it exists.
 
+        Portfolio files are opened lazily: their tabs are only loaded into
+        an editor when first focused or used by a command (see
+        `open_file()`). So is the index of task origins: files are indexed
+        when it is first used (see `portfolio_file_changed()`). If the log is
+        partitioned, entries of earlier periods are moved out of it first, so
+        that its tab only holds the current period.
+
+        """
+
+        if self.log_partitions is not None:
+            now = datetime.datetime.now()
+            try:
+                past_entries = self.log_partitions.has_past_entries(now)
+            except OSError as ex:
+                logging.error("Log not checked for partitioning. Error: %s",
+                              ex)
+                past_entries = False
+            if past_entries:
+                self.partition_log(now, None)
         launch_paths = set()
-        for old_path in self.cfg['tab_order'].split('\n'):
+        for old_path in self.settings.tab_order:
             if old_path in launch_paths:
                 continue
-            self.open_file(old_path)
+            self.open_file(old_path, lazy=True)
         danas = datetime.datetime.now()
         file_name = str(danas.year)
         if danas.month < 10:
@@ -187,16 +270,19 @@ class Editor:
         if danas.day < 10:
             file_name += "0"
         file_name += str(danas.day)
-        file_name += self.cfg['atlas_files_extension']
-        if os.path.isfile(self.cfg['portfolio_base_dir'] + file_name):
-            self.open_file(self.cfg['portfolio_base_dir'] + file_name)
+        file_name += self.settings.atlas_files_extension
+        if os.path.isfile(self.settings.portfolio_base_dir + file_name):
+            self.open_file(self.settings.portfolio_base_dir + file_name)
+        else:
+            self._view.tabs.setCurrentIndex(self._view.tab_count - 1)
+            self._view.materialize_current_tab(self._view.tabs.currentIndex())
 
     def new_file(self):
         """Add a new tab."""
 
         self._view.add_tab(None, "", NEWLINE)
 
-    def open_file(self, path=None):
+    def open_file(self, path=None, lazy=False):
         """Open a file from disk in a new tab.
 
         If `path` is not specified, it displays a dialog for the user to choose
@@ -206,30 +292,163 @@ class Editor:
         ----------
         path : str
             Path to save tab contents to.
+        lazy : bool
+            If true, the file is not read yet, and the new tab is not focused
+            (see `view.tab_placeholder.TabPlaceholder`).
 
         """
 
         # Get the path from the user if it's not defined
         if not path:
             path = self._view.get_open_file_path(
-                    self.cfg['portfolio_base_dir'],
-                    self.cfg['atlas_files_extension'])
+                    self.settings.portfolio_base_dir,
+                    self.settings.atlas_files_extension)
         # Was the dialog canceled?
         if not path:
             return
         # Do not open a life area if it is already open
         for widget in self._view.widgets:
-            if os.path.samefile(path, widget.path):
+            if widget.path and os.path.samefile(path, widget.path):
                 msg = "'{}' is already open."
                 self._view.show_message(msg.format(os.path.basename(path)))
-                self._view.focus_tab(widget)
+                self._view.tabs.setCurrentWidget(widget)
                 return
-        file_content = ''
+        if lazy:
+            self._view.add_placeholder_tab(
+                path, self.line_ending, self.load_tab)
+        else:
+            self._view.add_tab(path, self.load_tab(path), self.line_ending)
+        self._view.watch_file(path)
+        if self.settings.is_portfolio_file(path):
+            self.portfolio_file_changed(path)
+
+    def read_file(self, path):
+        """Return the contents of file `path`.
+
+        Contents not yet written by `file_writer` are returned as well.
+
+        """
+
+        contents = self.file_writer.pending(path)
+        if contents is not None:
+            return contents
         with open(path, encoding=self.encoding) as faux:
-            lines = faux.readlines()
-            for line in lines:
-                file_content += line
-        self._view.add_tab(path, file_content, self.line_ending)
+            contents = faux.read()
+        self.disk_contents[path] = hash(contents)
+        return contents
+
+    def load_tab(self, path):
+        """Return the text shown in the tab of file `path`."""
+
+        return self.tab_contents(path, self.read_file(path))
+
+    def tab_contents(self, path, contents):
+        """Return how `contents` of file `path` are shown in its tab.
+
+        An append-only log is shown newest entry first.
+
+        """
+
+        if self.is_append_only_log(path):
+            return entries_newest_first(contents, self.settings)
+        return contents
+
+    def is_append_only_log(self, path):
+        """Check if `path` is the log file, with entries appended."""
+
+        return (self.progress_log is not None
+                and path == self.progress_log.path)
+
+    def write_file(self, path, contents):
+        """Write `contents` to file `path` in the background, bypassing tabs.
+
+        Only for files that are not open, or whose tab has not been loaded.
+
+        """
+
+        self.disk_contents[path] = hash(contents)
+        self.file_writer.write(path, contents)
+        if self.settings.is_portfolio_file(path):
+            self.origin_index.invalidate(path)
+
+    def setup_tab(self, tab):
+        """Connect a newly created editor tab to the editor logic."""
+
+        if self.settings.is_portfolio_file(tab.path):
+            tab.textChanged.connect(
+                lambda: self.ttl_up_to_date.discard(tab.path))
+            tab.lines_changed.connect(
+                lambda first, removed, added: self.update_origin_index(
+                    tab, first, removed, added))
+        # Its entries are in reverse order: it must not be saved
+        if self.is_append_only_log(tab.path):
+            tab.setReadOnly(True)
+        if tab.path and self.settings.daily_file_name.match(
+                os.path.basename(tab.path).split('.')[0]):
+            tab.task_statistics = TaskStatistics(
+                self.tokenizer, tab.text().split(NEWLINE))
+            tab.lines_changed.connect(
+                lambda first, removed, added: self.update_task_statistics(
+                    tab, first, removed, added))
+
+    def update_origin_index(self, tab, first, removed, added):
+        """Update the task origins of `tab` after lines were replaced.
+
+        See `view.editor_pane.EditorPane.lines_changed`.
+
+        """
+
+        self.origin_index.replace_lines(
+            tab.path, first, removed,
+            [tab.line(row) for row in range(first, first + added)])
+
+    def update_task_statistics(self, tab, first, removed, added):
+        """Update the task statistics of `tab` after lines were replaced.
+
+        See `view.editor_pane.EditorPane.lines_changed`.
+
+        """
+
+        tab.task_statistics.replace(
+            first, removed, [tab.line(row) for row in range(first,
+                                                            first + added)])
+        if tab is self._view.tabs.currentWidget():
+            self.show_task_statistics()
+
+    def show_task_statistics(self):
+        """Show the task statistics of the current tab in the status bar.
+
+        Only daily tasks files have task statistics (see
+        `model.task_statistics`): they are the totals `analyse_tasks()`
+        writes, kept up to date as the file is edited.
+
+        """
+
+        statistics = getattr(self._view.tabs.currentWidget(),
+                             'task_statistics', None)
+        if statistics is None:
+            self._view.show_task_statistics('')
+            return
+        totals = [self.mins_to_hh_mm(value)
+                  for value in statistics.totals[:WITHOUT_DURATION]]
+        text = "Remaining {} ({}) | Earned {} ({})".format(*totals)
+        without_duration = statistics.totals[WITHOUT_DURATION]
+        if without_duration:
+            text += " | {} without {}".format(without_duration,
+                                              self.settings.dur_prop)
+        self._view.show_task_statistics(text)
+
+    def portfolio_file_changed(self, path):
+        """Forget what was derived from portfolio file `path`.
+
+        Called when an open portfolio file is opened, closed, written or
+        changed on disk. Edits in its tab only update what they change (see
+        `setup_tab()`).
+
+        """
+
+        self.origin_index.invalidate(path)
+        self.ttl_up_to_date.discard(path)
 
     def save_file(self, path=None, tab=None):
         """Save file contained in a tab to disk.
@@ -241,6 +460,10 @@ class Editor:
         contained in the tab, due to different usage scenarios for this
         function, it is best to keep these two parameters separate.
 
+        The file is written in the background (see
+        `model.file_writer.FileWriter`): the tab is marked as not modified
+        once the file is written, by `file_saved()`.
+
         Parameters
         ----------
         path : str
@@ -252,18 +475,57 @@ class Editor:
 
         if not tab:
             tab = self._view.current_tab
+        if tab.isReadOnly():
+            return
         if not path:
             # If it is a newly added tab, not saved before
             if tab.path is None:
                 tab.path = self._view.get_save_file_path(
-                        self.cfg['portfolio_base_dir'])
+                        self.settings.portfolio_base_dir)
             # Was the dialog canceled?
             if not tab.path:
                 return
             path = tab.path
-        with open(path, 'w', encoding=self.encoding) as faux:
-            faux.writelines(tab.text())
-        tab.setModified(False)
+        # Called from a writer thread: the signal hands over to this one
+        saved = self._view.file_saved
+        text = tab.text()
+        self.disk_contents[path] = hash(text)
+        self.file_writer.write(
+            path, text,
+            lambda path, text, error: saved.emit(tab, path, text, error))
+
+    def file_saved(self, tab, path, text, error):
+        """Update `tab` once `text` has been saved to `path`.
+
+        The tab is marked as not modified, unless it has been edited or
+        closed in the meantime.
+
+        """
+
+        if error is not None:
+            self._view.show_message(
+                "Could not save '{}'.".format(os.path.basename(path)),
+                str(error))
+            return
+        if self._view.tabs.indexOf(tab) == -1:
+            return
+        if tab.path == path:
+            # A new file can only be watched once it exists
+            self._view.watch_file(path)
+        if tab.text() == text:
+            tab.setModified(False)
+        if (self.search_index is not None
+                and path.endswith(self.settings.atlas_files_extension)):
+            try:
+                self.search_index.update_file(path, text)
+            except (OSError, sqlite3.Error) as ex:
+                logging.error("Search index not updated. Error: %s", ex)
+
+    def wait_for_saves(self):
+        """Wait until all files being saved are written."""
+
+        self.file_writer.flush()
+        self._view.process_pending_events()
 
     def save_file_as(self):
         """Save file in active tab to a different path.
@@ -274,7 +536,7 @@ class Editor:
 
         """
 
-        path = self._view.get_save_file_path(self.cfg['portfolio_base_dir'])
+        path = self._view.get_save_file_path(self.settings.portfolio_base_dir)
         # Was the dialog canceled?
         if not path:
             return
@@ -283,7 +545,7 @@ class Editor:
                 # if os.path.samefile(path, widget.path):
                 msg = "'{}' is open. Close if before overwriting."
                 self._view.show_message(msg.format(os.path.basename(path)))
-                self._view.focus_tab(widget)
+                self._view.tabs.setCurrentWidget(widget)
                 return
         self.save_file(path)
 
@@ -301,7 +563,6 @@ class Editor:
         """
 
         current_tab = self._view.current_tab
-        current_tab_idx = self._view.tabs.indexOf(current_tab)
         if current_tab.isModified():
             answer = self._view.show_yes_no_question(
                 "Do you want to save changes to the file before closing?",
@@ -310,9 +571,65 @@ class Editor:
                 self.save_file()
             if answer == QMessageBox.Cancel:
                 return False
-        self._view.tabs.removeTab(current_tab_idx)
+        self.close_tab(current_tab)
         return True
 
+    def close_tab(self, tab):
+        """Remove `tab`, and forget its file (without saving it).
+
+        Changes to the file are no longer reported, and what was derived
+        from it is forgotten.
+
+        """
+
+        self._view.tabs.removeTab(self._view.tabs.indexOf(tab))
+        if tab.path:
+            self._view.unwatch_file(tab.path)
+            self.disk_contents.pop(tab.path, None)
+            self.portfolio_file_changed(tab.path)
+
+    def file_changed_on_disk(self, path):
+        """Reload the tab of file `path`, changed by another program.
+
+        Changes made by Atlas itself (files being saved, or whose contents
+        are the same as when last read or written) are ignored. What was
+        derived from a portfolio file is updated for that file only. A tab
+        with unsaved changes is only reloaded if the user agrees to lose
+        them; otherwise, saving it will overwrite the file.
+
+        """
+
+        if self.file_writer.pending(path) is not None:
+            return
+        if self.is_append_only_log(path) and self.progress_log.is_own_change():
+            return
+        try:
+            with open(path, encoding=self.encoding) as file_:
+                contents = file_.read()
+        except (OSError, ValueError):
+            # Removed, or not fully written yet
+            return
+        if hash(contents) == self.disk_contents.get(path):
+            return
+        self.disk_contents[path] = hash(contents)
+        if self.settings.is_portfolio_file(path):
+            self.portfolio_file_changed(path)
+        tab = self.find_widget(path)
+        # A tab not loaded yet will read the file when it is
+        if tab is None or self._view.is_placeholder(tab):
+            return
+        name = os.path.basename(path)
+        if tab.isModified():
+            answer = self._view.show_yes_no_question(
+                "'{}' was changed by another program. Reload it, "
+                "discarding your changes?".format(name),
+                "File:    " + path)
+            if answer != QMessageBox.Yes:
+                return
+        tab.reload(self.tab_contents(path, contents))
+        self._view.show_status_message(
+            "Reloaded '{}', changed by another program.".format(name))
+
     def get_tab(self, path):
         """Function docstring."""
 
@@ -321,10 +638,45 @@ class Editor:
             if tab.path:
                 tab_path = os.path.normcase(os.path.abspath(tab.path))
                 if tab_path == normalised_path:
-                    self._view.focus_tab(tab)
-                    return tab
+                    self._view.tabs.setCurrentWidget(tab)
+                    return self._view.current_tab
         return self._view.current_tab
 
+    def find_tab(self, path):
+        """Return the editor tab of file `path`, or None if not open.
+
+        A tab that has not been loaded yet is loaded (see
+        `view.tab_placeholder.TabPlaceholder`).
+
+        """
+
+        widget = self.find_widget(path)
+        if widget is None:
+            return None
+        return self._view.materialize(widget)
+
+    def find_widget(self, path):
+        """Return the tab of file `path`, loaded or not, or None."""
+
+        normalised_path = os.path.normcase(os.path.abspath(path))
+        for tab in self._view.widgets:
+            if (tab.path and os.path.normcase(os.path.abspath(tab.path))
+                    == normalised_path):
+                return tab
+        return None
+
+    def tab_text(self, path):
+        """Return the text of the tab containing `path`, or None.
+
+        Does not load a tab that has not been loaded yet.
+
+        """
+
+        widget = self.find_widget(path)
+        if widget is None:
+            return None
+        return widget.text()
+
     def quit(self, fixme):
         """Quit Atlas.
 
@@ -333,15 +685,65 @@ class Editor:
 
         """
 
+        self.wait_for_saves()
         for tab in self._view.widgets:
+            if not tab.isModified():
+                continue
             current_tab_index = self._view.tabs.indexOf(tab)
             self._view.tabs.setCurrentIndex(current_tab_index)
             user_chose_yes_or_no = self.close_file()
             if not user_chose_yes_or_no:
                 return
+        self.wait_for_saves()
+        self.wait_for_backup()
+        if self.search_index is not None:
+            self.search_index.close()
         self.save_session_settings()
+        if self.instrumentation is not None:
+            self.instrumentation.report()
         sys.exit(0)
 
+    def search_portfolio(self):
+        """Search all portfolio files, in the search panel.
+
+        The files are looked up in a full-text index (see
+        `model.search_index`), in which files changed since last indexed are
+        indexed again first.
+
+        """
+
+        from model.search_index import INDEX_NAME, SearchIndex, indexed_files
+        self.wait_for_saves()
+        try:
+            if self.search_index is None:
+                self.search_index = SearchIndex(
+                    os.path.join(self.settings.portfolio_base_dir,
+                                 INDEX_NAME),
+                    self.encoding)
+            read = self.search_index.update(indexed_files(self.settings))
+        except (OSError, sqlite3.Error) as ex:
+            self._view.show_message("Could not open the search index.",
+                                    str(ex))
+            return
+        if read:
+            self._view.show_status_message(
+                "Indexed {} changed files.".format(read))
+        self._view.show_search_panel(self.search_index.search,
+                                     self.show_line)
+
+    def show_line(self, path, line_number):
+        """Focus the tab of file `path`, opening it if needed, at a line."""
+
+        tab = self.find_widget(path)
+        if tab is None:
+            self.open_file(path)
+        else:
+            self._view.tabs.setCurrentWidget(tab)
+        tab = self._view.current_tab
+        tab.setCursorPosition(line_number, 0)
+        tab.ensureLineVisible(line_number)
+        tab.setFocus()
+
     def goto_tab_left(self):
         """Change focus to one tab left. Allows for wrapping around."""
 
@@ -369,19 +771,9 @@ class Editor:
 
         tab = self._view.current_tab
         first_visible_line = tab.firstVisibleLine()
-        tasks = tab.text().split('\n')
         row = tab.getCursorPosition()[0]
         if row > 0:
-            for i, _ in enumerate(tasks):
-                if i == row - 1:
-                    temp = tasks[i]
-                    tasks[i] = tasks[i + 1]
-                    tasks[i + 1] = temp
-            contents = ""
-            for task in tasks:
-                contents += task + NEWLINE
-            contents = contents.rstrip(NEWLINE)
-            tab.SendScintilla(tab.SCI_SETTEXT, contents.encode(self.encoding))
+            tab.swap_lines(row - 1, row)
             tab.setFirstVisibleLine(first_visible_line)
             tab.setCursorPosition(row - 1, 0)
 
@@ -390,19 +782,9 @@ class Editor:
 
         tab = self._view.current_tab
         first_visible_line = tab.firstVisibleLine()
-        tasks = tab.text().split(NEWLINE)
         row = tab.getCursorPosition()[0]
-        if row < len(tasks) - 1:
-            for i in range(len(tasks) - 1, -1, -1):
-                if i == row + 1:
-                    temp = tasks[i]
-                    tasks[i] = tasks[i - 1]
-                    tasks[i - 1] = temp
-            contents = ""
-            for task in tasks:
-                contents += task + NEWLINE
-            contents = contents.rstrip(NEWLINE)
-            tab.SendScintilla(tab.SCI_SETTEXT, contents.encode(self.encoding))
+        if row < tab.lines() - 1:
+            tab.swap_lines(row, row + 1)
             tab.setFirstVisibleLine(first_visible_line)
             tab.setCursorPosition(row + 1, 0)
 
@@ -412,12 +794,104 @@ class Editor:
         ctab = self._view.current_tab
         if not self.running_from_daily_tasks_file(ctab):
             return
+        self.wait_for_saves()
         fnae = os.path.basename(ctab.path)
-        ctab_idx = self._view.tabs.indexOf(ctab)
-        self._view.tabs.removeTab(ctab_idx)
+        self.close_tab(ctab)
         shutil.move(
-            self.cfg['portfolio_base_dir'] + fnae,
-            self.cfg['daily_files_archive_dir'] + fnae)
+            self.settings.portfolio_base_dir + fnae,
+            self.settings.daily_files_archive_dir + fnae)
+        try:
+            with self.open_daily_archive(update=False) as archive:
+                archive.ingest(self.settings.daily_files_archive_dir + fnae)
+        except (OSError, sqlite3.Error) as ex:
+            logging.error("Daily tasks file not stored in the archive. "
+                          "Error: %s", ex)
+
+    def open_daily_archive(self, update=True):
+        """Return the store of archived daily tasks files.
+
+        See `model.daily_archive`. With `update`, files put in the archive
+        directory by other means are stored first.
+
+        """
+
+        from model.daily_archive import DailyArchive, STORE_NAME
+        archive = DailyArchive(
+            os.path.join(self.settings.daily_files_archive_dir, STORE_NAME),
+            self.tokenizer, self.encoding)
+        if update:
+            try:
+                archive.ingest_directory(
+                    self.settings.daily_files_archive_dir)
+            except (OSError, sqlite3.Error):
+                archive.close()
+                raise
+        return archive
+
+    def task_history(self):
+        """Show the archived days on which the current task appears.
+
+        The task is looked for by its text, without properties, tags and
+        categories, in the archived daily tasks files, with its state on each
+        day.
+
+        """
+
+        tab = self._view.current_tab
+        task = self.tokenizer.parse(tab.text(tab.getCursorPosition()[0]))
+        from model.daily_archive import daily_tasks
+        tasks = daily_tasks(task.body, self.tokenizer, self.settings)
+        if not tasks:
+            self._view.show_status_message("The current line is not a task.")
+            return
+        text = tasks[0][2]
+        try:
+            with self.open_daily_archive() as archive:
+                history = archive.history(text)
+        except (OSError, sqlite3.Error) as ex:
+            logging.error("Daily tasks archive not read. Error: %s", ex)
+            return
+        heading = self.settings.heading_prefix + self.settings.space
+        rescheduled = (self.settings.for_rescheduling_task_prefix,
+                       self.settings.rescheduled_periodic_task_prefix)
+        lines = [heading + "History of: " + text,
+                 "{} archived days, rescheduled {} times".format(
+                     len(history),
+                     sum(state in rescheduled for _, state in history)),
+                 ""]
+        lines.extend(state + self.settings.space + day
+                     for day, state in history)
+        self._view.add_tab(None, NEWLINE.join(lines) + NEWLINE, NEWLINE)
+
+    def rescheduled_tasks(self):
+        """Show the tasks most often rescheduled in archived daily files."""
+
+        try:
+            with self.open_daily_archive() as archive:
+                counts = archive.reschedule_counts(100)
+        except (OSError, sqlite3.Error) as ex:
+            logging.error("Daily tasks archive not read. Error: %s", ex)
+            return
+        heading = self.settings.heading_prefix + self.settings.space
+        lines = [heading + "Most rescheduled tasks", ""]
+        lines.extend("{} (last on {}) {}".format(count, day, text)
+                     for text, count, day in counts)
+        self._view.add_tab(None, NEWLINE.join(lines) + NEWLINE, NEWLINE)
+
+    def performance(self):
+        """Show the latency of the commands run so far.
+
+        Atlas always times commands, but only measures the time they spend
+        in buffers and disk I/O with the `ATLAS_INSTRUMENT` environment
+        variable set (see `instrumentation`).
+
+        """
+
+        if self.instrumentation is None:
+            self._view.show_message("Commands are not timed.")
+            return
+        self._view.add_tab(None, self.instrumentation.format_report(),
+                           NEWLINE)
 
     def mark_task_done(self):
         """Mark current task as done.
@@ -443,16 +917,11 @@ class Editor:
         current_tab_index = self._view.tabs.indexOf(tab)
         first_visible_line = tab.firstVisibleLine()
         row = tab.getCursorPosition()[0]
-        current_task = tab.text(row)
-        current_task = re.sub(r'\d{2}:\d{2}' + self.cfg['space'][1], "",
-                              current_task)
+        current_task = self.tokenizer.parse(tab.text(row))
         # If it's a blank line
-        if (current_task
-                and current_task[0]
-                not in self.cfg['active_task_prefixes'].split('\n')):
+        if current_task.body and not self.tokenizer.is_active(current_task):
             return
-        contents = self.mark_ordinary_task_done(tab)
-        tab.SendScintilla(tab.SCI_SETTEXT, contents.encode(self.encoding))
+        self.mark_ordinary_task_done(tab)
         # TODO Consider adding an option
         # to determine whether the user wants this done
         # self.analyse_tasks()
@@ -463,71 +932,53 @@ class Editor:
         tab.setCursorPosition(row, 0)
 
     def mark_ordinary_task_done(self, tab):
-        """Function docstring."""
+        """Move the task in the current line to the end, marked as done."""
 
         now = datetime.datetime.now()
-        row = tab.getCursorPosition()[0]
-        tasks = tab.text().split(NEWLINE)
-        if len(tasks[-1]) < 1:
-            tasks = tasks[:-1]
-        current_task = tasks[row]
-        del tasks[row]
-        taux = self.cfg['done_task_prefix'] + self.cfg['space'][1] + \
-            now.strftime("%Y-%m-%d")
-        taux += self.cfg['space'][1] + current_task
-        tasks.append(taux)
-        contents = ""
-        for task in tasks:
-            contents += task + NEWLINE
-        contents = contents.rstrip(NEWLINE)
-        return contents
+        self.move_line_to_end(
+            tab, tab.getCursorPosition()[0],
+            self.settings.done_task_prefix + self.settings.space
+            + now.strftime("%Y-%m-%d") + self.settings.space)
+
+    def move_line_to_end(self, tab, row, prefix):
+        """Move line `row` of `tab` to its end, prepending `prefix` to it.
+
+        Done as a single undo action. A trailing empty line is reused.
+
+        """
+
+        with tab.undo_action():
+            line = tab.line(row)
+            tab.delete_line(row)
+            tab.append_line(prefix + line)
 
     def mark_done_at_origin(self, task):
-        """Function docstring."""
+        """Mark `task` (a parsed `Task`) as done in its portfolio file.
+
+        Periodic tasks are not marked as done; their due date is moved forward
+        instead (see `update_due_date()`).
+
+        """
 
-        if (len(task) < 1
-                or task[0] not in self.active_task_prefixes
-                or self.cfg['daily_rec_prop_val'] in task):
+        if (not task.body
+                or not self.tokenizer.is_active(task)
+                or self.tokenizer.is_daily(task)):
             return
-        idx = -1
-        tasks = []
-        tab_idx = -1
-        task_found = False
-        for i in range(self._view.tab_count):
-            if self._view.tabs.widget(i).path in self.portfolio_files:
-                tasks = self._view.tabs.widget(i).text().split(NEWLINE)
-                in_ttl = False
-                for j, _ in enumerate(tasks):
-                    if tasks[j]:
-                        if (tasks[j][0] == self.cfg['heading_prefix']
-                                and self.cfg['ttl_heading'] in tasks[j]):
-                            in_ttl = True
-                        elif tasks[j][0] == self.cfg['heading_prefix']:
-                            in_ttl = False
-                        if (tasks[j][0] in self.active_task_prefixes
-                                and self.get_task_text(tasks[j]) in task
-                                and not task_found
-                                and not in_ttl):
-                            idx = j
-                            tab_idx = i
-                            task_found = True
-                            break
-            if task_found:
-                break
-        if idx > -1:
-            if self.cfg['rec_prop'] in tasks[idx]:
-                tasks[idx] = self.update_due_date(tasks[idx])
-            else:
-                tasks[idx] = (self.cfg['done_task_prefix']
-                              + self.cfg['space'][1] + tasks[idx][2:])
-        contents = ""
-        for task_ in tasks:
-            contents += task_ + NEWLINE
-        contents = contents.rstrip(NEWLINE)
-        if tab_idx > -1:
-            self._view.tabs.setCurrentIndex(tab_idx)
-            tab = self._view.tabs.widget(tab_idx)
-            tab.SendScintilla(tab.SCI_SETTEXT, contents.encode(self.encoding))
+        origin = self.origin_index.find(task)
+        if origin is None:
+            return
+        path, idx, _ = origin
+        tab = self.find_tab(path)
+        if tab is None:
+            return
+        line = tab.line(idx)
+        if self.tokenizer.parse(line).rec is not None:
+            line = self.update_due_date(line)
+        else:
+            line = (self.settings.done_task_prefix
+                    + self.settings.space + line[2:])
+        self._view.tabs.setCurrentWidget(tab)
+        tab.replace_line(idx, line)
 
     def mark_task_for_rescheduling(self, mark_rescheduled_periodic_task=False):
         """Function docstring."""
@@ -535,24 +986,13 @@ class Editor:
         now = datetime.datetime.now()
         tab = self._view.current_tab
         first_visible_line = tab.firstVisibleLine()
-        tasks = tab.text().split(NEWLINE)
-        if len(tasks[-1]) < 1:
-            tasks = tasks[:-1]
         row = tab.getCursorPosition()[0]
-        current_task = tasks[row]
-        del tasks[row]
-        taux = self.cfg['for_rescheduling_task_prefix']
+        taux = self.settings.for_rescheduling_task_prefix
         if mark_rescheduled_periodic_task:
-            taux = self.cfg['rescheduled_periodic_task_prefix']
-        taux += self.cfg['space'][1] + now.strftime("%Y-%m-%d") + \
-            self.cfg['space'][1] \
-            + current_task
-        tasks.append(taux)
-        contents = ""
-        for task in tasks:
-            contents += task + NEWLINE
-        contents = contents.rstrip(NEWLINE)
-        tab.SendScintilla(tab.SCI_SETTEXT, contents.encode(self.encoding))
+            taux = self.settings.rescheduled_periodic_task_prefix
+        taux += self.settings.space + now.strftime("%Y-%m-%d") + \
+            self.settings.space
+        self.move_line_to_end(tab, row, taux)
         # TODO Consider adding an option
         # to determine whether the user wants this done
         # self.analyse_tasks()
@@ -567,13 +1007,11 @@ class Editor:
         if not self.running_from_daily_tasks_file(tab):
             return
         row = tab.getCursorPosition()[0]
-        task = tab.text(row)
-        task = re.sub(r'\d{2}:\d{2}' + self.cfg['space'][1], "", task)
-        if (len(task) < 1
-                or self.cfg['rec_prop']
-                not in task
-                or task[0] not in self.cfg['active_task_prefixes'].split('\n')
-                or self.cfg['daily_rec_prop_val'] in task):
+        task = self.tokenizer.parse(tab.text(row))
+        if (not task.body
+                or task.rec is None
+                or not self.tokenizer.is_active(task)
+                or self.tokenizer.is_daily(task)):
             return
         tab_index = self._view.tabs.indexOf(tab)
         row = tab.getCursorPosition()[0]
@@ -590,13 +1028,11 @@ class Editor:
         """Add an ad hoc (incoming) task to an LA file or a DT file.
 
         Add an ad hoc (incoming) task. There are two main situations: adding an
-        ad hoc task to a life area (LA) file, and adding an add hoc task to a
-        daily tasks (DT) file. Different values for `extra_line_before` and
-        `extra_line_after` are given in those two cases. Then there is also the
-        case of adding an already finished task. A finished task is added at
-        the end of a daily tasks file (with `extra_line_before` and
-        `extra_line_after` suitably adjusted), while it is not added to a
-        portfolio file.
+        ad hoc task to a life area (LA) file, under its incoming heading, and
+        adding an add hoc task to a daily tasks (DT) file, under its tasks
+        proposed heading. Then there is also the case of adding an already
+        finished task. A finished task is added at the end of a daily tasks
+        file, while it is not added to a portfolio file.
 
         Notes
         -----
@@ -612,163 +1048,149 @@ class Editor:
             task_finished = result[3]
             # If incoming task is a work task, add work tag to existing tags
             if result[4]:
-                result[2] += self.cfg['space'][1] + self.cfg['work_tag']
-            lines = current_tab.text().split(NEWLINE)
-            extra_line_before = ''
-            extra_line_after = ''
+                result[2] += self.settings.space + self.settings.work_tag
             # If active tab is a portfolio file
-            if current_tab.path in self.cfg['portfolio_files'].split('\n'):
+            if self.settings.is_portfolio_file(current_tab.path):
                 # TODO Add a suitable message for why we're returning
                 if task_finished:
                     return
-                ordering_string = self.cfg['heading_prefix'] + \
-                    self.cfg['space'][1]
-                ordering_string += self.cfg['incoming_heading']
-                extra_line_before = NEWLINE
-                extra_line_after = ''
+                heading = self.settings.incoming_heading
             # TODO Check if active tab is a daily file (currently assumed!)
             else:
-                lines = lines[:-1]
-                ordering_string = self.cfg['heading_prefix'] + \
-                    self.cfg['space'][1]
-                ordering_string += self.cfg['tasks_proposed_heading']
-                extra_line_before = NEWLINE
-                extra_line_after = ''
-                if task_finished:
-                    extra_line_before = ''
-                    extra_line_after = NEWLINE
-            task_status_mark = self.cfg['open_task_prefix']
+                heading = self.settings.tasks_proposed_heading
+            ordering_string = self.settings.heading_prefix + \
+                self.settings.space + heading
+            task_status_mark = self.settings.open_task_prefix
             if task_finished:
-                task_status_mark = self.cfg['done_task_prefix']
-            # Start constructing the task to add
-            taux = extra_line_before + task_status_mark + self.cfg['space'][1]
-            # Add task and duration
-            taux += result[0] + self.cfg['space'][1] + \
-                self.cfg['dur_prop'] + result[1]
-            # Add tags
-            taux += self.cfg['space'][1] + result[2] + extra_line_after
-            # Generate new contents
-            contents = ""
-            for line in lines:
-                contents += line + NEWLINE
-                if ordering_string in line and not task_finished:
-                    contents += taux
+                task_status_mark = self.settings.done_task_prefix
+            # Construct the task to add: status, task, duration and tags
+            taux = task_status_mark + self.settings.space
+            taux += result[0] + self.settings.space + \
+                self.settings.dur_prop + result[1]
+            taux += self.settings.space + result[2]
+            # Finished tasks go to the end, others under the heading (after
+            # the empty line that follows it)
             if task_finished:
-                contents += taux + NEWLINE
-            contents = contents.rstrip(NEWLINE)
-            # Send contents to tab and save tab to file
-            current_tab.SendScintilla(
-                current_tab.SCI_SETTEXT, contents.encode(self.encoding))
-            self.save_file(current_tab)
+                current_tab.append_line(taux)
+            else:
+                lines = current_tab.text().split(NEWLINE)
+                rows = [row for row, line in enumerate(lines)
+                        if ordering_string in line]
+                with current_tab.undo_action():
+                    for row in reversed(rows):
+                        if row + 1 < len(lines) and not lines[row + 1]:
+                            row += 1
+                        current_tab.insert_line_after(row, taux)
+            self.save_file(tab=current_tab)
 
     def tag_current_line(self):
         """Function docstring."""
 
         current_tab = self._view.current_tab
         first_visible_line = current_tab.firstVisibleLine()
-        tag = self.cfg['tag_prefix'] + current_tab.label.split('.')[0]
+        tag = self.settings.tag_prefix + current_tab.label.split('.')[0]
         if FILE_CHANGED_ASTERISK in tag:
             tag = tag[:-2]
-        lines = current_tab.text().split(NEWLINE)
         row = current_tab.getCursorPosition()[0]
+        task = self.tokenizer.parse(current_tab.line(row))
         col = 0
-        contents = ""
-        for i, _ in enumerate(lines):
-            if (i == row
-                    and lines[i]
-                    and lines[i][0] in self.active_task_prefixes
-                    and tag not in lines[i]):
-                line = lines[i] + self.cfg['space'][1] + tag
-                contents += line + NEWLINE
-                col = len(line)
-            else:
-                contents += lines[i] + NEWLINE
-        contents = contents.rstrip(NEWLINE)
-        current_tab.SendScintilla(
-            current_tab.SCI_SETTEXT, contents.encode(ENCODING))
+        if self.tokenizer.is_active(task) and tag not in task.tags:
+            line = task.line + self.settings.space + tag
+            current_tab.replace_line(row, line)
+            col = len(line)
         current_tab.setFirstVisibleLine(first_visible_line)
         current_tab.setCursorPosition(row, col)
-        self.save_file(current_tab)
+        self.save_file(tab=current_tab)
 
     def toggle_tt(self):
         """Function docstring."""
 
         tab = self._view.current_tab
         first_visible_line = tab.firstVisibleLine()
-        lines = tab.text().split(NEWLINE)
         cursor_position = tab.getCursorPosition()
         row = cursor_position[0]
         col = cursor_position[1]
-        new_lines = []
-        for i, _ in enumerate(lines):
-            if (i == row
-                    and lines[i]
-                    and self.cfg['due_prop'] not in lines[i]
-                    and self.cfg['rec_prop'] not in lines[i]):
-                if lines[i][0] == self.cfg['top_task_prefix']:
-                    new_lines.append(self.cfg['open_task_prefix']
-                                     + lines[i][1:])
-                else:
-                    new_lines.append(self.cfg['top_task_prefix']
-                                     + lines[i][1:])
+        line = tab.line(row)
+        task = self.tokenizer.parse(line)
+        if line and task.due is None and task.rec is None:
+            if line[0] == self.settings.top_task_prefix:
+                tab.replace_line(row, self.settings.open_task_prefix
+                                 + line[1:])
             else:
-                new_lines.append(lines[i])
-        contents = ""
-        for i, _ in enumerate(new_lines):
-            contents += new_lines[i] + NEWLINE
-        contents = contents.rstrip(NEWLINE)
-        tab.SendScintilla(
-            tab.SCI_SETTEXT, contents.encode(ENCODING))
+                tab.replace_line(row, self.settings.top_task_prefix
+                                 + line[1:])
         tab.setFirstVisibleLine(first_visible_line)
         tab.setCursorPosition(row, col - 1)
-        self.save_file(tab)
+        self.save_file(tab=tab)
 
     def generate_ttl(self, tab=None):
-        """Generate Top Tasks List (TTL) for the current file (tab)."""
+        """Generate Top Tasks List (TTL) for the current file (tab).
+
+        Portfolio files that have not been edited since their TTL was last
+        generated are skipped. The file is only rewritten (and saved) if its
+        TTL has changed, or if it has unsaved changes. A tab that has not been
+        loaded yet is not loaded; its file is rewritten directly.
+
+        Returns
+        -------
+        bool
+            Whether the TTL section had to be rewritten.
+
+        """
 
         if not tab:
             tab = self._view.current_tab
-        tasks_aux = tab.text().split(NEWLINE)
+        if tab.path in self.ttl_up_to_date:
+            return False
+        text = tab.text()
+        tasks_aux = text.split(NEWLINE)
         start = -1
         ttl_tasks = []
         for i, _ in enumerate(tasks_aux):
             if tasks_aux[i]:
                 if start > -1:
-                    if tasks_aux[i][0] == self.cfg['top_task_prefix']:
+                    task = self.tokenizer.parse(tasks_aux[i])
+                    if task.prefix == self.settings.top_task_prefix:
                         ttl_tasks.append(tasks_aux[i])
-                elif (tasks_aux[i][0] == self.cfg['heading_prefix']
-                        and self.cfg['ttl_heading'] not in tasks_aux[i]):
+                elif (tasks_aux[i][0] == self.settings.heading_prefix
+                        and self.settings.ttl_heading not in tasks_aux[i]):
                     start = i
-        tasks = [self.cfg['heading_prefix'] + self.cfg['space'][1]
-                 + self.cfg['ttl_heading'], '']
+        tasks = [self.settings.heading_prefix + self.settings.space
+                 + self.settings.ttl_heading, '']
         for ttl_task in ttl_tasks:
             tasks.append(ttl_task)
         tasks.append('')
         for i in range(start, len(tasks_aux)):
             tasks.append(tasks_aux[i])
-        contents = ""
-        for i, _ in enumerate(tasks):
-            contents += tasks[i] + NEWLINE
-        contents = contents.rstrip(NEWLINE)
-        tab.SendScintilla(tab.SCI_SETTEXT, contents.encode(self.encoding))
-        self.save_file(tab.path, tab)
+        while len(tasks) > 1 and not tasks[-1]:
+            tasks.pop()
+        if self._view.is_placeholder(tab):
+            contents = NEWLINE.join(tasks)
+            rebuilt = contents != text
+            if rebuilt:
+                self.write_file(tab.path, contents)
+        else:
+            rebuilt = tab.set_lines(tasks)
+            if rebuilt or tab.isModified():
+                self.save_file(tab.path, tab)
+        if self.settings.is_portfolio_file(tab.path):
+            self.ttl_up_to_date.add(tab.path)
+        return rebuilt
 
     def generate_ttls(self):
         """Generate Top Tasks Lists (TTLs) for all portfolio files."""
 
-        for widget in self._view.widgets:
-            current_tab_index = self._view.tabs.indexOf(widget)
-            self._view.tabs.setCurrentIndex(current_tab_index)
-            if widget.path in self.cfg['portfolio_files'].split('\n'):
-                self.generate_ttl(widget)
+        portfolio_tabs = [widget for widget in self._view.widgets
+                          if self.settings.is_portfolio_file(widget.path)]
+        rebuilt = sum(self.generate_ttl(tab) for tab in portfolio_tabs)
+        self._view.show_status_message(
+            "TTLs rebuilt in {} of {} portfolio files.".format(
+                rebuilt, len(portfolio_tabs)))
 
     def extract_auxiliaries(self):
-        """Function docstring."""
+        """Extract all auxiliary files (daily, booked, periodic, shlist)."""
 
-        self.extract_booked()
-        self.extract_daily()
-        self.extract_periodic()
-        self.extract_shlist()
+        self.update_auxiliary_files(AUXILIARIES)
 
     def prepare_day_plan(self):
         """Function docstring."""
@@ -780,9 +1202,13 @@ class Editor:
             str(danas.day), str(danas.month), str(danas.year))
         if result:
             target_day, target_month, target_year = result
-            model.prepare_todays_tasks.prepare_todays_tasks(
-                target_day, target_month, target_year,
-                self.cfg['atlas_config_file'])
+            # Imported here, as it is not needed to start up
+            from model.prepare_todays_tasks import prepare_todays_tasks
+            # Auxiliary files are read from disk
+            self.wait_for_saves()
+            prepare_todays_tasks(
+                target_day, target_month, target_year, self.settings,
+                self.tokenizer)
         else:
             return
         file_name = str(target_year)
@@ -792,18 +1218,14 @@ class Editor:
         if target_day < 10:
             file_name += "0"
         file_name += str(target_day)
-        file_name += self.cfg['atlas_files_extension']
+        file_name += self.settings.atlas_files_extension
         # Close tab with the same name if it is alreday copen
-        idx = -1
-        for i in range(self._view.tab_count):
-            if (self._view.tabs.widget(i).path
-                    == self.cfg['portfolio_base_dir'] + file_name):
-                idx = i
-        if idx > -1:
-            self._view.tabs.removeTab(idx)
-        shutil.copyfile(self.cfg['today_file'],
-                        self.cfg['portfolio_base_dir'] + file_name)
-        self.open_file(self.cfg['portfolio_base_dir'] + file_name)
+        tab = self.find_widget(self.settings.portfolio_base_dir + file_name)
+        if tab is not None:
+            self.close_tab(tab)
+        shutil.copyfile(self.settings.today_file,
+                        self.settings.portfolio_base_dir + file_name)
+        self.open_file(self.settings.portfolio_base_dir + file_name)
 
     def analyse_tasks(self):
         """Function docstring."""
@@ -815,32 +1237,30 @@ class Editor:
         work_duration = 0
         earned_duration = 0
         work_earned_duration = 0
-        for task in tasks_aux:
-            if task:
-                task = re.sub(r'\d{2}:\d{2}' + self.cfg['space'][1], "", task)
-                if task[0] in self.cfg['active_task_prefixes'].split('\n'):
-                    if self.cfg['dur_prop'] not in task:
-                        self._view.show_message("Please define dur:\n" + task)
-                        return
-                    else:
-                        duration = self.get_task_duration(task)
-                        total_duration += duration
-                        if self.cfg['work_tag'] in task:
-                            work_duration += duration
-                elif task[0] == self.cfg['done_task_prefix']:
-                    duration = self.get_task_duration(task)
-                    earned_duration += duration
-                    if self.cfg['work_tag'] in task:
-                        work_earned_duration += duration
+        for line in tasks_aux:
+            task = self.tokenizer.parse(line)
+            if self.tokenizer.is_active(task):
+                if task.duration is None:
+                    self._view.show_message("Please define dur:\n" + task.body)
+                    return
+                else:
+                    total_duration += task.duration
+                    if self.settings.work_tag in task.tags:
+                        work_duration += task.duration
+            elif task.prefix == self.settings.done_task_prefix:
+                duration = self.get_task_duration(task)
+                earned_duration += duration
+                if self.settings.work_tag in task.tags:
+                    work_earned_duration += duration
         # Get rid of previous header information
         for task in tasks_aux:
-            if task and task[0] is not self.cfg['info_task_prefix']:
+            if task and task[0] is not self.settings.info_task_prefix:
                 tasks.append(task)
             # else:
                 # tasks.append(task)
         statistic = (
-            f"{self.cfg['info_task_prefix'] + self.cfg['space'][1]}"
-            f"{self.cfg['earned_time_balance_form']}"
+            f"{self.settings.info_task_prefix + self.settings.space}"
+            f"{self.settings.earned_time_balance_form}"
             f"{self.mins_to_hh_mm(earned_duration)} "
             f"({self.mins_to_hh_mm(work_earned_duration)})"
         )
@@ -851,41 +1271,29 @@ class Editor:
             f"({self.mins_to_hh_mm(work_duration)})"
         )
         tasks.insert(0, statistic)
-        contents = ""
-        for i, _ in enumerate(tasks):
-            contents += tasks[i] + NEWLINE
-        contents = contents.rstrip(NEWLINE)
-        tab.SendScintilla(tab.SCI_SETTEXT, contents.encode(self.encoding))
+        tab.set_lines(tasks)
 
     def schedule_tasks(self):
-        """Function docstring."""
+        """Stamp active tasks with their start time, from now on.
+
+        The timeline of the tab is kept (see `model.schedule`), so that only
+        the lines from the first one edited since the previous scheduling
+        are gone through again, when scheduling within the same minute, and
+        only the stamps that change are replaced. Trailing empty lines are
+        removed.
+
+        """
 
         tab = self._view.current_tab
-        tasks = tab.text().split(NEWLINE)
-        start_time = datetime.datetime.now()
-        scheduled_tasks = []
-        for task in tasks:
-            if task:
-                task = re.sub(r'\d{2}:\d{2}' + self.cfg['space'][1], "", task)
-                if task[0] in self.cfg['active_task_prefixes'].split('\n'):
-                    sts = f"{start_time.hour:02}:{start_time.minute:02}"
-                    idx = 2 - 2
-                    # Has the task already been schedulled?
-                    if task[4] == ':':
-                        idx = 10 - 2
-                    new_task = sts + self.cfg['space'][1] + task[idx:]
-                    scheduled_tasks.append(new_task)
-                    start_time += datetime.timedelta(
-                        minutes=self.get_task_duration(task))
-                else:
-                    scheduled_tasks.append(task)
-            else:
-                scheduled_tasks.append(task)
-        contents = ""
-        for task in scheduled_tasks:
-            contents += task + NEWLINE
-        contents = contents.rstrip(NEWLINE)
-        tab.SendScintilla(tab.SCI_SETTEXT, contents.encode(self.encoding))
+        if tab.schedule is None:
+            tab.schedule = Schedule(self.tokenizer, self.get_task_duration)
+            tab.lines_changed.connect(tab.schedule.lines_changed)
+        start = datetime.datetime.now().replace(second=0, microsecond=0)
+        with tab.undo_action():
+            tab.schedule.reschedule(start, tab.lines(), tab.line,
+                                    tab.replace_line)
+            while tab.lines() > 1 and not tab.line(tab.lines() - 1):
+                tab.delete_line(tab.lines() - 1)
 
     def extract_earned_time(self):
         """Function docstring."""
@@ -893,81 +1301,143 @@ class Editor:
         ctab = self._view.current_tab
         file_name = os.path.basename(ctab.path).split('.')[0]
         # Check that we're running from a daily tasks file
-        if not re.match(r'\d{8}', file_name):
+        if not self.settings.daily_file_name.match(file_name):
             message = "This command can only be run" \
                       "from a daily tasks file."
             self._view.show_message(message)
             return
         tasks = ctab.text().split(NEWLINE)
+        extract = None
         for task in tasks:
-            if self.cfg['earned_time_balance_form'] in task:
-                extract = file_name + self.cfg['space'][1] + task + NEWLINE
-        with open(self.cfg['earned_times_file'], 'a') as file_:
-            file_.write(extract)
+            if self.settings.earned_time_balance_form in task:
+                extract = file_name + self.settings.space + task
+        if extract is None:
+            self._view.show_message("There is no earned time to extract. "
+                                    "Please analyse the tasks first.")
+            return
+        # NumPy takes a while to import
+        from model.earned_times import EarnedTimes
+        EarnedTimes(self.settings.earned_times_file,
+                    self.settings).append(extract)
+
+    def review_earned_time(self):
+        """Show the time earned by week, month and year in a new tab.
+
+        Also shows the average time earned per day over the last week, month
+        and year. Time earned on work tasks is in parentheses.
+
+        """
+
+        from model.earned_times import EarnedTimes
+        earned_times = EarnedTimes(self.settings.earned_times_file,
+                                   self.settings)
+        if not len(earned_times.dates):
+            self._view.show_message("There is no earned time yet.")
+            return
+        heading = self.settings.heading_prefix + self.settings.space
+        lines = [heading + "Earned time review", ""]
+        for title, period, count in (("Weeks", 'week', 12),
+                                     ("Months", 'month', 12),
+                                     ("Years", 'year', None)):
+            lines.append(heading + title)
+            rows = list(zip(*earned_times.totals_by(period)))
+            if count:
+                rows = rows[-count:]
+            for start, minutes, work_minutes in rows:
+                lines.append(f"{start} {self.mins_to_hh_mm(minutes)} "
+                             f"({self.mins_to_hh_mm(work_minutes)})")
+            lines.append("")
+        lines.append(heading + "Daily average")
+        for title, window in (("Week", 7), ("Month", 30), ("Year", 365)):
+            _, total, work = earned_times.rolling_average(window)
+            lines.append(f"{title} {self.mins_to_hh_mm(round(total[-1]))} "
+                         f"({self.mins_to_hh_mm(round(work[-1]))})")
+        self._view.add_tab(None, NEWLINE.join(lines) + NEWLINE, NEWLINE)
 
     def log_progress(self):
-        """Function docstring."""
+        """Log progress: add an entry to the log file.
+
+        The entry is put first in the log file, or appended to it if the
+        `log_storage` setting is `append` (see `model.progress_log`). Either
+        way, the log tab shows it first, and is focused. The first entry of a
+        new period moves older entries out to log partitions, if the log is
+        partitioned (see `model.log_partitions`).
+
+        """
 
         log_entry = self.format_log_entry(self._view.show_log_progress())
-        if log_entry:
-            log_tab_index = -1
-            for i in range(self._view.tab_count):
-                if (self._view.tabs.widget(i).path
-                        == self.cfg['portfolio_log_file']):
-                    log_tab_index = i
-            if log_tab_index > -1:
-                curr_stamp = datetime.datetime.now()
-                current_tab_index = self._view.tabs.indexOf(
-                        self._view.current_tab)
-                self._view.tabs.setCurrentIndex(log_tab_index)
-                log_tab = self._view.tabs.widget(log_tab_index)
-                lines = log_tab.text().split(NEWLINE)
-                for line in lines:
-                    if line[:4] == self.cfg['log_entry_prefix']:
-                        parts = line.split(self.cfg['date_separator'])
-                        prev_stamp = datetime.datetime(
-                            int(parts[1]),  # year
-                            int(parts[2]),  # month
-                            int(parts[3]),  # day
-                            int(parts[4]),  # hours
-                            int(parts[5]),  # minutes
-                            int(parts[6]))  # seconds
-                        break
-                diff = curr_stamp - prev_stamp
-                contents = (self.cfg['log_entry_prefix']
-                            + "{}{}{:02d}{}{:02d}".format(
-                                curr_stamp.year, self.cfg['date_separator'],
-                                curr_stamp.month, self.cfg['date_separator'],
-                                curr_stamp.day))
-                contents += "{}{:02d}{}{:02d}{}{:02d}\n" \
-                    .format(self.cfg['date_separator'], curr_stamp.hour,
-                            self.cfg['date_separator'], curr_stamp.minute,
-                            self.cfg['date_separator'], curr_stamp.second)
-                msh = {
-                    'min': 0,
-                    'sec': 0,
-                    'hrs': 0,
-                }
-                if diff.seconds > 59:
-                    msh['min'] = diff.seconds // 60
-                    msh['sec'] = diff.seconds % 60
-                else:
-                    msh['sec'] = diff.seconds
-                if msh['min'] > 59:
-                    msh['hrs'] = msh['min'] // 60
-                    msh['min'] = msh['min'] % 60
-                text_aux = "from previous entry"
-                contents += "{} days, {}{}{:02d}{}{:02d} {}\n". \
-                    format(diff.days, msh['hrs'], self.cfg['time_separator'],
-                           msh['min'], self.cfg['time_separator'], msh['sec'],
-                           text_aux)
-                contents += log_entry + NEWLINE + NEWLINE + log_tab.text()
-                log_tab.SendScintilla(
-                    log_tab.SCI_SETTEXT, contents.encode(ENCODING))
-                self.save_file(log_tab)
-                self._view.tabs.setCurrentIndex(current_tab_index)
+        if not log_entry:
+            return
+        path = self.settings.portfolio_log_file
+        log_tab = self.find_widget(path)
+        if log_tab is not None:
+            # Focusing the tab loads it
+            self._view.tabs.setCurrentWidget(log_tab)
+            log_tab = self._view.current_tab
+        now = datetime.datetime.now()
+        if self.progress_log is not None:
+            previous = self.progress_log.last_stamp()
+        elif log_tab is not None:
+            previous = None
+            for row in range(log_tab.lines()):
+                previous = parse_stamp(log_tab.line(row), self.settings)
+                if previous is not None:
+                    break
+        else:
+            return
+        if (self.log_partitions is not None and previous is not None
+                and self.log_partitions.key(previous)
+                != self.log_partitions.key(now)):
+            self.partition_log(now, log_tab)
+        lines = format_entry(now, previous, log_entry, self.settings)
+        if self.progress_log is not None:
+            self.progress_log.append(lines, now)
+            if log_tab is not None:
+                with log_tab.editable():
+                    log_tab.replace_lines(0, 0, lines)
+                log_tab.setModified(False)
         else:
+            log_tab.replace_lines(0, 0, lines)
+            self.save_file(tab=log_tab)
+
+    def partition_log(self, now, log_tab):
+        """Move log entries of periods before `now` to log partitions.
+
+        Unsaved changes to the log are saved first. The log tab, if loaded,
+        is then reloaded.
+
+        """
+
+        path = self.settings.portfolio_log_file
+        if log_tab is not None and log_tab.isModified():
+            self.save_file(tab=log_tab)
+        self.wait_for_saves()
+        try:
+            keys = self.log_partitions.rotate(
+                now, newest_first=self.progress_log is None)
+        except OSError as ex:
+            logging.error("Log not partitioned. Error: %s", ex)
+            return
+        if log_tab is not None:
+            log_tab.reload(self.load_tab(path))
+        if keys:
+            self._view.show_status_message(
+                "Log entries moved to partitions {}.".format(
+                    ", ".join(keys)))
+
+    def browse_log_archive(self):
+        """Browse the log partitions in a read-only window."""
+
+        partitions = []
+        if self.log_partitions is not None:
+            partitions = self.log_partitions.partitions()
+        if not partitions:
+            self._view.show_status_message("There are no log partitions.")
             return
+        encoding = self.encoding
+        self._view.show_log_viewer(
+            [(os.path.basename(path), path) for _, path in partitions],
+            lambda path: PagedLines(path, encoding))
 
     def log_expense(self):
         """Log expense."""
@@ -976,148 +1446,167 @@ class Editor:
         return log_entry
 
     def back_up(self):
-        """Back up."""
+        """Back up the portfolio directory as an incremental snapshot.
 
-        now = datetime.datetime.now()
+        Only files changed since the previous snapshot are stored (see
+        `model.backup`), leaving out derived files (see `derived_files()`),
+        then old snapshots are pruned according to the `backup_keep_*`
+        settings.
+
+        """
+
+        settings = self.settings
+        store = BackupStore(settings.backup_dir)
+        self.wait_for_saves()
         try:
-            shutil.copytree(
-                self.cfg['portfolio_base_dir'],
-                self.cfg['backup_dir'] + now.strftime("%Y%m%d%H%M%S"))
-        except shutil.Error as ex:
-            logging.error("Directory not copied. Error: %s", ex)
+            snapshot = store.back_up(settings.portfolio_base_dir,
+                                     exclude_names=self.derived_files())
+            pruned = store.prune(settings.backup_keep_last,
+                                 settings.backup_keep_daily,
+                                 settings.backup_keep_monthly)
         except OSError as ex:
-            logging.error("Directory not copied. Error: %s", ex)
+            logging.error("Portfolio not backed up. Error: %s", ex)
+            return
+        self._view.show_status_message(
+            "Backed up {} files to snapshot {} ({} changed, {} bytes stored);"
+            " {} old snapshots pruned.".format(
+                snapshot['files'], snapshot['name'], snapshot['stored_files'],
+                snapshot['stored_bytes'], len(pruned)))
+
+    def back_up_archive(self):
+        """Back up the portfolio directory to a compressed archive.
+
+        The archive is written and verified by a background thread (see
+        `model.backup.write_archive()`), which reports its progress in the
+        status bar.
+
+        """
+
+        if self.backup_future is not None and not self.backup_future.done():
+            self._view.show_status_message("A backup is already running.")
+            return
+        settings = self.settings
+        compression = settings.backup_compression
+        path = os.path.join(
+            settings.backup_dir, 'archives', 'atlas-{}{}'.format(
+                datetime.datetime.now().strftime("%Y%m%d%H%M%S"),
+                ARCHIVE_EXTENSIONS.get(compression, '.tar.' + compression)))
+        view = self._view
+        self.wait_for_saves()
+        self.backup_future = self.backup_executor.submit(
+            write_archive, settings.portfolio_base_dir, path, compression,
+            settings.backup_dir, view.backup_progress.emit,
+            self.derived_files())
+        self.backup_future.add_done_callback(
+            lambda future: view.backup_finished.emit(
+                path, None if future.exception() else future.result(),
+                future.exception()))
+
+    def derived_files(self):
+        """Return the patterns of the names of files not to back up.
+
+        These files are derived from others, and rebuilt when missing: the
+        search index, the store of archived daily tasks files, the line
+        indexes of log partitions, the sidecar of an append-only log, and
+        the earned times arrays. The SQLite databases are rewritten as files
+        are saved, and might be copied in the middle of a write.
+
+        """
+
+        from model.daily_archive import STORE_NAME
+        from model.log_partitions import INDEX_SUFFIX
+        from model.progress_log import SIDECAR_SUFFIX
+        from model.search_index import INDEX_NAME
+        return (
+            # With their journals
+            INDEX_NAME + '*', STORE_NAME + '*',
+            '*' + INDEX_SUFFIX, '*' + SIDECAR_SUFFIX,
+            # `model.earned_times.STORE_SUFFIX`, not imported as it needs
+            # NumPy
+            os.path.basename(self.settings.earned_times_file) + '.bin',
+        )
+
+    def backup_progress(self, done, total):
+        """Show the progress of the backup being written."""
+
+        # Every 5%, so as not to flood the status bar
+        if done == total or done * 20 // total != (done - 1) * 20 // total:
+            self._view.show_status_message(
+                "Backing up portfolio: {} of {} files...".format(done, total))
+
+    def backup_finished(self, path, result, error):
+        """Report the outcome of a backup to archive `path`."""
+
+        if error is not None:
+            logging.error("Portfolio not backed up. Error: %s", error)
+            self._view.show_message("Portfolio not backed up.", str(error))
+            return
+        self._view.show_status_message(
+            "Backed up {} files to {} ({} bytes, verified).".format(
+                result['files'], os.path.basename(path), result['bytes']))
+
+    def wait_for_backup(self):
+        """Wait until the backup being written, if any, is done."""
+
+        if self.backup_future is not None:
+            concurrent.futures.wait([self.backup_future])
+            self._view.process_pending_events()
 
     def sort_periodic_tasks(self):
         """Sort lines in the current tab."""
 
         tab = self._view.current_tab
         first_visible_line = tab.firstVisibleLine()
-        tasks = tab.text().split(NEWLINE)
-        contents = ""
-        for task in sorted(tasks):
-            if len(task) > 0:
-                contents += task + NEWLINE
-        tab.SendScintilla(tab.SCI_SETTEXT, contents.encode(ENCODING))
+        tasks = [task for task in sorted(tab.text().split(NEWLINE)) if task]
+        tab.set_lines(tasks + [''])
         tab.setFirstVisibleLine(first_visible_line)
         tab.setCursorPosition(0, 0)
 
     def extract_daily(self):
         """Extract to file tasks with the daily-periodic property defined."""
 
-        current_tab = self._view.current_tab
-        current_tab_index = self._view.tabs.indexOf(current_tab)
-        daily_tasks = []
-        daily_tab_index = -1
-        for widget in self._view.widgets:
-            if widget.path in self.cfg['portfolio_files'].split('\n'):
-                lines = widget.text().split(NEWLINE)
-                for line in lines:
-                    if (self.cfg['daily_rec_prop_val'] in line
-                            and line[0] in self.active_task_prefixes):
-                        daily_tasks.append(line)
-        for i in range(self._view.tab_count):
-            if self._view.tabs.widget(i).path == self.cfg['daily_file']:
-                daily_tab_index = i
-        contents = ""
-        for i, _ in enumerate(daily_tasks):
-            contents += daily_tasks[i] + NEWLINE
-        contents = contents.rstrip(NEWLINE)
-        self._view.tabs.setCurrentIndex(daily_tab_index)
-        daily_tab = self._view.tabs.widget(daily_tab_index)
-        daily_tab.SendScintilla(daily_tab.SCI_SETTEXT,
-                                contents.encode(self.encoding))
-        self.save_file(daily_tab.path, daily_tab)
-        self._view.tabs.setCurrentIndex(current_tab_index)
+        self.update_auxiliary_files(('daily',))
 
     def extract_booked(self):
         """Extract to file tasks with the due-date property defined."""
 
-        current_tab = self._view.current_tab
-        current_tab_index = self._view.tabs.indexOf(current_tab)
-        booked_tasks = []
-        booked_tab_index = -1
-        for widget in self._view.widgets:
-            if widget.path in self.cfg['portfolio_files'].split('\n'):
-                lines = widget.text().split(NEWLINE)
-                for line in lines:
-                    if (self.cfg['due_prop'] in line
-                            and self.cfg['rec_prop'] not in line
-                            and line[0] in self.active_task_prefixes):
-                        booked_tasks.append(line)
-        for i in range(self._view.tab_count):
-            if self._view.tabs.widget(i).path == self.cfg['booked_file']:
-                booked_tab_index = i
-        booked_tab = self._view.tabs.widget(booked_tab_index)
-        contents = ""
-        for i, _ in enumerate(booked_tasks):
-            contents += booked_tasks[i] + NEWLINE
-        contents = contents.rstrip(NEWLINE)
-        self._view.tabs.setCurrentIndex(booked_tab_index)
-        booked_tab = self._view.tabs.widget(booked_tab_index)
-        booked_tab.SendScintilla(booked_tab.SCI_SETTEXT,
-                                 contents.encode(self.encoding))
-        self.save_file(booked_tab.path, booked_tab)
-        self._view.tabs.setCurrentIndex(current_tab_index)
+        self.update_auxiliary_files(('booked',))
 
     def extract_periodic(self):
         """Extract to file tasks with the periodic property defined."""
 
-        current_tab = self._view.current_tab
-        current_tab_index = self._view.tabs.indexOf(current_tab)
-        periodic_tasks = []
-        periodic_tab_index = -1
-        for widget in self._view.widgets:
-            if widget.path in self.cfg['portfolio_files'].split('\n'):
-                lines = widget.text().split(NEWLINE)
-                for line in lines:
-                    if (self.cfg['rec_prop'] in line
-                            and self.cfg['daily_rec_prop_val'] not in line
-                            and line[0] in self.active_task_prefixes):
-                        periodic_tasks.append(line)
-        for i in range(self._view.tab_count):
-            if self._view.tabs.widget(i).path == self.cfg['periodic_file']:
-                periodic_tab_index = i
-        periodic_tab = self._view.tabs.widget(periodic_tab_index)
-        contents = ""
-        for i, _ in enumerate(periodic_tasks):
-            contents += periodic_tasks[i] + NEWLINE
-        contents = contents.rstrip(NEWLINE)
-        self._view.tabs.setCurrentIndex(periodic_tab_index)
-        periodic_tab = self._view.tabs.widget(periodic_tab_index)
-        periodic_tab.SendScintilla(periodic_tab.SCI_SETTEXT,
-                                   contents.encode(self.encoding))
-        self.save_file(periodic_tab.path, periodic_tab)
-        self._view.tabs.setCurrentIndex(current_tab_index)
+        self.update_auxiliary_files(('periodic',))
 
     def extract_shlist(self):
         """Extract to file tasks with the shopping list category defined."""
 
-        current_tab = self._view.current_tab
-        current_tab_index = self._view.tabs.indexOf(current_tab)
-        shlist_tasks = []
-        shlist_tab_index = -1
-        for widget in self._view.widgets:
-            if widget.path in self.cfg['portfolio_files'].split('\n'):
-                lines = widget.text().split(NEWLINE)
-                for line in lines:
-                    if (self.cfg['shlist_cat'] in line
-                            and line[0] in self.active_task_prefixes):
-                        shlist_tasks.append(line)
-        for i in range(self._view.tab_count):
-            if self._view.tabs.widget(i).path == self.cfg['shlist_file']:
-                shlist_tab_index = i
-        shlist_tab = self._view.tabs.widget(shlist_tab_index)
-        contents = ""
-        for i, _ in enumerate(shlist_tasks):
-            contents += shlist_tasks[i] + NEWLINE
-        contents = contents.rstrip(NEWLINE)
-        self._view.tabs.setCurrentIndex(shlist_tab_index)
-        shlist_tab = self._view.tabs.widget(shlist_tab_index)
-        shlist_tab.SendScintilla(shlist_tab.SCI_SETTEXT,
-                                 contents.encode(self.encoding))
-        self.save_file(shlist_tab.path, shlist_tab)
-        self._view.tabs.setCurrentIndex(current_tab_index)
+        self.update_auxiliary_files(('shlist',))
+
+    def update_auxiliary_files(self, names):
+        """Extract auxiliary files `names` in a single pass over portfolio.
+
+        Every portfolio line is classified once (see
+        `model.auxiliaries.extract_auxiliaries()`). Each auxiliary tab is then
+        updated and saved at most once, and only if its contents changed.
+        Auxiliary files that are not open, or not loaded yet, are written to
+        disk directly.
+
+        """
+
+        texts = [widget.text() for widget in self._view.widgets
+                 if self.settings.is_portfolio_file(widget.path)]
+        extracted = extract_auxiliaries(
+            texts, self.settings, self.tokenizer, names)
+        for name, tasks in extracted.items():
+            path = auxiliary_file(self.settings, name)
+            contents = NEWLINE.join(tasks)
+            tab = self.find_widget(path)
+            if tab is None or self._view.is_placeholder(tab):
+                self.write_file(path, contents)
+                continue
+            tab.set_lines(tasks or [''])
+            if tab.isModified():
+                self.save_file(path, tab)
 
     # Utilities
 
@@ -1132,9 +1621,9 @@ class Editor:
         :returns string: log entry after formatting
         """
 
-        if entry and len(entry) > self.cfg.getint('log_line_length'):
-            entry = entry[:self.cfg.getint('log_line_length')] + NEWLINE \
-                + entry[self.cfg.getint('log_line_length'):]
+        if entry and len(entry) > self.settings.log_line_length:
+            entry = entry[:self.settings.log_line_length] + NEWLINE \
+                + entry[self.settings.log_line_length:]
         return entry
 
     def get_task_duration(self, task):
@@ -1142,22 +1631,20 @@ class Editor:
 
         Parameters
         ----------
-        task : str
-            Task definition.
+        task : str or model.tokenizer.Task
+            Task definition, or parsed task definition.
 
         Returns
         -------
         int
             Task duration as defined in task definition. Assumed to be in
-            minutes.
+            minutes. Zero if the task does not define a duration.
 
         """
 
-        words = task.split(self.cfg['space'][1])
-        for word in words:
-            if self.cfg['dur_prop'] in word:
-                duration = int(word.split(self.cfg['time_separator'])[1])
-        return int(duration)
+        if isinstance(task, str):
+            task = self.tokenizer.parse(task)
+        return task.duration or 0
 
     def get_task_text(self, task):
         """Get task text without properties, tags, categories, and symbols.
@@ -1169,17 +1656,7 @@ class Editor:
         :returns string: task text
         """
 
-        words = task.split(self.cfg['space'][1])
-        task_text = ''
-        for word in words:
-            # Beware of special letters (and words beginning with them)
-            if (self.word_has_active_task_prefix(word)
-                    or self.props_in_word(word)
-                    or self.word_has_reserved_word_prefix(word)):
-                pass
-            else:
-                task_text += word + self.cfg['space'][1]
-        return task_text.rstrip(self.cfg['space'][1])
+        return self.tokenizer.parse(task).text
 
     def running_from_daily_tasks_file(self, tab):
         """Check if the command is issued while a daily tasks tab is active.
@@ -1190,7 +1667,7 @@ class Editor:
         """
 
         file_name = os.path.basename(tab.path).split('.')[0]
-        if not re.match(r'\d{8}', file_name):
+        if not self.settings.daily_file_name.match(file_name):
             message = ("This command can only be run"
                        "from a daily tasks file.")
             self._view.show_message(message)
@@ -1218,7 +1695,7 @@ class Editor:
 
         hours_ = mins // 60
         mins_ = mins % 60
-        return f"{hours_:02}{self.settings['time_separator']}{mins_:02}"
+        return f"{hours_:02}{self.settings.time_separator}{mins_:02}"
 
     def update_due_date(self, periodic_task):
         """Update the due date of a periodic task.
@@ -1238,47 +1715,24 @@ class Editor:
 
         """
 
-        calculate_from_due_date = False
-        words = periodic_task.split(self.cfg['space'][1])
-        for word in words:
-            if self.cfg['due_prop'] in word:
-                due = word[4:]
-            elif self.cfg['rec_prop'] in word:
-                if self.cfg['tag_prefix'] in word:
-                    calculate_from_due_date = True
-                rec = ''
-                for char in word:
-                    if char.isnumeric():
-                        rec += char
-                rec_period = word[-1]
-        rec = int(rec)
-        _year, _month, _day = due.split(self.cfg['date_separator'])
-        if calculate_from_due_date:
-            new_due = datetime.date(int(_year), int(_month), int(_day))
+        from dateutil.relativedelta import relativedelta
+        task = self.tokenizer.parse(periodic_task)
+        rec, rec_period, calculate_from_due_date = task.rec
+        if calculate_from_due_date and task.due is not None:
+            new_due = task.due_date
         else:
             new_due = datetime.datetime.now()
-        if rec_period == self.cfg['month_symbol']:
+        if rec_period == self.settings.month_symbol:
             new_due += relativedelta(months=rec)
-        elif rec_period == self.cfg['year_symbol']:
+        elif rec_period == self.settings.year_symbol:
             new_due += relativedelta(years=rec)
         else:
             new_due += relativedelta(days=rec)
-        updated_periodic_task = (re.sub(self.cfg['due_prop']
-                                 + r'\d{4}-\d{2}-\d{2}',
-                                 self.cfg['due_prop']
-                                 + new_due.strftime("%Y-%m-%d"),
-                                 periodic_task))
+        updated_periodic_task = self.settings.due_date.sub(
+            self.settings.due_prop + new_due.strftime("%Y-%m-%d"),
+            periodic_task)
         return updated_periodic_task
 
-    def props_in_word(self, word):
-        """Check if a property definition is contained in `word`."""
-
-        if (self.cfg['due_prop'] in word
-                or self.cfg['dur_prop'] in word
-                or self.cfg['rec_prop'] in word):
-            return True
-        return False
-
     def save_session_settings(self):
         x = self._view.x()
         y = self._view.y()
@@ -1291,15 +1745,3 @@ class Editor:
         # TODO Rename settings_file to config_file
         with open(self.config_file, 'w') as config_file:
             self.config.write(config_file, False)
-
-    def word_has_active_task_prefix(self, word):
-        if (len(word) == 1
-                and word[0] in self.cfg['active_task_prefixes'].split('\n')):
-            return True
-        return False
-
-    def word_has_reserved_word_prefix(self, word):
-        if (word
-                and word[0] in self.cfg['reserved_word_prefixes'].split('\n')):
-            return True
-        return False
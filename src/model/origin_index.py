@@ -0,0 +1,202 @@
+"""Index of where active tasks are defined in portfolio files.
+
+Marking a task done in a daily tasks file also marks it done "at origin", i.e.
+in the portfolio (life area) file where it is defined. Instead of scanning
+every portfolio file line by line on each command, `OriginIndex` maps the
+normalised text of every active task to its location. Files are re-indexed
+only after they change, and only when the index is next used.
+
+Lines edited in a tab are updated as they change instead (see
+`OriginIndex.replace_lines()`): only the lines replaced are parsed again, and
+the rows of the tasks after them are moved if lines were added or removed. A
+heading added, removed or edited changes the section of the lines after it,
+and the file is then re-indexed on next use.
+
+"""
+
+import bisect
+
+
+class OriginIndex:
+    """Map task text to the location of its definition.
+
+    Parameters
+    ----------
+    settings : model.settings.Settings
+        Portfolio settings.
+    tokenizer : model.tokenizer.Tokenizer
+        Tokenizer used to parse task definitions.
+    get_text : callable
+        Called with a portfolio file path, returns the current contents of
+        that file (e.g. the text of its tab), or None if it is not available.
+
+    Notes
+    -----
+    Tasks in the TTL section are copies of tasks defined elsewhere in the same
+    file, and are not indexed. If the same task text is defined more than
+    once, the first definition (in portfolio files order) wins.
+
+    """
+
+    def __init__(self, settings, tokenizer, get_text):
+        self.settings = settings
+        self.tokenizer = tokenizer
+        self.get_text = get_text
+        self._order = {path: i
+                       for i, path in enumerate(settings.portfolio_files)}
+        # Normalised task text -> sorted list of (order, path, row, section)
+        self._locations = {}
+        # Path -> (key, section, in_ttl, is_heading) of each line of the file,
+        # key being the normalised task text if it is indexed, else None
+        self._rows = {}
+        self._dirty = set()
+
+    @staticmethod
+    def normalise(text):
+        """Normalise task text for use as an index key."""
+
+        return ' '.join(text.split())
+
+    def rebuild(self):
+        """Re-index all portfolio files."""
+
+        self._dirty.update(self.settings.portfolio_files)
+        self.refresh()
+
+    def invalidate(self, path):
+        """Mark `path` as changed; it is re-indexed on next use."""
+
+        if path in self._order:
+            self._dirty.add(path)
+
+    def refresh(self):
+        """Re-index files that changed since they were last indexed."""
+
+        while self._dirty:
+            self.index_file(self._dirty.pop())
+
+    def index_file(self, path):
+        """(Re-)index portfolio file `path`."""
+
+        self._forget(path)
+        text = self.get_text(path)
+        if text is None:
+            return
+        order = self._order[path]
+        rows = []
+        section = ''
+        in_ttl = False
+        for row, line in enumerate(text.split('\n')):
+            entry = self._parse(line, section, in_ttl)
+            key, section, in_ttl, _ = entry
+            rows.append(entry)
+            if key is not None:
+                bisect.insort(self._locations.setdefault(key, []),
+                              (order, path, row, section))
+        self._rows[path] = rows
+
+    def replace_lines(self, path, first, removed, lines):
+        """Update the entries of `path` after lines were replaced.
+
+        The `removed` lines from row `first` on were replaced by `lines`
+        (see `view.editor_pane.EditorPane.lines_changed`). A file that is not
+        indexed, or is to be re-indexed, is left alone.
+
+        """
+
+        rows = self._rows.get(path)
+        if rows is None or path in self._dirty:
+            return
+        end = first + removed
+        if end > len(rows):
+            self._dirty.add(path)
+            return
+        if first:
+            _, section, in_ttl, _ = rows[first - 1]
+        else:
+            section, in_ttl = '', False
+        new_rows = [self._parse(line, section, in_ttl) for line in lines]
+        # The sections of the lines after a heading depend on it
+        if any(row[3] for row in rows[first:end] + new_rows):
+            self._dirty.add(path)
+            return
+        for row, (key, _, _, _) in enumerate(rows[first:end], first):
+            if key is not None:
+                self._remove_location(key, path, row)
+        shift = len(new_rows) - removed
+        if shift:
+            for key in {row[0] for row in rows[end:]} - {None}:
+                self._locations[key] = [
+                    (order, path_, row + shift, section_)
+                    if path_ == path and row >= end
+                    else (order, path_, row, section_)
+                    for order, path_, row, section_ in self._locations[key]]
+        order = self._order[path]
+        for row, (key, _, _, _) in enumerate(new_rows, first):
+            if key is not None:
+                bisect.insort(self._locations.setdefault(key, []),
+                              (order, path, row, section))
+        rows[first:end] = new_rows
+
+    def find(self, task):
+        """Find where `task` is defined.
+
+        Parameters
+        ----------
+        task : str or model.tokenizer.Task
+            Task definition, or parsed task definition, e.g. from a daily
+            tasks file.
+
+        Returns
+        -------
+        tuple or None
+            `(path, row, section)` of the task definition, or None if the task
+            is not defined in any (open) portfolio file.
+
+        """
+
+        if isinstance(task, str):
+            task = self.tokenizer.parse(task)
+        self.refresh()
+        locations = self._locations.get(self.normalise(task.text))
+        if not locations:
+            return None
+        return locations[0][1:]
+
+    def _parse(self, line, section, in_ttl):
+        """Return `(key, section, in_ttl, is_heading)` of `line`.
+
+        `section` and `in_ttl` are those of the line before.
+
+        """
+
+        settings = self.settings
+        if line[:1] == settings.heading_prefix:
+            return (None, line[len(settings.heading_prefix):].strip(),
+                    settings.ttl_heading in line, True)
+        if in_ttl:
+            return None, section, in_ttl, False
+        task = self.tokenizer.parse(line)
+        if not self.tokenizer.is_active(task):
+            return None, section, in_ttl, False
+        return self.normalise(task.text) or None, section, in_ttl, False
+
+    def _remove_location(self, key, path, row):
+        locations = self._locations[key]
+        for i, location in enumerate(locations):
+            if location[1] == path and location[2] == row:
+                del locations[i]
+                break
+        if not locations:
+            del self._locations[key]
+
+    def _forget(self, path):
+        """Remove all entries indexed from `path`."""
+
+        for key in {row[0] for row in self._rows.pop(path, ())} - {None}:
+            locations = [location for location in self._locations[key]
+                         if location[1] != path]
+            if locations:
+                self._locations[key] = locations
+            else:
+                del self._locations[key]
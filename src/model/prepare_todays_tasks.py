@@ -1,118 +1,156 @@
 """Docstring."""
 
-import configparser
 import sys
 import datetime
+from model.auxiliaries import extract_auxiliaries
+from model.settings import load_settings
+from model.sorting import sort_tasks
+from model.tokenizer import Tokenizer
 # from calfs.get_coming_events import get_coming_events
 
 
-def prepare_todays_tasks(day, month, year, settings_file):
-    """Docstring."""
+def read_tasks_file(tasks_file):
+    """Return the lines of `tasks_file`, without line endings."""
 
-    config = configparser.ConfigParser(
-            interpolation=configparser.ExtendedInterpolation())
-    config.read(settings_file)
-    cfg = config['USER']
+    with open(tasks_file, 'r') as taks_file_:
+        return taks_file_.read().splitlines()
 
-    portfolio_files = cfg['portfolio_files'].split('\n')
-    daily_file = cfg['daily_file']
-    booked_file = cfg['booked_file']
-    periodic_file = cfg['periodic_file']
-    today_file = cfg['today_file']
-    tokens_in_sorting_order = cfg['tokens_in_sorting_order'].split('\n')
-    heading_prefix = cfg['heading_prefix']
-    ttl_heading = cfg['ttl_heading']
-    cat_prefix = cfg['cat_prefix']
-    done_task_prefix = cfg['done_task_prefix']
-    # get_data_from_calendars = settings['get_data_from_calendars']
-    # coming_events_file = cfg['coming_events_file']
 
-    new_tasks = []
+def collect_candidate_tasks(settings):
+    """Read, once, all tasks that may be proposed for a day.
 
-    date = datetime.date(year, month, day)
-    today_str = "{:%Y-%m-%d}".format(date)
+    Daily, booked and periodic tasks are read from their auxiliary files, as
+    last extracted by Atlas (see `collect_portfolio_candidate_tasks()`).
+
+    Parameters
+    ----------
+    settings : model.settings.Settings
+        Portfolio settings.
+
+    Returns
+    -------
+    dict
+        `'always'`: task definitions proposed every day (daily tasks and TTL
+        tasks from portfolio files); `'dated'`: task definitions proposed only
+        once they are due (booked and open periodic tasks).
+
+    """
+
+    # if get_data_from_calendars:
+    #    get_coming_events(year, month, day)
+    #    coming_events = read_tasks_file(coming_events_file)
+    #    add_project_tasks(coming_events)
 
-    def read_tasks_file(tasks_file):
-        """Docstring."""
+    return _candidate_tasks(
+        settings, map(read_tasks_file, settings.portfolio_files),
+        read_tasks_file(settings.daily_file),
+        read_tasks_file(settings.booked_file),
+        read_tasks_file(settings.periodic_file))
 
-        with open(tasks_file, 'r') as taks_file_:
-            tasks = taks_file_.readlines()
-        return tasks
 
-#    def add_daily_segment(tasks, segment):
-#        """Docstring."""
-#
-#        for t in tasks:
-#            if segment in t:
-#                new_tasks.append(t[:len(t) - 1])
+def collect_portfolio_candidate_tasks(settings, tokenizer):
+    """Read, once, all tasks that may be proposed for a day, from portfolio.
 
-    def add_straightforward_tasks(tasks):
-        """Docstring."""
+    Unlike `collect_candidate_tasks()`, daily, booked and periodic tasks are
+    extracted from the portfolio files as they are (see
+    `model.auxiliaries.extract_auxiliaries()`), not read from auxiliary
+    files, which only Atlas updates. Each portfolio file is read once.
 
-        for task in tasks:
-            new_tasks.append(task[:-1])
+    Returns
+    -------
+    dict
+        As `collect_candidate_tasks()`.
 
-    def add_project_tasks(project_tasks):
-        """Docstring."""
+    """
 
+    portfolio_lines = [read_tasks_file(path)
+                       for path in settings.portfolio_files]
+    extracted = extract_auxiliaries(
+        ['\n'.join(lines) for lines in portfolio_lines], settings, tokenizer,
+        ('daily', 'booked', 'periodic'))
+    return _candidate_tasks(settings, portfolio_lines, extracted['daily'],
+                            extracted['booked'], extracted['periodic'])
+
+
+def _candidate_tasks(settings, portfolio_lines, daily, booked, periodic):
+    """Return the candidate tasks, given the lines of each file."""
+
+    always = list(daily)
+    dated = []
+    for lines in portfolio_lines:
         in_ttl = False
-        for task in project_tasks:
-            if ttl_heading in task:
+        for task in lines:
+            if settings.ttl_heading in task:
                 in_ttl = True
-            elif task[0] == heading_prefix:
+            elif task[:1] == settings.heading_prefix:
                 in_ttl = False
-            elif in_ttl and len(task) > 1:
-                new_tasks.append(task[:len(task) - 1])
-
-    def sort_tasks(tasks):
-        """Docstring."""
-
-        sorted_tasks = []
-        for token in tokens_in_sorting_order:
-            for task in tasks:
-                if (cat_prefix in token
-                        and token in task
-                        and task not in sorted_tasks):
-                    sorted_tasks.append(task)
-                elif (token in task
-                        and task not in sorted_tasks
-                        and cat_prefix not in task):
-                    sorted_tasks.append(task)
-        return sorted_tasks
-
-    daily_tasks = read_tasks_file(daily_file)
-    booked_events = read_tasks_file(booked_file)
-    periodic_tasks = read_tasks_file(periodic_file)
-
-    add_straightforward_tasks(daily_tasks)
+            elif in_ttl and task:
+                always.append(task)
+    dated.extend(booked)
+    for task in periodic:
+        if task[:1] != settings.done_task_prefix:
+            dated.append(task)
+    return {'always': always, 'dated': dated}
+
+
+def plan_tasks(candidates, date, settings, tokenizer, ranks=None):
+    """Return the sorted tasks proposed for `date`.
+
+    Parameters
+    ----------
+    candidates : dict
+        Candidate tasks, as returned by `collect_candidate_tasks()`.
+    date : datetime.date
+        Day to plan.
+    settings : model.settings.Settings
+        Portfolio settings.
+    tokenizer : model.tokenizer.Tokenizer
+        Tokenizer used to parse task definitions.
+    ranks : dict
+        Token ranks (see `model.sorting.token_ranks()`), computed from
+        `settings` if not given.
+
+    """
+
+    day = date.toordinal()
+    new_tasks = list(candidates['always'])
+    for task in map(tokenizer.parse, candidates['dated']):
+        if task.due is not None and task.due <= day:
+            new_tasks.append(task.line)
+    return sort_tasks(new_tasks, settings, tokenizer, ranks)
+
+
+def write_day_plan(plan_file, date, tasks):
+    """Write day plan `tasks` for `date` to `plan_file`."""
+
+    date_str = "{:%Y-%m-%d}".format(date)
+    with open(plan_file, 'w') as plan_f:
+        print("# Tasks proposed for " + date_str, file=plan_f)
+        for task in tasks:
+            print(task, file=plan_f)
+        print("# Tasks DONE on " + date_str, file=plan_f)
 
-    # if get_data_from_calendars:
-    #    get_coming_events(year, month, day)
-    #    coming_events = read_tasks_file(coming_events_file)
-    #    add_project_tasks(coming_events)
 
-    for portfolio_file in portfolio_files:
-        add_project_tasks(read_tasks_file(portfolio_file))
-    for task in booked_events:
-        if task[6:6 + 10] <= today_str:
-            new_tasks.append(task[:len(task) - 1])
-    for task in periodic_tasks:
-        if (task[0] != done_task_prefix
-                and task[6:6 + 10] <= today_str):
-            new_tasks.append(task[:len(task) - 1])
+def prepare_todays_tasks(day, month, year, settings, tokenizer=None):
+    """Prepare the day plan for the given date in `today_file`.
 
-    sorted_tasks = sort_tasks(new_tasks)
-    # ~ sorted_tasks = new_tasks
+    `settings` is a `model.settings.Settings` instance, shared with the
+    editor, so that the configuration file is not parsed again. The editor
+    also passes its `model.tokenizer.Tokenizer`, so that lines it has already
+    parsed are not parsed again.
 
-    with open(today_file, 'w') as today_f:
-        print("# Tasks proposed for " + today_str, file=today_f)
-        for task in sorted_tasks:
-            print(task, file=today_f)
-        print("# Tasks DONE on " + today_str, file=today_f)
+    """
+
+    if tokenizer is None:
+        tokenizer = Tokenizer(settings)
+    date = datetime.date(year, month, day)
+    candidates = collect_candidate_tasks(settings)
+    write_day_plan(settings.today_file, date,
+                   plan_tasks(candidates, date, settings, tokenizer))
 
 
 if __name__ == '__main__':
     DAY = int(input("Preparing for day  : "))
     MONTH = int(input("Preparing for month: "))
     YEAR = int(input("Preparing for year : "))
-    prepare_todays_tasks(DAY, MONTH, YEAR, sys.argv[1])
+    prepare_todays_tasks(DAY, MONTH, YEAR, load_settings(sys.argv[1]))
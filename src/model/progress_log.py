@@ -0,0 +1,295 @@
+"""Progress log entries, and append-only storage of the log file.
+
+An entry is a block of lines: a stamp (`LOG-2020-01-31-09-30-00`), the time
+elapsed since the previous entry, the text logged, and an empty line.
+
+By default, the log file keeps the newest entry first, so that each entry
+rewrites the whole file. With the `log_storage` setting set to `append`,
+entries are instead appended to the end of the file (`AppendOnlyLog`), and the
+stamp of the last entry is kept in a small sidecar file, so that logging an
+entry costs the same however long the log is. The log tab then shows the
+entries newest first (see `entries_newest_first()`), read-only.
+
+An existing log kept newest first is put oldest first the first time it is
+used in `append` mode (see `AppendOnlyLog.put_oldest_first()`).
+
+"""
+
+import datetime
+import json
+import os
+
+from model.file_writer import atomic_write
+
+
+SIDECAR_SUFFIX = '.last'
+NEWLINE = '\n'
+# Bytes read at a time when looking for the last entry of a log file
+CHUNK_SIZE = 1 << 12
+
+
+def format_stamp(stamp, settings):
+    """Return the first line of an entry logged at `stamp`."""
+
+    separator = settings.date_separator
+    return settings.log_entry_prefix + separator.join(
+        '{:02d}'.format(value)
+        for value in (stamp.year, stamp.month, stamp.day,
+                      stamp.hour, stamp.minute, stamp.second))
+
+
+def parse_stamp(line, settings):
+    """Return the time of the entry starting with `line`, or None."""
+
+    if not line.startswith(settings.log_entry_prefix):
+        return None
+    parts = line[len(settings.log_entry_prefix):].split(
+        settings.date_separator)
+    try:
+        return datetime.datetime(*(int(part) for part in parts[:6]))
+    except (TypeError, ValueError):
+        return None
+
+
+def format_entry(stamp, previous, text, settings):
+    """Return the lines of an entry.
+
+    Parameters
+    ----------
+    stamp : datetime.datetime
+        Time of the entry.
+    previous : datetime.datetime or None
+        Time of the previous entry, if any.
+    text : str
+        Text logged.
+    settings : model.settings.Settings
+        Portfolio settings.
+
+    Returns
+    -------
+    list of str
+        The stamp, the time elapsed since `previous`, the lines of `text`,
+        and an empty line.
+
+    """
+
+    elapsed = stamp - previous if previous else datetime.timedelta()
+    minutes, seconds = divmod(elapsed.seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    separator = settings.time_separator
+    return [
+        format_stamp(stamp, settings),
+        "{} days, {}{}{:02d}{}{:02d} from previous entry".format(
+            elapsed.days, hours, separator, minutes, separator, seconds),
+    ] + text.split(NEWLINE) + ['']
+
+
+def split_entries(text, settings):
+    """Split log `text` into entries.
+
+    Returns
+    -------
+    tuple
+        The lines before the first entry, the entries (each a list of lines,
+        its stamp first), and whether `text` ends with a line ending.
+
+    """
+
+    lines = text.split(NEWLINE)
+    # The line ending of the last line does not belong to the last entry
+    final_newline = lines[-1] == ''
+    if final_newline:
+        lines.pop()
+    header = []
+    entries = []
+    for line in lines:
+        if parse_stamp(line, settings) is not None:
+            entries.append([line])
+        elif entries:
+            entries[-1].append(line)
+        else:
+            header.append(line)
+    return header, entries, final_newline
+
+
+def join_entries(header, entries, final_newline):
+    """Return log text made of `header` lines and `entries`."""
+
+    lines = header + [line for entry in entries for line in entry]
+    if final_newline:
+        lines.append('')
+    return NEWLINE.join(lines)
+
+
+def entries_newest_first(text, settings):
+    """Return log `text` with its entries in reverse order.
+
+    Lines before the first entry stay at the top.
+
+    """
+
+    header, entries, final_newline = split_entries(text, settings)
+    return join_entries(header, entries[::-1], final_newline)
+
+
+def find_first_stamp(path, settings, encoding):
+    """Return the stamp of the first entry of log file `path`, or None.
+
+    The file is only read up to that entry.
+
+    """
+
+    try:
+        file_ = open(path, encoding=encoding)
+    except FileNotFoundError:
+        return None
+    with file_:
+        for line in file_:
+            if line.startswith(settings.log_entry_prefix):
+                stamp = parse_stamp(line.rstrip('\r\n'), settings)
+                if stamp is not None:
+                    return stamp
+    return None
+
+
+def find_last_stamp(path, settings, encoding):
+    """Return the stamp of the last entry of log file `path`, or None.
+
+    The file is read backwards, up to that entry.
+
+    """
+
+    prefix = settings.log_entry_prefix.encode(encoding)
+    try:
+        file_ = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    with file_:
+        position = file_.seek(0, os.SEEK_END)
+        partial_line = b''
+        while position > 0:
+            size = min(CHUNK_SIZE, position)
+            position -= size
+            file_.seek(position)
+            lines = (file_.read(size) + partial_line).split(b'\n')
+            # The first line may continue in the previous chunk
+            if position:
+                partial_line = lines.pop(0)
+            for line in reversed(lines):
+                if line.startswith(prefix):
+                    stamp = parse_stamp(line.decode(encoding).rstrip('\r'),
+                                        settings)
+                    if stamp is not None:
+                        return stamp
+    return None
+
+
+class AppendOnlyLog:
+    """Log file to which entries are only ever appended.
+
+    The sidecar file (the log file path followed by `SIDECAR_SUFFIX`) holds
+    the time of the last entry, and the size and modification time the log
+    file had after it was appended. If the log file was changed since, by
+    another program, the last entry is looked for from the end of the file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the log file.
+    settings : model.settings.Settings
+        Portfolio settings.
+    encoding : str
+        Encoding of the log file.
+
+    """
+
+    def __init__(self, path, settings, encoding):
+        self.path = path
+        self.sidecar_path = path + SIDECAR_SUFFIX
+        self.settings = settings
+        self.encoding = encoding
+        self._sidecar = None
+
+    def put_oldest_first(self):
+        """Reverse the entries of the log file if it is kept newest first.
+
+        Only a log never appended to (without a sidecar file) may have been
+        kept newest first, before `log_storage` was set to `append`. Its
+        sidecar file is then written, so that it is only checked once.
+
+        Returns
+        -------
+        bool
+            Whether the log file was rewritten.
+
+        """
+
+        if self._read_sidecar() is not None:
+            return False
+        try:
+            with open(self.path, encoding=self.encoding) as file_:
+                text = file_.read()
+        except FileNotFoundError:
+            return False
+        header, entries, final_newline = split_entries(text, self.settings)
+        if not entries:
+            return False
+        first = parse_stamp(entries[0][0], self.settings)
+        last = parse_stamp(entries[-1][0], self.settings)
+        newest_first = first > last
+        if newest_first:
+            atomic_write(self.path,
+                         join_entries(header, entries[::-1], final_newline),
+                         self.encoding)
+        self._write_sidecar(max(first, last))
+        return newest_first
+
+    def last_stamp(self):
+        """Return the time of the last entry, or None if there is none."""
+
+        sidecar = self._read_sidecar()
+        if sidecar is not None and self.is_own_change():
+            return datetime.datetime.fromisoformat(sidecar['stamp'])
+        return find_last_stamp(self.path, self.settings, self.encoding)
+
+    def append(self, lines, stamp):
+        """Append an entry logged at `stamp`, made of `lines`."""
+
+        text = NEWLINE.join(lines) + NEWLINE
+        with open(self.path, 'a+b') as file_:
+            # Make sure the entry starts on a line of its own
+            if file_.seek(0, os.SEEK_END):
+                file_.seek(-1, os.SEEK_END)
+                if file_.read(1) != NEWLINE.encode(self.encoding):
+                    text = NEWLINE + text
+            file_.write(text.encode(self.encoding))
+            file_.flush()
+            os.fsync(file_.fileno())
+        self._write_sidecar(stamp)
+
+    def _write_sidecar(self, stamp):
+        stat = os.stat(self.path)
+        self._sidecar = {'stamp': stamp.replace(microsecond=0).isoformat(),
+                         'size': stat.st_size,
+                         'mtime_ns': stat.st_mtime_ns}
+        atomic_write(self.sidecar_path, json.dumps(self._sidecar), 'UTF-8')
+
+    def is_own_change(self):
+        """Check if the log file is as the last `append()` left it."""
+
+        sidecar = self._read_sidecar()
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (sidecar is not None and sidecar['size'] == stat.st_size
+                and sidecar['mtime_ns'] == stat.st_mtime_ns)
+
+    def _read_sidecar(self):
+        if self._sidecar is None:
+            try:
+                with open(self.sidecar_path, encoding='UTF-8') as file_:
+                    self._sidecar = json.load(file_)
+            except (OSError, ValueError):
+                return None
+        return self._sidecar
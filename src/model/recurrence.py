@@ -0,0 +1,204 @@
+"""Project recurring and booked tasks over a range of days.
+
+`Projection` expands task definitions into arrays of occurrences (task index
+and day offset) in one go, so that questions such as "what is due on each of
+the next N days" or "how many minutes are planned for each day" are answered
+with array operations instead of a date computation per task and per day.
+
+A task is projected the way day plans propose it, assuming it is done on the
+day it is proposed:
+
+* a daily task (`rec:1d`) occurs on every day;
+* a booked task (due date, no recurrence) occurs once, on its due date;
+* a periodic task occurs on its due date, and then every recurrence period
+  after that.
+
+Overdue tasks are carried over to the first day. A periodic task recurring
+from its due date (`rec:+1w`) then keeps its original schedule, while any
+other periodic task is rescheduled from the first day. As in
+`Editor.update_due_date()`, periods are months (`m`), years (`y`) or, for any
+other symbol, days; month ends are clamped (Jan 31 + 1 month is Feb 28).
+
+NumPy is required.
+
+"""
+
+import datetime
+import numpy as np
+
+
+# `datetime64[D]` counts days from 1970-01-01; tasks use Gregorian ordinals
+_EPOCH = datetime.date(1970, 1, 1).toordinal()
+
+# Units in which recurrence periods are counted
+_DAYS = 0
+_MONTHS = 1
+
+
+class Projection:
+    """Occurrences of tasks over `days` days from `start`.
+
+    Parameters
+    ----------
+    tasks : iterable of str or model.tokenizer.Task
+        Task definitions. Tasks that are not active, and tasks that have
+        neither a due date nor a daily recurrence, are ignored.
+    start : datetime.date
+        First day of the projection.
+    days : int
+        Number of days projected.
+    settings : model.settings.Settings
+        Portfolio settings.
+    tokenizer : model.tokenizer.Tokenizer
+        Tokenizer used to parse task definitions.
+
+    Attributes
+    ----------
+    tasks : list of model.tokenizer.Task
+        Projected tasks.
+    task_index : numpy.ndarray
+        Index into `tasks` of each occurrence.
+    offset : numpy.ndarray
+        Day of each occurrence, as an offset from `start`. Occurrences are
+        sorted by day, then by task.
+
+    """
+
+    def __init__(self, tasks, start, days, settings, tokenizer):
+        self.start = start
+        self.days = days
+        self.tasks = []
+        anchors = []
+        steps = []
+        units = []
+        carried = []
+        first = start.toordinal()
+        for task in tasks:
+            if isinstance(task, str):
+                task = tokenizer.parse(task)
+            if not tokenizer.is_active(task):
+                continue
+            if tokenizer.is_daily(task):
+                anchor, step, unit, carry = first, 1, _DAYS, False
+            elif task.due is None:
+                continue
+            elif task.rec is None:
+                # Never recurs: a step past the end of the projection
+                anchor, step = max(task.due, first), max(days, 1)
+                unit = _DAYS
+                carry = False
+            else:
+                count, period, from_due = task.rec
+                if count < 1:
+                    continue
+                unit = _DAYS
+                step = count
+                if period == settings.month_symbol:
+                    unit = _MONTHS
+                elif period == settings.year_symbol:
+                    unit, step = _MONTHS, 12 * count
+                carry = task.due < first
+                anchor = task.due if from_due or not carry else first
+            self.tasks.append(task)
+            anchors.append(anchor)
+            steps.append(step)
+            units.append(unit)
+            carried.append(carry)
+        self.task_index, self.offset = self._expand(
+            np.array(anchors, dtype=np.int64) - first,
+            np.array(steps, dtype=np.int64),
+            np.array(units, dtype=np.int8),
+            np.array(carried, dtype=bool),
+            first)
+
+    def _expand(self, anchors, steps, units, carried, first):
+        """Return (task_index, offset) arrays of all occurrences."""
+
+        days = self.days
+        if not len(anchors):
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        months = units == _MONTHS
+        # Bounds on the length of a step in days: exact for day steps,
+        # between 28 and 31 days per month for month steps
+        shortest = np.where(months, 28 * steps, steps)
+        longest = np.where(months, 31 * steps, steps)
+        k_first = np.maximum(0, -anchors // longest)
+        k_last = np.maximum(k_first, (days - 1 - anchors) // shortest + 1)
+        counts = k_last - k_first
+        task_index = np.repeat(np.arange(len(anchors)), counts)
+        k = (np.arange(len(task_index))
+             - np.repeat(np.cumsum(counts) - counts, counts)
+             + k_first[task_index])
+        offset = anchors[task_index] + k * steps[task_index]
+        in_months = months[task_index]
+        if in_months.any():
+            offset[in_months] = self._add_months(
+                anchors[task_index[in_months]] + first,
+                k[in_months] * steps[task_index[in_months]]) - first
+        keep = (offset >= 0) & (offset < days)
+        task_index = task_index[keep]
+        offset = offset[keep]
+        # Overdue tasks recurring from their due date are also proposed on
+        # the first day
+        overdue = np.flatnonzero(carried)
+        task_index = np.concatenate((task_index, overdue))
+        offset = np.concatenate((offset, np.zeros(len(overdue), np.int64)))
+        # Sort by day, then task, dropping duplicates
+        keys = np.unique(offset * len(anchors) + task_index)
+        return keys % len(anchors), keys // len(anchors)
+
+    @staticmethod
+    def _add_months(ordinals, months):
+        """Add `months` to dates given as `ordinals`, clamping month ends."""
+
+        dates = (ordinals - _EPOCH).astype('datetime64[D]')
+        month = dates.astype('datetime64[M]')
+        day = (dates - month.astype('datetime64[D]')).astype(np.int64)
+        month = month + months.astype('timedelta64[M]')
+        month_start = month.astype('datetime64[D]')
+        month_length = ((month + 1).astype('datetime64[D]')
+                        - month_start).astype(np.int64)
+        dates = month_start + np.minimum(day, month_length - 1)
+        return dates.astype(np.int64) + _EPOCH
+
+    def dates(self):
+        """Return the projected days, as a `datetime64[D]` array."""
+
+        first = np.datetime64(self.start, 'D')
+        return first + np.arange(self.days)
+
+    def due_on(self, date):
+        """Return the tasks occurring on `date` (a `datetime.date`)."""
+
+        day = (date - self.start).days
+        lo, hi = np.searchsorted(self.offset, [day, day + 1])
+        return [self.tasks[i] for i in self.task_index[lo:hi]]
+
+    def tasks_per_day(self):
+        """Return, for each projected day, the list of tasks occurring."""
+
+        bounds = np.searchsorted(self.offset, np.arange(self.days + 1))
+        tasks = self.tasks
+        index = self.task_index.tolist()
+        return [[tasks[i] for i in index[lo:hi]]
+                for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    def count_per_day(self):
+        """Return the number of tasks occurring on each projected day."""
+
+        return np.bincount(self.offset, minlength=self.days)
+
+    def minutes_per_day(self):
+        """Return the total duration of tasks occurring on each day.
+
+        Tasks without a duration count as zero minutes.
+
+        """
+
+        durations = np.array([task.duration or 0 for task in self.tasks],
+                             dtype=np.int64)
+        if not len(durations):
+            return np.zeros(self.days, dtype=np.int64)
+        return np.bincount(self.offset, weights=durations[self.task_index],
+                           minlength=self.days).astype(np.int64)
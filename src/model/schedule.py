@@ -0,0 +1,104 @@
+"""Incremental scheduling of the tasks of a daily tasks file.
+
+`Editor.schedule_tasks()` stamps each active task with the time it starts
+(`09:30 - Task`), one task after the other from the current time. `Schedule`
+keeps the timeline of a document: for each line, the minutes from the start
+of the schedule to the end of its task. Edits reported through
+`Schedule.lines_changed()` mark where the timeline may be out of date, and
+`Schedule.reschedule()` only goes through the lines from the first line
+changed on, rewriting the lines whose stamp differs. Starting at another
+minute than the previous time moves every stamp, so all lines are gone
+through again.
+
+"""
+
+import datetime
+
+
+class Schedule:
+    """Timeline of the tasks of a document.
+
+    Parameters
+    ----------
+    tokenizer : model.tokenizer.Tokenizer
+        Parses the lines.
+    duration : callable
+        Returns the duration of a parsed task, in minutes.
+
+    Attributes
+    ----------
+    start : datetime.datetime or None
+        Start of the schedule last applied.
+    ends : list of int
+        Minutes from `start` to the end of the task of each line, or to the
+        end of the previous task for lines that are not active tasks.
+    first_changed : int
+        First line changed since the schedule was last applied.
+
+    """
+
+    def __init__(self, tokenizer, duration):
+        self.tokenizer = tokenizer
+        self.duration = duration
+        self.start = None
+        self.ends = []
+        self.first_changed = 0
+
+    def lines_changed(self, first, removed, added):
+        """Take note that `removed` lines from `first` on became `added`."""
+
+        self.ends[first:first + removed] = [0] * added
+        self.first_changed = min(self.first_changed, first)
+
+    def reschedule(self, start, count, line, replace_line):
+        """Schedule the active tasks from `start`, one after the other.
+
+        Active tasks are stamped with the time they start, and stamps are
+        removed from other lines.
+
+        Parameters
+        ----------
+        start : datetime.datetime
+            Start of the first task, to the minute.
+        count : int
+            Number of lines of the document.
+        line : callable
+            Returns a line of the document, given its number.
+        replace_line : callable
+            Replaces a line of the document, given its number and new text.
+
+        Returns
+        -------
+        int
+            Number of lines replaced.
+
+        """
+
+        first = self.first_changed
+        if start != self.start or len(self.ends) != count:
+            first = 0
+        first = min(first, count)
+        elapsed = self.ends[first - 1] if first else 0
+        space = self.tokenizer.settings.space
+        ends = []
+        changes = []
+        for row in range(first, count):
+            text = line(row)
+            task = self.tokenizer.parse(text)
+            if self.tokenizer.is_active(task):
+                task_start = start + datetime.timedelta(minutes=elapsed)
+                new_text = (f"{task_start.hour:02}:{task_start.minute:02}"
+                            + space + task.body)
+                elapsed += self.duration(task)
+            else:
+                new_text = task.body
+            ends.append(elapsed)
+            if new_text != text:
+                changes.append((row, new_text))
+        for row, new_text in changes:
+            replace_line(row, new_text)
+        # Replacing lines reports them as changed
+        self.ends[first:] = ends
+        self.start = start
+        self.first_changed = count
+        return len(changes)
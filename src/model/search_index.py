@@ -0,0 +1,198 @@
+"""Full-text index of the lines of portfolio files.
+
+`SearchIndex` keeps every line of the portfolio files (life areas,
+auxiliaries, logs, daily tasks files, archived or not; see `indexed_files()`)
+in an SQLite FTS5 table with the trigram tokenizer, so that any part of a
+word of three characters or more is found through the index, whatever the
+number of lines. The database is kept in the portfolio directory
+(`INDEX_NAME`), but is not backed up with it (see `Editor.derived_files()`).
+
+The row id of a line is made of the id of its file and its line number, so
+that the lines of a file are replaced as a range when it is saved (see
+`SearchIndex.update_file()`). The size and modification time of each file
+are kept with it, and `SearchIndex.update()` only reads files changed since,
+such as files changed while Atlas was not running.
+
+The trigram tokenizer requires SQLite 3.34 or later.
+
+"""
+
+import os
+import sqlite3
+
+from model.backup import walk_files
+
+
+INDEX_NAME = 'search.sqlite3'
+# The low bits of a line row id hold its line number, the high bits its file
+LINE_BITS = 24
+# Shorter terms have no trigram: they are only matched in the lines found
+MIN_TERM_LENGTH = 3
+# Lines found, for each line returned, among which the best are returned
+CANDIDATES_PER_HIT = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS lines USING fts5(
+    text,
+    tokenize = 'trigram'
+);
+"""
+
+
+def indexed_files(settings):
+    """Return the paths of the files to index, sorted.
+
+    These are the files with the Atlas extension in the portfolio directory,
+    except for the backup directory, and in the daily files archive
+    directory.
+
+    """
+
+    extension = settings.atlas_files_extension
+    paths = {}
+    for directory in (settings.portfolio_base_dir,
+                      settings.daily_files_archive_dir):
+        if not os.path.isdir(directory):
+            continue
+        for _, path in walk_files(directory, settings.backup_dir):
+            if path.endswith(extension):
+                # The archive directory may be in the portfolio directory
+                paths.setdefault(os.path.realpath(path),
+                                 os.path.normpath(path))
+    return sorted(paths.values())
+
+
+class SearchIndex:
+    """Full-text index of the lines of a set of files.
+
+    Parameters
+    ----------
+    path : str
+        Path of the database, created if needed.
+    encoding : str
+        Encoding of the files indexed.
+
+    """
+
+    def __init__(self, path, encoding):
+        self.path = path
+        self.encoding = encoding
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        """Close the database."""
+
+        self.connection.close()
+
+    def update(self, paths):
+        """Index the files of `paths` changed since indexed.
+
+        Files indexed but no longer in `paths` are removed from the index.
+
+        Returns
+        -------
+        int
+            Number of files read.
+
+        """
+
+        stored = {path: (file_id, size, mtime_ns)
+                  for file_id, path, size, mtime_ns in self.connection.execute(
+                      "SELECT id, path, size, mtime_ns FROM files")}
+        read = 0
+        with self.connection:
+            for path in paths:
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                old = stored.pop(path, None)
+                if old and old[1:] == (stat.st_size, stat.st_mtime_ns):
+                    continue
+                self._update_file(path, None, stat)
+                read += 1
+            for file_id, _, _ in stored.values():
+                self._remove(file_id)
+        return read
+
+    def update_file(self, path, text=None):
+        """Index file `path`, as it is on disk, or with contents `text`."""
+
+        with self.connection:
+            self._update_file(os.path.normpath(path), text, os.stat(path))
+
+    def search(self, query, limit=100):
+        """Return the lines containing all the words of `query`.
+
+        Words are matched anywhere in lines, ignoring case. The best matches
+        (see the FTS5 `bm25()` function) among the first `limit` times
+        `CANDIDATES_PER_HIT` lines found come first.
+
+        Returns
+        -------
+        list of tuple
+            `(path, line_number, line)` of each line found, at most `limit`.
+
+        """
+
+        terms = query.casefold().split()
+        indexed_terms = [term for term in terms
+                         if len(term) >= MIN_TERM_LENGTH]
+        if not indexed_terms:
+            return []
+        match = ' AND '.join('"{}"'.format(term.replace('"', '""'))
+                             for term in indexed_terms)
+        hits = []
+        for rank, path, rowid, line in self.connection.execute(
+                "SELECT lines.rank, files.path, lines.rowid, lines.text"
+                " FROM lines JOIN files ON files.id = lines.rowid >> ?"
+                " WHERE lines MATCH ? LIMIT ?",
+                (LINE_BITS, match, limit * CANDIDATES_PER_HIT)):
+            folded = line.casefold()
+            if all(term in folded for term in terms):
+                hits.append((rank, path, rowid & ((1 << LINE_BITS) - 1),
+                             line))
+        hits.sort()
+        return [hit[1:] for hit in hits[:limit]]
+
+    # Utility functions
+
+    def _update_file(self, path, text, stat):
+        if text is None:
+            with open(path, encoding=self.encoding,
+                      errors='replace') as file_:
+                text = file_.read()
+        row = self.connection.execute(
+            "SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if row:
+            file_id = row[0]
+            self._remove_lines(file_id)
+            self.connection.execute(
+                "UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?",
+                (stat.st_size, stat.st_mtime_ns, file_id))
+        else:
+            file_id = self.connection.execute(
+                "INSERT INTO files (path, size, mtime_ns) VALUES (?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns)).lastrowid
+        first = file_id << LINE_BITS
+        self.connection.executemany(
+            "INSERT INTO lines (rowid, text) VALUES (?, ?)",
+            ((first + number, line)
+             for number, line in enumerate(text.split('\n')[:1 << LINE_BITS])
+             if line.strip()))
+
+    def _remove(self, file_id):
+        self._remove_lines(file_id)
+        self.connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _remove_lines(self, file_id):
+        self.connection.execute(
+            "DELETE FROM lines WHERE rowid >= ? AND rowid < ?",
+            (file_id << LINE_BITS, (file_id + 1) << LINE_BITS))
@@ -0,0 +1,187 @@
+"""Compiled, read-only portfolio settings.
+
+The configuration file is an INI file read with `configparser` and
+`ExtendedInterpolation`. Looking values up in a live section re-runs the
+interpolation on every access, and multi-line values have to be re-split each
+time, which adds up inside per-line loops. `Settings` does all of that once,
+when the configuration file is loaded.
+
+"""
+
+import configparser
+import re
+
+
+# Options whose values are used as plain strings
+STRING_OPTIONS = (
+    'portfolio_base_dir',
+    'backup_dir',
+    'daily_files_archive_dir',
+    'atlas_settings_file',
+    'atlas_session_file',
+    'portfolio_log_file',
+    'earned_times_file',
+    'daily_file',
+    'booked_file',
+    'periodic_file',
+    'shlist_file',
+    'today_file',
+    'atlas_files_extension',
+    'heading_prefix',
+    'ttl_heading',
+    'incoming_heading',
+    'tasks_proposed_heading',
+    'tasks_done_heading',
+    'the_end_heading',
+    'special_heading_suffix',
+    'due_prop',
+    'dur_prop',
+    'rec_prop',
+    'daily_rec_prop_val',
+    'tag_prefix',
+    'work_tag',
+    'incoming_tag',
+    'cat_prefix',
+    'shlist_cat',
+    'top_task_prefix',
+    'open_task_prefix',
+    'done_task_prefix',
+    'info_task_prefix',
+    'paused_task_prefix',
+    'for_rescheduling_task_prefix',
+    'rescheduled_periodic_task_prefix',
+    'day_symbol',
+    'month_symbol',
+    'year_symbol',
+    'date_separator',
+    'time_separator',
+    'log_entry_prefix',
+    'earned_time_balance_form',
+)
+
+# Multi-line options whose order matters
+SEQUENCE_OPTIONS = (
+    'portfolio_files',
+    'tab_order',
+    'tokens_in_sorting_order',
+)
+
+# Multi-line options that are only ever used for membership tests
+SET_OPTIONS = (
+    'active_task_prefixes',
+    'reserved_word_prefixes',
+)
+
+# Options that may be left out, with their default values
+OPTIONAL_STRING_OPTIONS = {
+    # Compression of backup archives, `xz` or `gz` (see `model.backup`)
+    'backup_compression': 'xz',
+    # `prepend` (newest entry first) or `append` (see `model.progress_log`)
+    'log_storage': 'prepend',
+    # Empty, `year` or `month` (see `model.log_partitions`)
+    'log_partition': '',
+}
+
+OPTIONAL_INT_OPTIONS = {
+    # Backup retention (see `model.backup.BackupStore.prune()`)
+    'backup_keep_last': 10,
+    'backup_keep_daily': 14,
+    'backup_keep_monthly': 12,
+}
+
+DERIVED_ATTRIBUTES = (
+    'space',
+    'log_line_length',
+    'get_data_from_calendars',
+    'portfolio_file_set',
+    'schedule_stamp',
+    'due_date',
+    'daily_file_name',
+)
+
+
+def read_config(settings_file):
+    """Read the INI configuration file.
+
+    Parameters
+    ----------
+    settings_file : str
+        Path to the configuration file.
+
+    Returns
+    -------
+    configparser.ConfigParser
+        Parsed configuration, with extended interpolation enabled.
+
+    """
+
+    config = configparser.ConfigParser(
+            interpolation=configparser.ExtendedInterpolation())
+    config.read(settings_file)
+    return config
+
+
+def load_settings(settings_file):
+    """Read the configuration file and compile its `USER` section."""
+
+    return Settings(read_config(settings_file)['USER'])
+
+
+class Settings:
+    """Portfolio settings, compiled once from a configuration section.
+
+    Attribute names are the same as configuration option names. Multi-line
+    options are split once: options whose order matters become tuples, and
+    options only used for membership tests become frozensets. A few derived
+    values, such as the regular expressions used to recognise schedule
+    stamps and due dates, are precompiled.
+
+    Instances are immutable; build a new one after the configuration file
+    changes.
+
+    Parameters
+    ----------
+    cfg : configparser.SectionProxy
+        The `USER` section of the configuration file.
+
+    """
+
+    __slots__ = (STRING_OPTIONS + SEQUENCE_OPTIONS + SET_OPTIONS
+                 + tuple(OPTIONAL_STRING_OPTIONS) + tuple(OPTIONAL_INT_OPTIONS)
+                 + DERIVED_ATTRIBUTES)
+
+    def __init__(self, cfg):
+        """Compile settings from configuration section `cfg`."""
+
+        set_ = super().__setattr__
+        for option in STRING_OPTIONS:
+            set_(option, cfg[option])
+        for option in SEQUENCE_OPTIONS:
+            set_(option, tuple(cfg[option].split('\n')))
+        for option in SET_OPTIONS:
+            set_(option, frozenset(cfg[option].split('\n')))
+        for option, default in OPTIONAL_STRING_OPTIONS.items():
+            set_(option, cfg.get(option, default))
+        for option, default in OPTIONAL_INT_OPTIONS.items():
+            set_(option, cfg.getint(option, fallback=default))
+        # The value is quoted in the configuration file, e.g. `" "`
+        set_('space', cfg['space'][1])
+        set_('log_line_length', cfg.getint('log_line_length'))
+        set_('get_data_from_calendars',
+             cfg.getboolean('get_data_from_calendars'))
+        set_('portfolio_file_set', frozenset(self.portfolio_files))
+        set_('schedule_stamp', re.compile(r'\d{2}:\d{2}' + self.space))
+        set_('due_date', re.compile(
+            re.escape(self.due_prop) + r'\d{4}-\d{2}-\d{2}'))
+        set_('daily_file_name', re.compile(r'\d{8}'))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Settings are read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError("Settings are read-only")
+
+    def is_portfolio_file(self, path):
+        """Check if `path` is one of the portfolio (life area) files."""
+
+        return path in self.portfolio_file_set
@@ -0,0 +1,79 @@
+"""Sort tasks by the priority of their tags and categories.
+
+`tokens_in_sorting_order` lists tags (`+work`) and categories (`@mr`) from the
+most to the least important. A task is ranked by the most important token it
+carries:
+
+* a task with categories is ranked by its categories only;
+* a task without categories is ranked by its tags.
+
+Tasks that carry none of the tokens are left out, and duplicate task
+definitions are kept only once. Ties are broken by due date, then by duration
+(earlier and shorter first); the sort is stable, so tasks that are still tied
+keep their original order.
+
+"""
+
+from model.tokenizer import Tokenizer
+
+
+# Sorts after any real due date or duration
+_LAST = float('inf')
+
+
+def token_ranks(tokens_in_sorting_order):
+    """Map each token to its rank (0 is the most important)."""
+
+    ranks = {}
+    for rank, token in enumerate(tokens_in_sorting_order):
+        ranks.setdefault(token, rank)
+    return ranks
+
+
+def sort_tasks(tasks, settings, tokenizer=None, ranks=None):
+    """Sort task definitions by token priority.
+
+    Parameters
+    ----------
+    tasks : iterable of str
+        Task definitions.
+    settings : model.settings.Settings
+        Portfolio settings (`tokens_in_sorting_order`).
+    tokenizer : model.tokenizer.Tokenizer
+        Tokenizer used to parse task definitions. A new one is created if not
+        given.
+    ranks : dict
+        Token ranks, as returned by `token_ranks()`. Computed from `settings`
+        if not given.
+
+    Returns
+    -------
+    list of str
+        Sorted task definitions.
+
+    """
+
+    if tokenizer is None:
+        tokenizer = Tokenizer(settings)
+    if ranks is None:
+        ranks = token_ranks(settings.tokens_in_sorting_order)
+    parse = tokenizer.parse
+    seen = set()
+    keyed = []
+    for task_definition in tasks:
+        if task_definition in seen:
+            continue
+        seen.add(task_definition)
+        task = parse(task_definition)
+        tokens = task.cats or task.tags
+        rank = min((ranks[token] for token in tokens if token in ranks),
+                   default=None)
+        if rank is None:
+            continue
+        keyed.append((
+            (rank,
+             _LAST if task.due is None else task.due,
+             _LAST if task.duration is None else task.duration),
+            task_definition))
+    keyed.sort(key=lambda item: item[0])
+    return [task_definition for _, task_definition in keyed]
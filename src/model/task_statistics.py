@@ -0,0 +1,71 @@
+"""Running totals of the durations of tasks in a daily tasks file.
+
+`TaskStatistics` keeps what each line of a document adds to the totals shown
+by `Editor.analyse_tasks()` (remaining and earned minutes, all tasks and work
+tasks only), and the totals themselves. When lines are edited, only the lines
+replaced and their replacements are evaluated again (see
+`TaskStatistics.replace()`), so that the totals can follow every edit.
+
+"""
+
+
+# Indexes of the values of a line, and of the totals
+REMAINING, REMAINING_WORK, EARNED, EARNED_WORK, WITHOUT_DURATION = range(5)
+_NOTHING = (0, 0, 0, 0, 0)
+
+
+class TaskStatistics:
+    """Totals of the task durations of a document, kept up to date by line.
+
+    Parameters
+    ----------
+    tokenizer : model.tokenizer.Tokenizer
+        Parses the lines.
+    lines : list of str
+        Lines of the document.
+
+    Attributes
+    ----------
+    totals : list of int
+        Minutes of active tasks, of active work tasks, of done tasks and of
+        done work tasks, and the number of active tasks without a duration.
+
+    """
+
+    def __init__(self, tokenizer, lines=()):
+        self.tokenizer = tokenizer
+        self.settings = tokenizer.settings
+        self.values = []
+        self.totals = list(_NOTHING)
+        self.replace(0, 0, lines)
+
+    def __len__(self):
+        return len(self.values)
+
+    def replace(self, first, removed, lines):
+        """Replace `removed` lines from line `first` on with `lines`."""
+
+        new_values = [self.line_values(line) for line in lines]
+        totals = self.totals
+        for values in self.values[first:first + removed]:
+            if values is not _NOTHING:
+                for index, value in enumerate(values):
+                    totals[index] -= value
+        for values in new_values:
+            if values is not _NOTHING:
+                for index, value in enumerate(values):
+                    totals[index] += value
+        self.values[first:first + removed] = new_values
+
+    def line_values(self, line):
+        """Return what line `line` adds to the totals."""
+
+        task = self.tokenizer.parse(line)
+        work = self.settings.work_tag in task.tags
+        if self.tokenizer.is_active(task):
+            if task.duration is None:
+                return (0, 0, 0, 0, 1)
+            return (task.duration, task.duration if work else 0, 0, 0, 0)
+        if task.prefix == self.settings.done_task_prefix and task.duration:
+            return (0, 0, task.duration, task.duration if work else 0, 0)
+        return _NOTHING
@@ -0,0 +1,189 @@
+"""Split task definitions into their parts, once per line.
+
+A task definition is a single line such as::
+
+    09:30 - Pay rent due:2019-07-01 rec:1m dur:5 +home @dr
+
+made of an optional schedule stamp (`09:30`), a task prefix (`-`), the task
+text, properties (`due:`, `rec:`, `dur:`), tags (`+home`) and categories
+(`@dr`). `Tokenizer.parse()` splits a line into a `Task` record in a single
+pass, and caches the result keyed on the line itself, so commands that look at
+the same lines over and over (extracting auxiliaries, analysing, scheduling)
+only pay for parsing once.
+
+"""
+
+import datetime
+import sys
+
+
+# Number of parsed lines kept before the cache is cleared
+CACHE_SIZE = 100000
+
+
+class Task:
+    """Parsed task definition.
+
+    Attributes
+    ----------
+    line : str
+        Task definition, as given (without the line ending).
+    stamp : str
+        Schedule stamp (`HH:MM`), or an empty string if not scheduled.
+    body : str
+        Task definition without the schedule stamp.
+    prefix : str
+        Task prefix (first character of `body`), or an empty string.
+    text : str
+        Task text, without prefix, properties, tags and categories.
+    due : int or None
+        Due date as a proleptic Gregorian ordinal (see
+        `datetime.date.toordinal()`).
+    duration : int or None
+        Task duration in minutes.
+    rec : tuple or None
+        Recurrence as `(count, period_symbol, from_due_date)`, e.g.
+        `(2, 'm', False)` for `rec:2m`, or `(1, 'w', True)` for `rec:+1w`.
+    tags : tuple of str
+        Tags, interned.
+    cats : tuple of str
+        Categories, interned.
+
+    """
+
+    __slots__ = ('line', 'stamp', 'body', 'prefix', 'text', 'due',
+                 'duration', 'rec', 'tags', 'cats')
+
+    def __init__(self, line, stamp, body, prefix, text, due, duration, rec,
+                 tags, cats):
+        self.line = line
+        self.stamp = stamp
+        self.body = body
+        self.prefix = prefix
+        self.text = text
+        self.due = due
+        self.duration = duration
+        self.rec = rec
+        self.tags = tags
+        self.cats = cats
+
+    def __repr__(self):
+        return 'Task({!r})'.format(self.line)
+
+    @property
+    def due_date(self):
+        """Due date as `datetime.date`, or None."""
+
+        if self.due is None:
+            return None
+        return datetime.date.fromordinal(self.due)
+
+
+class Tokenizer:
+    """Parse task definitions according to portfolio `settings`.
+
+    Parameters
+    ----------
+    settings : model.settings.Settings
+        Portfolio settings (prefixes, property names, separators).
+
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self._cache = {}
+        self._daily_rec = self._parse_rec(settings.daily_rec_prop_val)
+
+    def parse(self, line):
+        """Parse task definition `line` into a `Task`.
+
+        A trailing line ending is ignored. Any line can be parsed: headings
+        and blank lines simply come out with no properties.
+
+        """
+
+        line = line.rstrip('\r\n')
+        task = self._cache.get(line)
+        if task is None:
+            if len(self._cache) >= CACHE_SIZE:
+                self._cache.clear()
+            task = self._cache[line] = self._parse(line)
+        return task
+
+    def parse_lines(self, text):
+        """Parse every line of `text`, returning a list of `Task`."""
+
+        parse = self.parse
+        return [parse(line) for line in text.split('\n')]
+
+    def is_active(self, task):
+        """Check if `task` is an active (open or top) task."""
+
+        return task.prefix in self.settings.active_task_prefixes
+
+    def is_daily(self, task):
+        """Check if `task` recurs every day."""
+
+        return task.rec is not None and task.rec == self._daily_rec
+
+    def _parse(self, line):
+        """Do the actual parsing of `line` (see `parse()`)."""
+
+        settings = self.settings
+        space = settings.space
+        stamp = ''
+        body = line
+        if settings.schedule_stamp.match(line):
+            stamp = line[:5]
+            body = line[6:]
+        prefix = body[:1]
+        due = duration = rec = None
+        text_words = []
+        tags = []
+        cats = []
+        for word in body.split(space):
+            if len(word) == 1 and word in settings.active_task_prefixes:
+                continue
+            if word.startswith(settings.due_prop):
+                due = self._parse_date(word[len(settings.due_prop):])
+            elif word.startswith(settings.dur_prop):
+                duration = self._parse_int(word[len(settings.dur_prop):])
+            elif word.startswith(settings.rec_prop):
+                rec = self._parse_rec(word)
+            elif word.startswith(settings.tag_prefix):
+                tags.append(sys.intern(word))
+            elif word.startswith(settings.cat_prefix):
+                cats.append(sys.intern(word))
+            elif word[:1] in settings.reserved_word_prefixes:
+                continue
+            else:
+                text_words.append(word)
+        return Task(line, stamp, body, prefix, space.join(text_words).strip(),
+                    due, duration, rec, tuple(tags), tuple(cats))
+
+    def _parse_rec(self, word):
+        """Parse a recurrence property such as `rec:2m` or `rec:+1w`."""
+
+        word = word[len(self.settings.rec_prop):]
+        count = self._parse_int(''.join(c for c in word if c.isnumeric()))
+        if count is None or not word:
+            return None
+        return (count, word[-1], self.settings.tag_prefix in word)
+
+    def _parse_date(self, value):
+        """Parse a `YYYY-MM-DD` date into an ordinal."""
+
+        parts = value.split(self.settings.date_separator)
+        try:
+            return datetime.date(
+                int(parts[0]), int(parts[1]), int(parts[2])).toordinal()
+        except (ValueError, IndexError):
+            return None
+
+    @staticmethod
+    def _parse_int(value):
+        """Parse a non-negative integer, returning None on failure."""
+
+        if value.isdigit():
+            return int(value)
+        return None
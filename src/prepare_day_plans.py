@@ -0,0 +1,155 @@
+"""Prepare day plans for a range of dates, without the GUI.
+
+The configuration file is read and the portfolio is parsed once; a day plan
+is then written for each target date, optionally in parallel worker processes.
+Plans are named like the ones Atlas prepares (`YYYYMMDD.pmd.txt`) and by
+default are written to the portfolio base directory. Existing plans are not
+overwritten unless `--force` is given.
+
+Daily, booked and periodic tasks are extracted from the portfolio files as
+they are, like the TTL tasks, rather than read from the auxiliary files:
+these are only updated by Atlas, and may miss tasks added or rescheduled
+since it last prepared a day plan.
+
+Example (plans for the next 14 days, from cron)::
+
+    python prepare_day_plans.py ~/atlas/config.ini --days 14
+
+With `--forecast`, no plans are written; instead, the number of daily, booked
+and periodic tasks and their total duration are listed for each day (this
+requires NumPy).
+
+"""
+
+import argparse
+import concurrent.futures
+import datetime
+import os
+import sys
+from model.prepare_todays_tasks import (collect_portfolio_candidate_tasks,
+                                        plan_tasks, write_day_plan)
+from model.settings import load_settings
+from model.sorting import token_ranks
+from model.tokenizer import Tokenizer
+
+
+# Set up once per worker process (see `init_worker()`)
+_worker = {}
+
+
+def parse_date(value):
+    """Parse a `YYYY-MM-DD` command-line argument."""
+
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "'{}' is not a YYYY-MM-DD date".format(value))
+
+
+def parse_arguments(argv):
+    """Parse command-line arguments."""
+
+    tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+    parser = argparse.ArgumentParser(
+        description="Prepare Atlas day plans for a range of dates.")
+    parser.add_argument('config_file', help="Atlas configuration file")
+    parser.add_argument(
+        '--start', type=parse_date, default=tomorrow,
+        help="first date to plan, YYYY-MM-DD (default: tomorrow)")
+    parser.add_argument(
+        '--days', type=int, default=1,
+        help="number of consecutive days to plan (default: 1)")
+    parser.add_argument(
+        '--output-dir',
+        help="directory to write plans to (default: portfolio base dir)")
+    parser.add_argument(
+        '--jobs', type=int, default=1,
+        help="number of worker processes (default: 1, no workers)")
+    parser.add_argument(
+        '--force', action='store_true',
+        help="overwrite day plans that already exist")
+    parser.add_argument(
+        '--forecast', action='store_true',
+        help="list planned tasks and minutes per day instead of writing "
+             "plans")
+    return parser.parse_args(argv)
+
+
+def plan_file_path(output_dir, date, settings):
+    """Return the path of the day plan for `date`."""
+
+    return os.path.join(output_dir, "{:%Y%m%d}{}".format(
+        date, settings.atlas_files_extension))
+
+
+def forecast(candidates, start, days, settings):
+    """Print the number of tasks and planned minutes for each day."""
+
+    from model.recurrence import Projection
+    projection = Projection(candidates['always'] + candidates['dated'],
+                            start, days, settings, Tokenizer(settings))
+    for date, count, minutes in zip(projection.dates(),
+                                    projection.count_per_day(),
+                                    projection.minutes_per_day()):
+        print("{}  {:4d} tasks  {:5d} min ({:02d}:{:02d})".format(
+            date, count, minutes, minutes // 60, minutes % 60))
+
+
+def init_worker(config_file, candidates):
+    """Set up a worker process: settings, tokenizer and candidate tasks."""
+
+    settings = load_settings(config_file)
+    _worker['settings'] = settings
+    _worker['tokenizer'] = Tokenizer(settings)
+    _worker['ranks'] = token_ranks(settings.tokens_in_sorting_order)
+    _worker['candidates'] = candidates
+
+
+def prepare_day_plan(date, plan_file):
+    """Prepare the day plan for `date` (runs in a worker process)."""
+
+    write_day_plan(plan_file, date, plan_tasks(
+        _worker['candidates'], date, _worker['settings'],
+        _worker['tokenizer'], _worker['ranks']))
+    return plan_file
+
+
+def run(argv=None):
+    """Prepare day plans as requested by command-line arguments `argv`."""
+
+    args = parse_arguments(argv)
+    if args.days < 1 or args.jobs < 1:
+        print("--days and --jobs must be at least 1", file=sys.stderr)
+        return 2
+    settings = load_settings(args.config_file)
+    output_dir = args.output_dir or settings.portfolio_base_dir
+    candidates = collect_portfolio_candidate_tasks(settings,
+                                                   Tokenizer(settings))
+    if args.forecast:
+        forecast(candidates, args.start, args.days, settings)
+        return 0
+    jobs = []
+    for offset in range(args.days):
+        date = args.start + datetime.timedelta(days=offset)
+        plan_file = plan_file_path(output_dir, date, settings)
+        if os.path.exists(plan_file) and not args.force:
+            print("Skipping {} (already exists)".format(plan_file))
+            continue
+        jobs.append((date, plan_file))
+    if args.jobs == 1:
+        init_worker(args.config_file, candidates)
+        written = [prepare_day_plan(*job) for job in jobs]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=args.jobs, initializer=init_worker,
+                initargs=(args.config_file, candidates)) as executor:
+            written = list(executor.map(prepare_day_plan, *zip(*jobs))
+                           if jobs else [])
+    for plan_file in written:
+        print("Wrote {}".format(plan_file))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(run())
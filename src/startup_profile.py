@@ -0,0 +1,163 @@
+"""Measure where Atlas spends its start-up time.
+
+Set the `ATLAS_PROFILE_STARTUP` environment variable to profile a start-up::
+
+    ATLAS_PROFILE_STARTUP=1 python main.py portfolio.ini
+
+Once the main window is first painted, a report is written to standard
+error (or appended to the file named by the variable, if it is not `1`): the
+time from start-up to each milestone (imports done, window and editor set up,
+first paint), and the modules that took longest to import. Import times are
+"self" times, without the time spent importing their own imports.
+
+"""
+
+import os
+import sys
+import time
+
+
+ENVIRONMENT_VARIABLE = 'ATLAS_PROFILE_STARTUP'
+# Number of modules listed in the report
+SLOWEST_IMPORTS = 25
+
+
+class _TimedLoader:
+    """Module loader wrapper timing `exec_module()` (see `StartupProfile`)."""
+
+    def __init__(self, loader, profile):
+        self._loader = loader
+        self._profile = profile
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        profile = self._profile
+        profile._nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = profile._nested.pop()
+            if profile._nested:
+                profile._nested[-1] += elapsed
+            profile.imports.append((module.__name__, elapsed - nested))
+
+
+class StartupProfile:
+    """Import times and start-up milestones.
+
+    Attributes
+    ----------
+    imports : list of tuple
+        `(module_name, seconds)` for each module imported while installed,
+        seconds excluding nested imports.
+    milestones : list of tuple
+        `(name, seconds_since_start)`.
+
+    """
+
+    def __init__(self, report_path=None):
+        self.start = time.perf_counter()
+        self.report_path = report_path
+        self.imports = []
+        self.milestones = []
+        self._nested = []
+        self._paint_filter = None
+
+    @classmethod
+    def from_environment(cls):
+        """Return an installed profile if requested, otherwise None."""
+
+        value = os.environ.get(ENVIRONMENT_VARIABLE)
+        if not value:
+            return None
+        profile = cls(None if value == '1' else value)
+        profile.install()
+        return profile
+
+    # Import hook (a meta path finder wrapping the loaders it finds)
+
+    def install(self):
+        """Start timing imports."""
+
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        """Stop timing imports."""
+
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        """Find `fullname` with the other finders, wrapping its loader."""
+
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if (spec.loader is not None
+                        and hasattr(spec.loader, 'exec_module')):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    # Milestones
+
+    def mark(self, name):
+        """Record milestone `name` as reached now."""
+
+        self.milestones.append((name, time.perf_counter() - self.start))
+
+    def report_on_first_paint(self, window):
+        """Mark the first paint of `window`, then write the report."""
+
+        from PyQt5.QtCore import QEvent, QObject
+
+        profile = self
+
+        class FirstPaintFilter(QObject):
+            """Event filter waiting for the first paint event."""
+
+            def eventFilter(self, watched, event):
+                if event.type() == QEvent.Paint:
+                    watched.removeEventFilter(self)
+                    profile.mark('first paint')
+                    profile.uninstall()
+                    profile.report()
+                return False
+
+        self._paint_filter = FirstPaintFilter()
+        window.installEventFilter(self._paint_filter)
+
+    # Report
+
+    def format_report(self):
+        """Return the report, as text."""
+
+        lines = ["Atlas start-up profile", "", "Milestones (s since start):"]
+        for name, seconds in self.milestones:
+            lines.append("  {:8.3f}  {}".format(seconds, name))
+        total = sum(seconds for _, seconds in self.imports)
+        lines.append("")
+        lines.append("Imports: {} modules, {:.3f} s; slowest (self, ms):"
+                     .format(len(self.imports), total))
+        slowest = sorted(self.imports, key=lambda item: item[1], reverse=True)
+        for name, seconds in slowest[:SLOWEST_IMPORTS]:
+            lines.append("  {:8.1f}  {}".format(seconds * 1000, name))
+        return '\n'.join(lines) + '\n'
+
+    def report(self):
+        """Write the report to standard error or `report_path`."""
+
+        if self.report_path:
+            with open(self.report_path, 'a') as report_file:
+                report_file.write(self.format_report())
+        else:
+            sys.stderr.write(self.format_report())
@@ -2,6 +2,7 @@
 
 import os
 import os.path
+from contextlib import contextmanager
 from PyQt5.Qsci import QsciScintilla
 from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtGui import QColor
@@ -15,6 +16,9 @@ class EditorPane(QsciScintilla):
     """Docstring."""
 
     open_file = pyqtSignal(str)
+    # Lines replaced: first line, number of lines removed, number of lines
+    # inserted in their place (see `modified_listener()`)
+    lines_changed = pyqtSignal(int, int, int)
 
     def __init__(self, path, text, newline=NEWLINE):
         """Docstring."""
@@ -24,6 +28,10 @@ class EditorPane(QsciScintilla):
         self.path = path
         self.setText(text)
         self.newline = newline
+        # Set by the editor logic for daily tasks files
+        self.task_statistics = None
+        # Set by the editor logic when first scheduling tasks
+        self.schedule = None
         self.previous_selection = {
             'line_start': 0, 'col_start': 0, 'line_end': 0, 'col_end': 0
         }
@@ -62,6 +70,7 @@ class EditorPane(QsciScintilla):
         self.setMarginWidth(4, 8)
         self.setMarginSensitivity(4, True)
         self.selectionChanged.connect(self.selection_change_listener)
+        self.SCN_MODIFIED.connect(self.modified_listener)
 
     @property
     def label(self):
@@ -75,6 +84,179 @@ class EditorPane(QsciScintilla):
             return label + ' *'
         return label
 
+    # Line-level editing
+    #
+    # Commands edit only the lines they change, through Scintilla's target
+    # (range) replacement, rather than setting the whole text. This keeps the
+    # undo history, the markers and the layout of the rest of the document.
+    # Rows are zero-based, and a line does not include its line ending.
+
+    def line(self, row):
+        """Return the text of line `row`."""
+
+        return self.text(row).rstrip('\r\n')
+
+    def replace_line(self, row, text):
+        """Replace line `row` with `text`."""
+
+        self.replace_lines(row, row + 1, [text])
+
+    def insert_line_after(self, row, text):
+        """Insert `text` as a new line after line `row` (-1 for the top)."""
+
+        self.replace_lines(row + 1, row + 1, [text])
+
+    def delete_line(self, row):
+        """Delete line `row`, line ending included."""
+
+        self.replace_lines(row, row + 1, [])
+
+    def swap_lines(self, row, other_row):
+        """Swap lines `row` and `other_row`."""
+
+        if row == other_row:
+            return
+        text, other_text = self.line(row), self.line(other_row)
+        with self.undo_action():
+            # Later line first, so that the earlier one does not move
+            if row > other_row:
+                self.replace_line(row, other_text)
+                self.replace_line(other_row, text)
+            else:
+                self.replace_line(other_row, text)
+                self.replace_line(row, other_text)
+
+    def append_line(self, text):
+        """Add `text` as the last line, reusing a trailing empty line."""
+
+        last = self.lines() - 1
+        if self.line(last):
+            self.insert_line_after(last, text)
+        else:
+            self.replace_line(last, text)
+
+    def replace_lines(self, first, last, lines):
+        """Replace lines `first` up to (not including) `last` with `lines`.
+
+        With `first` equal to `last`, `lines` are inserted before line
+        `first`; with no `lines`, the lines are deleted.
+
+        """
+
+        newline = self.newline
+        count = self.lines()
+        if last < count:
+            start = self.SendScintilla(self.SCI_POSITIONFROMLINE, first)
+            end = self.SendScintilla(self.SCI_POSITIONFROMLINE, last)
+            text = ''.join(line + newline for line in lines)
+        else:
+            end = self.SendScintilla(self.SCI_GETLENGTH)
+            if first >= count:
+                start = end
+                text = ''.join(newline + line for line in lines)
+            elif lines or first == 0:
+                start = self.SendScintilla(self.SCI_POSITIONFROMLINE, first)
+                text = newline.join(lines)
+            else:
+                # Deleting the last lines removes the preceding line ending
+                start = self.SendScintilla(
+                    self.SCI_GETLINEENDPOSITION, first - 1)
+                text = ''
+        data = text.encode('utf-8')
+        self.SendScintilla(self.SCI_SETTARGETRANGE, start, end)
+        self.SendScintilla(self.SCI_REPLACETARGET, len(data), data)
+
+    def set_lines(self, lines):
+        """Make the document consist of `lines`, editing only what differs.
+
+        Lines shared at the start and at the end of the document are kept,
+        and only the range in between is replaced.
+
+        Returns
+        -------
+        bool
+            Whether the document was changed.
+
+        """
+
+        old_lines = self.text().split(self.newline)
+        shortest = min(len(old_lines), len(lines))
+        first = 0
+        while first < shortest and old_lines[first] == lines[first]:
+            first += 1
+        if first == len(old_lines) == len(lines):
+            return False
+        common_end = 0
+        while (common_end < shortest - first
+               and old_lines[-1 - common_end] == lines[-1 - common_end]):
+            common_end += 1
+        self.replace_lines(first, len(old_lines) - common_end,
+                           lines[first:len(lines) - common_end])
+        return True
+
+    def reload(self, text):
+        """Replace the contents with `text`, read again from disk.
+
+        Only the lines that differ are replaced (see `set_lines()`), and the
+        cursor and the scroll position are kept. The document is left not
+        modified.
+
+        Returns
+        -------
+        bool
+            Whether the document was changed.
+
+        """
+
+        row, column = self.getCursorPosition()
+        first_visible_line = self.firstVisibleLine()
+        with self.editable():
+            changed = self.set_lines(text.split(self.newline))
+        if changed:
+            row = min(row, self.lines() - 1)
+            column = min(column, len(self.line(row)))
+            self.setCursorPosition(row, column)
+            self.setFirstVisibleLine(first_visible_line)
+        self.setModified(False)
+        return changed
+
+    @contextmanager
+    def undo_action(self):
+        """Group the edits made in a `with` block into one undo action."""
+
+        self.beginUndoAction()
+        try:
+            yield
+        finally:
+            self.endUndoAction()
+
+    @contextmanager
+    def editable(self):
+        """Allow edits in a `with` block, even if the tab is read-only."""
+
+        read_only = self.isReadOnly()
+        self.setReadOnly(False)
+        try:
+            yield
+        finally:
+            self.setReadOnly(read_only)
+
+    def modified_listener(self, position, modification_type, text, length,
+                          lines_added, *args):
+        """Emit `lines_changed` for text inserted or deleted.
+
+        Text inserted within a line turns it into `lines_added + 1` lines;
+        text deleted turns `1 - lines_added` lines into one.
+
+        """
+
+        if not modification_type & (self.SC_MOD_INSERTTEXT
+                                    | self.SC_MOD_DELETETEXT):
+            return
+        first = self.SendScintilla(self.SCI_LINEFROMPOSITION, position)
+        self.lines_changed.emit(first, 1 + max(0, -lines_added),
+                                1 + max(0, lines_added))
+
     def selection_change_listener(self):
         """Docstring."""
 
@@ -1,19 +1,27 @@
 """Docstring."""
 
+from importlib.resources import files
 from PyQt5.QtGui import QFontDatabase
-from pkg_resources import resource_string
 
 
 DEFAULT_FONT_SIZE = 8
 FONT_NAME = 'Source Code Pro'
 FONT_FILENAME_PATTERN = 'SourceCodePro-{variant}.otf'
 FONT_VARIANTS = ('Bold', 'BoldIt', 'It', 'Regular', 'Semibold', 'SemiboldIt')
+# Font file variant of each style name (see `Font.stylename`)
+STYLE_VARIANTS = {
+    'Regular': 'Regular',
+    'Italic': 'It',
+    'Semibold': 'Semibold',
+    'Semibold Italic': 'SemiboldIt',
+}
 
 
 class Font:
     """Docstring."""
 
     _DATABASE = None
+    _VARIANTS = set()
 
     # ~ def __init__(self, color='#181818', paper='#FEFEF7', bold=False,
     # ~ italic=False):
@@ -26,22 +34,29 @@ class Font:
         self.italic = italic
 
     @classmethod
-    def get_database(cls):
-        """Docstring."""
+    def get_database(cls, variant='Regular'):
+        """Return the font database, with font file `variant` registered.
+
+        Font files are registered on first use, as each takes a while to
+        load: the editor only needs the Regular one.
+
+        """
 
         if cls._DATABASE is None:
             cls._DATABASE = QFontDatabase()
-            for variant in FONT_VARIANTS:
-                filename = FONT_FILENAME_PATTERN.format(variant=variant)
-                # ~ font_data = load_font_data(filename)
-                font_data = resource_string('resources', 'fonts/' + filename)
-                cls._DATABASE.addApplicationFontFromData(font_data)
+        if variant not in cls._VARIANTS:
+            filename = FONT_FILENAME_PATTERN.format(variant=variant)
+            font_data = files('resources').joinpath(
+                'fonts', filename).read_bytes()
+            cls._DATABASE.addApplicationFontFromData(font_data)
+            cls._VARIANTS.add(variant)
         return cls._DATABASE
 
     def load(self, size=DEFAULT_FONT_SIZE):
         """Docstring."""
 
-        return Font.get_database().font(FONT_NAME, self.stylename, size)
+        database = Font.get_database(STYLE_VARIANTS[self.stylename])
+        return database.font(FONT_NAME, self.stylename, size)
 
     @property
     def stylename(self):
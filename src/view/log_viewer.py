@@ -0,0 +1,93 @@
+"""Read-only viewer of log partitions (see `model.log_partitions`)."""
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+from PyQt5.QtWidgets import QComboBox, QDialog, QListView, QVBoxLayout
+
+from view.font import Font
+
+
+class PagedLinesModel(QAbstractListModel):
+    """List model of the lines of a `model.log_partitions.PagedLines`.
+
+    Views only ask for the rows they show, so only the pages holding them
+    are read from disk.
+
+    """
+
+    def __init__(self, lines=None, parent=None):
+        """Docstring."""
+
+        super().__init__(parent)
+        self.lines = lines
+
+    def set_lines(self, lines):
+        """Show `lines` instead."""
+
+        self.beginResetModel()
+        self.lines = lines
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        """Docstring."""
+
+        if parent.isValid() or self.lines is None:
+            return 0
+        return len(self.lines)
+
+    def data(self, index, role=Qt.DisplayRole):
+        """Docstring."""
+
+        if role == Qt.DisplayRole and index.isValid():
+            return self.lines.line(index.row())
+        return None
+
+
+class LogViewer(QDialog):
+    """Window browsing older log partitions, one at a time.
+
+    Parameters
+    ----------
+    partitions : list of tuple
+        `(label, path)` of each partition.
+    open_lines : callable
+        Returns the `PagedLines` of the file at a given path.
+
+    """
+
+    def __init__(self, partitions, open_lines, parent=None):
+        """Docstring."""
+
+        super().__init__(parent)
+        self.partitions = partitions
+        self.open_lines = open_lines
+        self.partition_box = QComboBox()
+        self.lines_view = QListView()
+        self.lines_model = PagedLinesModel(parent=self)
+
+    def setup(self):
+        """Docstring."""
+
+        self.setMinimumSize(800, 600)
+        self.setWindowTitle("Log Archive")
+        widget_layout = QVBoxLayout()
+        self.setLayout(widget_layout)
+        for label, _ in self.partitions:
+            self.partition_box.addItem(label)
+        widget_layout.addWidget(self.partition_box)
+        # Rows of the same height let the view skip measuring them all
+        self.lines_view.setUniformItemSizes(True)
+        self.lines_view.setFont(Font().load())
+        self.lines_view.setModel(self.lines_model)
+        widget_layout.addWidget(self.lines_view)
+        # The most recent partition first
+        self.partition_box.setCurrentIndex(len(self.partitions) - 1)
+        self.show_partition(self.partition_box.currentIndex())
+        self.partition_box.currentIndexChanged.connect(self.show_partition)
+
+    def show_partition(self, index):
+        """Show the partition at `index` in the list of partitions."""
+
+        if 0 <= index < len(self.partitions):
+            self.lines_model.set_lines(
+                self.open_lines(self.partitions[index][1]))
+            self.lines_view.scrollToTop()
@@ -0,0 +1,78 @@
+"""Panel searching all portfolio files (see `model.search_index`)."""
+
+import os
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import (QDockWidget, QLineEdit, QListWidget,
+                             QListWidgetItem, QVBoxLayout, QWidget)
+
+from view.font import Font
+
+
+class SearchPanel(QDockWidget):
+    """Dock listing the lines matching a query, as `file:line: text`.
+
+    Parameters
+    ----------
+    search : callable
+        Returns `(path, line_number, line)` of the lines matching a query.
+    open_hit : callable
+        Shows line `line_number` of file `path`.
+
+    """
+
+    # Milliseconds without typing before searching
+    search_delay = 150
+
+    def __init__(self, search, open_hit, parent=None):
+        """Docstring."""
+
+        super().__init__("Search", parent)
+        self.search = search
+        self.open_hit = open_hit
+        self.query_edit = QLineEdit()
+        self.hits_list = QListWidget()
+        self.search_timer = QTimer(self)
+
+    def setup(self):
+        """Docstring."""
+
+        widget = QWidget()
+        widget_layout = QVBoxLayout()
+        widget.setLayout(widget_layout)
+        self.query_edit.setPlaceholderText("Search portfolio")
+        self.query_edit.setClearButtonEnabled(True)
+        widget_layout.addWidget(self.query_edit)
+        self.hits_list.setUniformItemSizes(True)
+        self.hits_list.setFont(Font().load())
+        widget_layout.addWidget(self.hits_list)
+        self.setWidget(widget)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.search_delay)
+        self.search_timer.timeout.connect(self.show_hits)
+        self.query_edit.textChanged.connect(self.search_timer.start)
+        self.query_edit.returnPressed.connect(self.show_hits)
+        self.hits_list.itemActivated.connect(self.hit_activated)
+
+    def focus_query(self):
+        """Focus the query, selecting it."""
+
+        self.query_edit.setFocus()
+        self.query_edit.selectAll()
+
+    def show_hits(self):
+        """Search for the query, and list the lines found."""
+
+        self.search_timer.stop()
+        self.hits_list.clear()
+        for path, line_number, line in self.search(self.query_edit.text()):
+            item = QListWidgetItem("{}:{}: {}".format(
+                os.path.basename(path), line_number + 1, line.strip()))
+            item.setData(Qt.UserRole, (path, line_number))
+            item.setToolTip(path)
+            self.hits_list.addItem(item)
+
+    def hit_activated(self, item):
+        """Docstring."""
+
+        self.open_hit(*item.data(Qt.UserRole))
@@ -0,0 +1,49 @@
+"""Docstring."""
+
+import os.path
+from PyQt5.QtWidgets import QWidget
+
+
+class TabPlaceholder(QWidget):
+    """Stand-in for an editor tab whose file has not been loaded yet.
+
+    Opening a portfolio adds a placeholder tab per file, holding only the
+    path. The window replaces it with an `EditorPane` (see
+    `TopLevelWindow.materialize()`) when the tab is first focused, or when a
+    command first needs to edit it. Until then, the placeholder answers the
+    read-only questions commands ask of tabs, reading the file from disk.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+    newline : str
+        Line ending used by the editor.
+    load : callable
+        Returns the contents of the file at the given path.
+
+    """
+
+    def __init__(self, path, newline, load):
+        """Docstring."""
+
+        super().__init__()
+        self.path = path
+        self.newline = newline
+        self.load = load
+
+    @property
+    def label(self):
+        """Docstring."""
+
+        return os.path.basename(self.path).split('.')[0]
+
+    def isModified(self):
+        """A file that has not been loaded has no unsaved changes."""
+
+        return False
+
+    def text(self):
+        """Return the contents of the file."""
+
+        return self.load(self.path)
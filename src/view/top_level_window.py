@@ -1,16 +1,15 @@
 """Docstring."""
 
-from PyQt5.QtCore import Qt, pyqtSignal, QTimer
+import os.path
+from PyQt5.QtCore import Qt, pyqtSignal, QFileSystemWatcher, QTimer
 from PyQt5.QtWidgets import (QAction, QDesktopWidget, QWidget, QVBoxLayout,
                              QTabWidget, QFileDialog, QMessageBox, QMainWindow,
-                             QShortcut)
+                             QShortcut, QApplication, QLabel)
 from PyQt5.QtGui import QKeySequence
 from PyQt5.QtGui import QIcon
-from pkg_resources import resource_filename
-from view.prepare_day_dialog import PrepareDayDialog
-from view.log_progress_dialog import LogProgressDialog
-from view.add_adhoc_task_dialog import AddAdhocTaskDialog
+from importlib.resources import files
 from view.editor_pane import EditorPane
+from view.tab_placeholder import TabPlaceholder
 from view.menu_bar import MenuBar
 from view.file_tabs import FileTabs
 
@@ -26,17 +25,39 @@ class TopLevelWindow(QMainWindow):
     """Docstring."""
 
     title = "Atlas"
-    icon = 'icon'
+    icon = 'icon.png'
     timer = None
     open_file = pyqtSignal(str)
+    tab_created = pyqtSignal(object)
+    # Emitted from file writer threads: tab, path, text written, error
+    file_saved = pyqtSignal(object, str, str, object)
+    # Emitted from the backup thread: files done, files in total
+    backup_progress = pyqtSignal(int, int)
+    # Emitted from the backup thread: archive path, result, error
+    backup_finished = pyqtSignal(str, object, object)
+    # A watched file was changed on disk (see `watch_file()`)
+    file_changed_on_disk = pyqtSignal(str)
     previous_folder = None
+    status_message_timeout = 5000
+    # Milliseconds to wait for a file being changed on disk to settle
+    file_change_delay = 200
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.widget = QWidget()
         self.read_only_tabs = False
+        self.log_viewer = None
+        self.search_panel = None
+        self.task_statistics_label = QLabel()
         self.menu_bar = MenuBar(self.widget)
         self.tabs = FileTabs()
+        self.tabs.currentChanged.connect(self.materialize_current_tab)
+        self.file_watcher = QFileSystemWatcher(self)
+        self.file_watcher.fileChanged.connect(self.file_changed)
+        self.changed_files = set()
+        self.file_change_timer = QTimer(self)
+        self.file_change_timer.setSingleShot(True)
+        self.file_change_timer.timeout.connect(self.report_changed_files)
         self.open_file_heading = "Open file"
         self.save_file_heading = "Save file"
         self.atlas_file_extension_for_saving = "Atlas (*.pmd.txt)"
@@ -45,7 +66,7 @@ class TopLevelWindow(QMainWindow):
         """Docstring."""
 
         self.setWindowIcon(QIcon(
-            resource_filename('resources', 'images/' + self.icon)))
+            str(files('resources').joinpath('images', self.icon))))
         self.update_title()
         screen_width, screen_height = screen_size()
         self.setMinimumSize(screen_width // 2, screen_height // 2)
@@ -54,6 +75,7 @@ class TopLevelWindow(QMainWindow):
         self.widget.setLayout(widget_layout)
         self.tabs.setMovable(True)
         self.setCentralWidget(self.tabs)
+        self.statusBar().addPermanentWidget(self.task_statistics_label)
         self.showMaximized()
 
     def setup_menu(self, functions):
@@ -96,6 +118,11 @@ class TopLevelWindow(QMainWindow):
         file_menu.addAction(save_file_as)
         actions['save_file_as'] = save_file_as
 
+        search_portfolio = QAction("Search portfolio", self)
+        search_portfolio.setShortcut("Ctrl+Shift+F")
+        file_menu.addAction(search_portfolio)
+        actions['search_portfolio'] = search_portfolio
+
         close_file = QAction("Close file", self)
         close_file.setShortcut("Ctrl+W")
         file_menu.addAction(close_file)
@@ -201,6 +228,10 @@ class TopLevelWindow(QMainWindow):
         lists_menu.addAction(extract_earned_time)
         actions['extract_earned_time'] = extract_earned_time
 
+        review_earned_time = QAction("Review earned time", self)
+        lists_menu.addAction(review_earned_time)
+        actions['review_earned_time'] = review_earned_time
+
         # Logs
         logs_menu = menu_bar.addMenu("Logs")
 
@@ -214,11 +245,20 @@ class TopLevelWindow(QMainWindow):
         logs_menu.addAction(log_expense)
         actions['log_expense'] = log_expense
 
+        browse_log_archive = QAction("Browse log archive", self)
+        logs_menu.addAction(browse_log_archive)
+        actions['browse_log_archive'] = browse_log_archive
+
         back_up = QAction("Back up portfolio", self)
         back_up.setShortcut("Alt+B")
         logs_menu.addAction(back_up)
         actions['back_up'] = back_up
 
+        back_up_archive = QAction("Back up portfolio to archive", self)
+        back_up_archive.setShortcut("Shift+Alt+B")
+        logs_menu.addAction(back_up_archive)
+        actions['back_up_archive'] = back_up_archive
+
         # Other
         other_menu = menu_bar.addMenu("Other")
 
@@ -243,6 +283,18 @@ class TopLevelWindow(QMainWindow):
         other_menu.addAction(extract_shlist)
         actions['extract_shlist'] = extract_shlist
 
+        task_history = QAction("Task history", self)
+        other_menu.addAction(task_history)
+        actions['task_history'] = task_history
+
+        rescheduled_tasks = QAction("Most rescheduled tasks", self)
+        other_menu.addAction(rescheduled_tasks)
+        actions['rescheduled_tasks'] = rescheduled_tasks
+
+        performance = QAction("Performance", self)
+        other_menu.addAction(performance)
+        actions['performance'] = performance
+
         # Connections
         for key in actions:
             actions[key].triggered.connect(functions[key])
@@ -251,7 +303,7 @@ class TopLevelWindow(QMainWindow):
     def current_tab(self):
         """Docstring."""
 
-        return self.tabs.currentWidget()
+        return self.materialize(self.tabs.currentWidget())
 
     def get_open_file_path(self, folder, extensions):
         """Get the path of the file to load (dialog)."""
@@ -275,16 +327,77 @@ class TopLevelWindow(QMainWindow):
     def add_tab(self, path, text, newline):
         """Docstring."""
 
+        new_tab = self.create_tab(path, text, newline)
+        self.tabs.setCurrentWidget(new_tab)
+        new_tab.setFocus()
+        return new_tab
+
+    def add_placeholder_tab(self, path, newline, load):
+        """Add a tab for `path` without loading the file yet.
+
+        The tab is a `TabPlaceholder`, replaced by an editor when it is first
+        focused or accessed through `current_tab` (see `materialize()`).
+        `load` returns the contents of the file at a given path.
+
+        """
+
+        placeholder = TabPlaceholder(path, newline, load)
+        # The first tab added becomes the current one: do not load it yet
+        self.tabs.blockSignals(True)
+        try:
+            self.tabs.addTab(placeholder, placeholder.label)
+        finally:
+            self.tabs.blockSignals(False)
+        return placeholder
+
+    def is_placeholder(self, widget):
+        """Check if tab `widget` is a placeholder, not yet loaded."""
+
+        return isinstance(widget, TabPlaceholder)
+
+    def materialize(self, widget):
+        """Return the editor of tab `widget`, loading its file if needed."""
+
+        if not isinstance(widget, TabPlaceholder):
+            return widget
+        index = self.tabs.indexOf(widget)
+        current_index = self.tabs.currentIndex()
+        text = widget.text()
+        # Swapping the tab must not look like a change of the current tab
+        self.tabs.blockSignals(True)
+        try:
+            self.tabs.removeTab(index)
+            new_tab = self.create_tab(widget.path, text, widget.newline,
+                                      index)
+            self.tabs.setCurrentIndex(current_index)
+        finally:
+            self.tabs.blockSignals(False)
+        widget.deleteLater()
+        if index == current_index:
+            new_tab.setFocus()
+            self.update_title(new_tab.label)
+        return new_tab
+
+    def materialize_current_tab(self, index):
+        """Load the file of the newly focused tab, if not loaded yet."""
+
+        self.materialize(self.tabs.widget(index))
+
+    def create_tab(self, path, text, newline, index=-1):
+        """Create an editor tab at `index` (by default, the last one)."""
+
         new_tab = EditorPane(path, text, newline)
-        new_tab_index = self.tabs.addTab(new_tab, new_tab.label)
+        self.tabs.insertTab(index, new_tab, new_tab.label)
 
         @new_tab.modificationChanged.connect
         def on_modified():
             """Docstring."""
 
-            modified_tab_index = self.tabs.currentIndex()
+            # The modified tab is not necessarily the current one
+            modified_tab_index = self.tabs.indexOf(new_tab)
             self.tabs.setTabText(modified_tab_index, new_tab.label)
-            self.update_title(new_tab.label)
+            if new_tab is self.tabs.currentWidget():
+                self.update_title(new_tab.label)
 
         @new_tab.open_file.connect
         def on_open_file(file):
@@ -293,10 +406,9 @@ class TopLevelWindow(QMainWindow):
             # Bubble the signal up
             self.open_file.emit(file)
 
-        self.tabs.setCurrentIndex(new_tab_index)
-        new_tab.setFocus()
         if self.read_only_tabs:
             new_tab.setReadOnly(self.read_only_tabs)
+        self.tab_created.emit(new_tab)
         return new_tab
 
     @property
@@ -334,6 +446,58 @@ class TopLevelWindow(QMainWindow):
             message_box.setIcon(message_box.Warning)
         message_box.exec()
 
+    def watch_file(self, path):
+        """Report changes to file `path` (see `file_changed_on_disk`)."""
+
+        if path not in self.file_watcher.files():
+            self.file_watcher.addPath(path)
+
+    def unwatch_file(self, path):
+        """Stop reporting changes to file `path`."""
+
+        self.file_watcher.removePath(path)
+        self.changed_files.discard(path)
+
+    def file_changed(self, path):
+        """Note that watched file `path` changed, and wait for more changes.
+
+        Programs (synchronisation clients among them) often write a file in
+        several steps, or replace it with a new one. Changes are reported
+        once files have been left alone for `file_change_delay`.
+
+        """
+
+        self.changed_files.add(path)
+        self.file_change_timer.start(self.file_change_delay)
+
+    def report_changed_files(self):
+        """Emit `file_changed_on_disk` for each file changed recently."""
+
+        changed_files, self.changed_files = self.changed_files, set()
+        for path in sorted(changed_files):
+            # A file replaced by a new one is no longer watched, even though
+            # the watcher may still list it
+            self.file_watcher.removePath(path)
+            if os.path.exists(path):
+                self.file_watcher.addPath(path)
+            self.file_changed_on_disk.emit(path)
+
+    def process_pending_events(self):
+        """Handle queued events, such as signals from other threads."""
+
+        QApplication.processEvents()
+
+    def show_status_message(self, message):
+        """Show `message` in the status bar for a few seconds."""
+
+        self.statusBar().showMessage(message, self.status_message_timeout)
+
+    def show_task_statistics(self, text):
+        """Show `text` in the status bar until replaced; hide it if empty."""
+
+        self.task_statistics_label.setText(text)
+        self.task_statistics_label.setVisible(bool(text))
+
     def show_confirmation(self, message, information=None, icon=None):
         """Docstring."""
 
@@ -426,6 +590,7 @@ class TopLevelWindow(QMainWindow):
     def show_prepare_day_plan(self, target_day, target_month, target_year):
         """Docstring."""
 
+        from view.prepare_day_dialog import PrepareDayDialog
         # ~ finder = FindReplaceDialog(self)
         finder = PrepareDayDialog(self)
         finder.setup(target_day, target_month, target_year)
@@ -437,15 +602,36 @@ class TopLevelWindow(QMainWindow):
     def show_log_progress(self):
         """Docstring."""
 
+        from view.log_progress_dialog import LogProgressDialog
         log_entry = LogProgressDialog(self)
         log_entry.setup()
         if log_entry.exec():
             return log_entry.log_entry()
         return None
 
+    def show_log_viewer(self, partitions, open_lines):
+        """Open a window browsing log `partitions` (see `LogViewer`)."""
+
+        from view.log_viewer import LogViewer
+        self.log_viewer = LogViewer(partitions, open_lines, self)
+        self.log_viewer.setup()
+        self.log_viewer.show()
+
+    def show_search_panel(self, search, open_hit):
+        """Show the search panel (see `SearchPanel`), and focus its query."""
+
+        if self.search_panel is None:
+            from view.search_panel import SearchPanel
+            self.search_panel = SearchPanel(search, open_hit, self)
+            self.search_panel.setup()
+            self.addDockWidget(Qt.RightDockWidgetArea, self.search_panel)
+        self.search_panel.show()
+        self.search_panel.focus_query()
+
     def show_add_adhoc_task(self):
         """Docstring."""
 
+        from view.add_adhoc_task_dialog import AddAdhocTaskDialog
         adhoc_task = AddAdhocTaskDialog(self)
         adhoc_task.setup()
         if adhoc_task.exec():
@@ -0,0 +1,94 @@
+import os
+import sys
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+from model.auxiliaries import AUXILIARIES, extract_auxiliaries  # noqa: E402
+from model.settings import load_settings  # noqa: E402
+from model.tokenizer import Tokenizer  # noqa: E402
+
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+HOME = """# TTL #
+t Fix the tap dur:20 +home
+
+# INCOMING #
+- Water the plants dur:5 rec:1d +home
+- Pay the rent dur:5 due:2020-02-01 rec:1m +home
+- Renew the insurance due:2020-03-15 +home
+- Buy milk @shlist +home
+t Buy bread due:2020-01-31 @shlist +home
+- Buy coffee rec:2w due:2020-02-01 @shlist +home
+x 2020-01-20 - Buy soap @shlist +home
+x 2020-01-20 - Call the plumber due:2020-01-20 +home
+| Paint the fence due:2020-05-01 rec:1y +home
+- Tidy up dur:15 +home
+"""
+CAR = """# Tasks
+t Check the tyres dur:10 rec:1d +car
+- Service the car dur:60 due:2020-04-01 rec:+1y +car
+- Pay the parking fine due:2020-02-10 +car
+
+> Notes are not tasks due:2020-01-01 rec:1d
+"""
+
+
+def legacy_extract(texts, settings):
+    """Extract auxiliary lists the way the four extract commands did."""
+
+    def extract(matches):
+        return [line for text in texts for line in text.split('\n')
+                if line[:1] in settings.active_task_prefixes
+                and matches(line)]
+
+    return {
+        'daily': extract(lambda line: settings.daily_rec_prop_val in line),
+        'booked': extract(lambda line: settings.due_prop in line
+                          and settings.rec_prop not in line),
+        'periodic': extract(lambda line: settings.rec_prop in line
+                            and settings.daily_rec_prop_val not in line),
+        'shlist': extract(lambda line: settings.shlist_cat in line),
+    }
+
+
+class ExtractAuxiliariesTest(unittest.TestCase):
+
+    def test_routing(self):
+        extracted = extract_auxiliaries([HOME, CAR], self.settings,
+                                        self.tokenizer)
+        self.assertEqual(extracted, {
+            'daily': ["- Water the plants dur:5 rec:1d +home",
+                      "t Check the tyres dur:10 rec:1d +car"],
+            'booked': ["- Renew the insurance due:2020-03-15 +home",
+                       "t Buy bread due:2020-01-31 @shlist +home",
+                       "- Pay the parking fine due:2020-02-10 +car"],
+            'periodic': [
+                "- Pay the rent dur:5 due:2020-02-01 rec:1m +home",
+                "- Buy coffee rec:2w due:2020-02-01 @shlist +home",
+                "- Service the car dur:60 due:2020-04-01 rec:+1y +car"],
+            'shlist': ["- Buy milk @shlist +home",
+                       "t Buy bread due:2020-01-31 @shlist +home",
+                       "- Buy coffee rec:2w due:2020-02-01 @shlist +home"],
+        })
+
+    def test_names(self):
+        extracted = extract_auxiliaries([HOME, CAR], self.settings,
+                                        self.tokenizer, ('booked',))
+        self.assertEqual(list(extracted), ['booked'])
+        self.assertEqual(len(extracted['booked']), 3)
+
+    # The single pass extracts what the four extract commands did
+    def test_same_as_legacy_extraction(self):
+        texts = [HOME, CAR]
+        extracted = extract_auxiliaries(texts, self.settings, self.tokenizer)
+        self.assertEqual(list(extracted), list(AUXILIARIES))
+        self.assertEqual(extracted, legacy_extract(texts, self.settings))
+
+    # Utility functions
+    def setUp(self):
+        self.settings = load_settings(CONFIG_FILE)
+        self.tokenizer = Tokenizer(self.settings)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import datetime
+import io
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import unittest
+from unittest import mock
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+from model.backup import (BackupStore, verify_archive,  # noqa: E402
+                          write_archive)
+
+
+class PortfolioTestCase(unittest.TestCase):
+    """Test case with a small portfolio directory."""
+
+    def write(self, relative_path, text):
+        path = os.path.join(self.portfolio, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file_:
+            file_.write(text)
+        # Make the change visible even within the timestamp resolution
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.portfolio = os.path.join(self.folder, 'portfolio')
+        self.write('home.pmd.txt', "Same\n")
+        self.write('work.pmd.txt', "Same\n")
+        self.write('log/log.pmd.txt', "LOG-1\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+
+class BackupStoreTest(PortfolioTestCase):
+
+    def test_first_backup(self):
+        snapshot = self.back_up(2020, 1, 1)
+        self.assertEqual(snapshot['name'], '20200101120000')
+        self.assertEqual(snapshot['files'], 3)
+        # The two identical files are stored once
+        self.assertEqual(snapshot['stored_files'], 2)
+        self.assertEqual(sorted(self.store.read_manifest('20200101120000')),
+                         ['home.pmd.txt', 'log/log.pmd.txt', 'work.pmd.txt'])
+
+    # Only changed files are stored again
+    def test_incremental_backup(self):
+        self.back_up(2020, 1, 1)
+        snapshot = self.back_up(2020, 1, 2)
+        self.assertEqual((snapshot['files'], snapshot['stored_files']),
+                         (3, 0))
+        self.write('work.pmd.txt', "Work, changed\n")
+        snapshot = self.back_up(2020, 1, 3)
+        self.assertEqual(snapshot['stored_files'], 1)
+        self.assertEqual(snapshot['stored_bytes'], len("Work, changed\n"))
+
+    # The store itself is not backed up when inside the portfolio
+    def test_store_inside_portfolio(self):
+        self.store = BackupStore(os.path.join(self.portfolio, 'backup'))
+        self.back_up(2020, 1, 1)
+        snapshot = self.back_up(2020, 1, 2)
+        self.assertEqual(snapshot['files'], 3)
+
+    # Derived files, rewritten as portfolio files are saved, are left out
+    def test_derived_files_excluded(self):
+        self.write('search.sqlite3', "Index")
+        self.write('log/log.pmd.txt.idx', "Offsets")
+        self.back_up(2020, 1, 1)
+        self.write('home.pmd.txt', "Home, changed\n")
+        self.write('search.sqlite3', "Index, changed")
+        self.write('log/log.pmd.txt.idx', "Offsets, changed")
+        snapshot = self.back_up(2020, 1, 2)
+        self.assertEqual((snapshot['files'], snapshot['stored_files']),
+                         (3, 1))
+        self.assertEqual(snapshot['stored_bytes'], len("Home, changed\n"))
+        self.assertEqual(sorted(self.store.read_manifest('20200102120000')),
+                         ['home.pmd.txt', 'log/log.pmd.txt', 'work.pmd.txt'])
+
+    def test_restore(self):
+        self.back_up(2020, 1, 1)
+        self.write('home.pmd.txt', "Home, changed\n")
+        self.back_up(2020, 1, 2)
+        target = os.path.join(self.folder, 'restored')
+        self.store.restore('20200101120000', target)
+        with open(os.path.join(target, 'home.pmd.txt')) as file_:
+            self.assertEqual(file_.read(), "Same\n")
+        with open(os.path.join(target, 'log', 'log.pmd.txt')) as file_:
+            self.assertEqual(file_.read(), "LOG-1\n")
+
+    # The newest snapshots and the newest of each day/month are kept
+    def test_prune(self):
+        for day in (1, 2, 3):
+            self.write('work.pmd.txt', "Work {}\n".format(day))
+            self.back_up(2020, 1, day)
+            self.back_up(2020, 1, day, 13)
+        self.back_up(2020, 2, 1)
+        removed = self.store.prune(keep_last=2, keep_daily=2,
+                                   keep_monthly=2)
+        self.assertEqual(removed, ['20200101120000', '20200101130000',
+                                   '20200102120000', '20200102130000',
+                                   '20200103120000'])
+        self.assertEqual(self.store.snapshots(),
+                         ['20200103130000', '20200201120000'])
+        # Objects only used by removed snapshots are deleted
+        objects = sum(len(files) for _, _, files
+                      in os.walk(self.store.objects_dir))
+        self.assertEqual(objects, 3)
+
+    # Utility functions
+    def back_up(self, year, month, day, hour=12):
+        return self.store.back_up(
+            self.portfolio, datetime.datetime(year, month, day, hour),
+            ('search.sqlite3*', '*.idx'))
+
+    def setUp(self):
+        super().setUp()
+        self.store = BackupStore(os.path.join(self.folder, 'backup'))
+
+
+class ArchiveTest(PortfolioTestCase):
+
+    def test_write_archive(self):
+        calls = []
+        result = write_archive(self.portfolio, self.archive, 'xz',
+                               progress=lambda *args: calls.append(args))
+        self.assertEqual(result['files'], 3)
+        self.assertEqual(calls, [(1, 3), (2, 3), (3, 3)])
+        self.assertEqual(verify_archive(self.archive), 3)
+        with tarfile.open(self.archive) as archive:
+            self.assertEqual(archive.extractfile('log/log.pmd.txt').read(),
+                             b"LOG-1\n")
+        self.assertEqual(os.listdir(os.path.dirname(self.archive)),
+                         ['atlas.tar.xz'])
+
+    # As on Windows, flushing to disk requires a handle open for writing
+    def test_archive_flushed_while_writing(self):
+        with mock.patch('os.fsync', side_effect=lambda fd: os.write(fd, b'')):
+            write_archive(self.portfolio, self.archive, 'xz')
+        self.assertEqual(verify_archive(self.archive), 3)
+
+    # The backup directory is left out when inside the portfolio
+    def test_exclude_dir(self):
+        archive = os.path.join(self.portfolio, 'backup', 'atlas.tar.gz')
+        write_archive(self.portfolio, archive, 'gz')
+        result = write_archive(self.portfolio, archive, 'gz',
+                               exclude_dir=os.path.dirname(archive))
+        self.assertEqual(result['files'], 3)
+
+    def test_exclude_names(self):
+        self.write('search.sqlite3', "Index")
+        result = write_archive(self.portfolio, self.archive, 'xz',
+                               exclude_names=('search.sqlite3*',))
+        self.assertEqual(result['files'], 3)
+        with tarfile.open(self.archive) as archive:
+            self.assertNotIn('search.sqlite3', archive.getnames())
+
+    def test_verify_tampered_archive(self):
+        write_archive(self.portfolio, self.archive, 'xz')
+        with tarfile.open(self.archive) as archive:
+            members = [(member, archive.extractfile(member).read())
+                       for member in archive]
+        with tarfile.open(self.archive, 'w:xz') as archive:
+            for member, data in members:
+                if member.name == 'home.pmd.txt':
+                    data = data.upper()
+                archive.addfile(member, io.BytesIO(data))
+        with self.assertRaises(ValueError):
+            verify_archive(self.archive)
+
+    def setUp(self):
+        super().setUp()
+        self.archive = os.path.join(self.folder, 'archives', 'atlas.tar.xz')
+
+
+if __name__ == '__main__':
+    unittest.main()
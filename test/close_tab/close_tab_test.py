@@ -0,0 +1,72 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+from model.logic import Editor  # noqa: E402
+from model.settings import read_config  # noqa: E402
+from view.top_level_window import TopLevelWindow  # noqa: E402
+
+APP = QApplication.instance() or QApplication(sys.argv[:1])
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+
+
+class CloseTabTest(unittest.TestCase):
+
+    def test_close_file(self):
+        self.editor.close_file()
+        self.assertForgotten(self.daily_path)
+
+    # The file moved to the archive is no longer watched at its old path
+    def test_move_daily_tasks_file(self):
+        self.editor.move_daily_tasks_file()
+        self.assertForgotten(self.daily_path)
+        self.assertTrue(os.path.exists(
+            os.path.join(self.archive_dir, '20240102.pmd.txt')))
+
+    # Utility functions
+    def assertForgotten(self, path):
+        self.assertIsNone(self.editor.find_widget(path))
+        self.assertNotIn(path, self.window.file_watcher.files())
+        self.assertNotIn(path, self.editor.disk_contents)
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        base = os.path.join(self.folder, '')
+        self.archive_dir = os.path.join(base + 'archive', '')
+        os.mkdir(self.archive_dir)
+        path = base + 'home.pmd.txt'
+        self.daily_path = base + '20240102.pmd.txt'
+        for path_, text in ((path, "# Tasks\n- Fix the roof +home\n"),
+                            (self.daily_path, "- Fix the roof +home\n")):
+            with open(path_, 'w') as file_:
+                file_.write(text)
+        config = read_config(CONFIG_FILE)
+        config['USER']['portfolio_base_dir'] = base
+        config['USER']['daily_files_archive_dir'] = self.archive_dir
+        config['USER']['portfolio_files'] = path
+        config['USER']['tab_order'] = path
+        config_path = base + 'config.ini'
+        with open(config_path, 'w') as config_file:
+            config.write(config_file)
+        self.window = TopLevelWindow()
+        self.window.show_message = self.fail
+        self.editor = Editor(self.window, config_path)
+        self.window.setup()
+        self.editor.setup()
+        self.editor.open_file(self.daily_path)
+        self.assertIn(self.daily_path, self.window.file_watcher.files())
+        self.assertIn(self.daily_path, self.editor.disk_contents)
+
+    def tearDown(self):
+        self.editor.wait_for_saves()
+        shutil.rmtree(self.folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import sys
+import unittest
+
+from json_settings import JsonSettings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+from model.settings import load_settings  # noqa: E402
+
+
+class SettingsTest(unittest.TestCase):
+
+    # Plain string options
+    def test_string_options(self):
+        for option in ('portfolio_base_dir', 'portfolio_log_file',
+                       'daily_file', 'booked_file', 'periodic_file',
+                       'shlist_file', 'today_file', 'heading_prefix',
+                       'ttl_heading', 'due_prop', 'dur_prop', 'rec_prop',
+                       'daily_rec_prop_val', 'tag_prefix', 'work_tag',
+                       'cat_prefix', 'shlist_cat', 'done_task_prefix',
+                       'time_separator', 'date_separator',
+                       'earned_time_balance_form'):
+            with self.subTest(option=option):
+                self.assertEqual(self.js.settings[option],
+                                 getattr(self.settings, option))
+
+    # space
+    def test_space(self):
+        self.assertEqual(self.js.settings['space'], self.settings.space)
+
+    # portfolio_files
+    def test_portfolio_files(self):
+        self.assertEqual(tuple(self.js.settings['portfolio_files']),
+                         self.settings.portfolio_files)
+        for path in self.js.settings['portfolio_files']:
+            self.assertTrue(self.settings.is_portfolio_file(path))
+        self.assertFalse(self.settings.is_portfolio_file(
+            self.js.settings['daily_file']))
+
+    # tab_order
+    def test_tab_order(self):
+        self.assertEqual(tuple(self.js.settings['tab_order']),
+                         self.settings.tab_order)
+
+    # tokens_in_sorting_order
+    def test_tokens_in_sorting_order(self):
+        self.assertEqual(tuple(self.js.settings['tokens_in_sorting_order']),
+                         self.settings.tokens_in_sorting_order)
+
+    # active_task_prefixes
+    def test_active_task_prefixes(self):
+        self.assertEqual(frozenset(self.js.settings['active_task_prefixes']),
+                         self.settings.active_task_prefixes)
+
+    # reserved_word_prefixes
+    def test_reserved_word_prefixes(self):
+        self.assertEqual(
+            frozenset(self.js.settings['reserved_word_prefixes']),
+            self.settings.reserved_word_prefixes)
+
+    # log_line_length
+    def test_log_line_length(self):
+        self.assertEqual(self.js.settings['log_line_length'],
+                         self.settings.log_line_length)
+
+    # get_data_from_calendars
+    def test_get_data_from_calendars(self):
+        self.assertEqual(self.js.settings['get_data_from_calendars'],
+                         self.settings.get_data_from_calendars)
+
+    # Optional options fall back to their defaults
+    def test_optional_options(self):
+        self.assertEqual(self.settings.backup_keep_last, 10)
+        self.assertEqual(self.settings.backup_keep_daily, 14)
+        self.assertEqual(self.settings.backup_keep_monthly, 12)
+        self.assertEqual(self.settings.backup_compression, 'xz')
+        self.assertEqual(self.settings.log_storage, 'prepend')
+        self.assertEqual(self.settings.log_partition, '')
+
+    # schedule_stamp
+    def test_schedule_stamp(self):
+        self.assertTrue(self.settings.schedule_stamp.match(
+            "09:30 - Task dur:30 +work"))
+        self.assertFalse(self.settings.schedule_stamp.match(
+            "- Task dur:30 +work"))
+
+    # due_date
+    def test_due_date(self):
+        self.assertEqual(self.settings.due_date.sub(
+            "due:2020-02-02", "- Task due:2019-01-01 rec:1m"),
+            "- Task due:2020-02-02 rec:1m")
+
+    # Settings are read-only
+    def test_read_only(self):
+        with self.assertRaises(AttributeError):
+            self.settings.space = '_'
+
+    # Utility functions
+    def setUp(self):
+        self.js = JsonSettings()
+        self.settings = load_settings('config_file.ini')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+from model.daily_archive import (DailyArchive, STORE_NAME,  # noqa: E402
+                                 daily_tasks)
+from model.settings import load_settings  # noqa: E402
+from model.tokenizer import Tokenizer  # noqa: E402
+
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+
+DAY_1 = """> Total earned time (earned work time) = 00:30 (00:00)
+# Tasks proposed for 2020-01-30
+09:00 - Pay rent due:2020-01-01 rec:1m dur:5 +home
+t Write report dur:90 +work
+# Tasks DONE on 2020-01-30
+x 2020-01-30 - Clean the kitchen dur:30 +home
+r 2020-01-30 - Call the bank dur:10
+"""
+
+DAY_2 = """# Tasks proposed for 2020-01-31
+- Call the bank dur:10
+# Tasks DONE on 2020-01-31
+x Write report dur:90 +work
+R 2020-01-31 09:05 - Pay rent due:2020-01-01 rec:1m dur:5 +home
+"""
+
+
+class DailyTasksTest(unittest.TestCase):
+
+    def test_daily_tasks(self):
+        settings = load_settings(CONFIG_FILE)
+        self.assertEqual(
+            daily_tasks(DAY_1, Tokenizer(settings), settings),
+            [(2, '-', 'Pay rent'), (3, 't', 'Write report'),
+             (5, 'x', 'Clean the kitchen'), (6, 'r', 'Call the bank')])
+
+
+class DailyArchiveTest(unittest.TestCase):
+
+    def test_ingest_directory(self):
+        self.write('20200130.pmd.txt', DAY_1)
+        self.write('20200131.pmd.txt', DAY_2)
+        self.write('notes.pmd.txt', DAY_2)
+        self.assertEqual(self.archive.ingest_directory(self.folder),
+                         ['20200130', '20200131'])
+        self.assertEqual(self.archive.days(), ['20200130', '20200131'])
+        self.assertEqual(self.archive.text('20200130'), DAY_1)
+        # Files already stored are not read again
+        self.assertEqual(self.archive.ingest_directory(self.folder), [])
+
+    # A changed file replaces its day; a removed one stays stored
+    def test_changed_and_removed_files(self):
+        path = self.write('20200130.pmd.txt', DAY_1)
+        self.assertTrue(self.archive.ingest(path))
+        self.assertFalse(self.archive.ingest(path))
+        self.write('20200130.pmd.txt', DAY_2)
+        os.utime(path, ns=(0, 1))
+        self.assertEqual(self.archive.ingest_directory(self.folder),
+                         ['20200130'])
+        self.assertEqual(self.archive.tasks('20200130'),
+                         ['Call the bank', 'Write report', 'Pay rent'])
+        os.remove(path)
+        self.archive.ingest_directory(self.folder)
+        self.assertEqual(self.archive.text('20200130'), DAY_2)
+
+    def test_history(self):
+        self.write('20200130.pmd.txt', DAY_1)
+        self.write('20200131.pmd.txt', DAY_2)
+        self.archive.ingest_directory(self.folder)
+        self.assertEqual(self.archive.history('Pay rent'),
+                         [('20200130', '-'), ('20200131', 'R')])
+        self.assertEqual(self.archive.tasks('20200131', 'x'),
+                         ['Write report'])
+        self.assertEqual(self.archive.reschedule_counts(),
+                         [('Call the bank', 1, '20200130'),
+                          ('Pay rent', 1, '20200131')])
+        self.assertEqual(len(self.archive.reschedule_counts(1)), 1)
+
+    def write(self, name, text):
+        path = os.path.join(self.folder, name)
+        with open(path, 'w', encoding='UTF-8') as file_:
+            file_.write(text)
+        return path
+
+    def setUp(self):
+        self.tokenizer = Tokenizer(load_settings(CONFIG_FILE))
+        self.folder = tempfile.mkdtemp()
+        self.archive = DailyArchive(os.path.join(self.folder, STORE_NAME),
+                                    self.tokenizer, 'UTF-8')
+
+    def tearDown(self):
+        self.archive.close()
+        shutil.rmtree(self.folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+from model.earned_times import (EarnedTimes, STORE_SUFFIX,  # noqa: E402
+                                line_pattern, parse_line)
+from model.settings import load_settings  # noqa: E402
+
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+
+
+def line(day, total, work):
+    return "{} > Total earned time (earned work time) = {} ({})".format(
+        day, total, work)
+
+
+LINES = [
+    line('20200106', '02:00', '01:00'),
+    line('20200107', '01:30', '00:30'),
+    line('20200113', '03:00', '03:00'),
+    line('20200201', '00:45', '00:00'),
+    line('20210101', '01:00', '01:00'),
+]
+
+
+def days(*values):
+    return np.array(values, dtype='datetime64[D]')
+
+
+class EarnedTimesTest(unittest.TestCase):
+
+    def test_parse_line(self):
+        pattern = line_pattern(self.settings)
+        self.assertEqual(parse_line(LINES[0], pattern),
+                         (737430, 120, 60))
+        self.assertIsNone(parse_line("20200106 no times", pattern))
+        self.assertIsNone(parse_line(line('20201350', '01:00', '01:00'),
+                                     pattern))
+
+    # The store is written on first read, and used while the text is as is
+    def test_store(self):
+        self.write(LINES)
+        earned_times = EarnedTimes(self.path, self.settings)
+        self.assertTrue(os.path.exists(self.path + STORE_SUFFIX))
+        self.assertEqual(list(earned_times.total), [120, 90, 180, 45, 60])
+        with open(self.path, 'a') as file_:
+            file_.write(line('20210102', '00:10', '00:05') + '\n')
+        earned_times = EarnedTimes(self.path, self.settings)
+        self.assertEqual(list(earned_times.work), [60, 30, 180, 0, 60, 5])
+
+    def test_append(self):
+        self.write(LINES[:2])
+        earned_times = EarnedTimes(self.path, self.settings)
+        earned_times.append(LINES[2])
+        self.assertEqual(list(earned_times.total), [120, 90, 180])
+        self.assertEqual(self.read(), '\n'.join(LINES[:3]) + '\n')
+        # Without its store, the text is read again
+        os.remove(self.path + STORE_SUFFIX)
+        earned_times.append(LINES[3])
+        self.assertEqual(list(earned_times.total), [120, 90, 180, 45])
+        reread = EarnedTimes(self.path, self.settings)
+        self.assertEqual(list(reread.records), list(earned_times.records))
+
+    def test_append_to_new_file(self):
+        earned_times = EarnedTimes(self.path, self.settings)
+        self.assertEqual(len(earned_times.dates), 0)
+        earned_times.append(LINES[0])
+        self.assertEqual(list(earned_times.total), [120])
+
+    # A day extracted again counts with its last extraction
+    def test_last_extraction_wins(self):
+        self.write(LINES[:2] + [line('20200106', '04:00', '02:00')])
+        earned_times = EarnedTimes(self.path, self.settings)
+        self.assertEqual(list(earned_times.total), [240, 90])
+        self.assertEqual(list(earned_times.work), [120, 30])
+
+    def test_totals_by(self):
+        self.write(LINES)
+        earned_times = EarnedTimes(self.path, self.settings)
+        starts, total, work = earned_times.totals_by('week')
+        np.testing.assert_array_equal(
+            starts, days('2020-01-06', '2020-01-13', '2020-01-27',
+                         '2020-12-28'))
+        self.assertEqual(list(total), [210, 180, 45, 60])
+        self.assertEqual(list(work), [90, 180, 0, 60])
+        starts, total, work = earned_times.totals_by('month')
+        np.testing.assert_array_equal(
+            starts, days('2020-01-01', '2020-02-01', '2021-01-01'))
+        self.assertEqual(list(total), [390, 45, 60])
+        starts, total, work = earned_times.totals_by('year')
+        np.testing.assert_array_equal(starts,
+                                      days('2020-01-01', '2021-01-01'))
+        self.assertEqual(list(work), [270, 60])
+
+    def test_rolling_average(self):
+        self.write(LINES[:3])
+        earned_times = EarnedTimes(self.path, self.settings)
+        dates, total, work = earned_times.rolling_average(7)
+        self.assertEqual(len(dates), 8)
+        self.assertEqual(dates[-1], np.datetime64('2020-01-13'))
+        self.assertEqual(list(total[:2]), [120, 105])
+        # 07 and 13 are in the 7 days up to 13
+        self.assertAlmostEqual(total[-1], 270 / 7)
+        self.assertAlmostEqual(work[-1], 210 / 7)
+
+    def write(self, lines):
+        with open(self.path, 'w') as file_:
+            file_.write('\n'.join(lines) + '\n')
+
+    def read(self):
+        with open(self.path) as file_:
+            return file_.read()
+
+    def setUp(self):
+        self.settings = load_settings(CONFIG_FILE)
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'earned.pmd.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import sys
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+from view.editor_pane import EditorPane  # noqa: E402
+
+APP = QApplication.instance() or QApplication(sys.argv[:1])
+TEXT = "# Heading\n\n- One\n- Two\n- Ünïcode"
+
+
+class EditorPaneTest(unittest.TestCase):
+
+    def test_line(self):
+        self.assertEqual(self.pane.line(0), "# Heading")
+        self.assertEqual(self.pane.line(4), "- Ünïcode")
+
+    def test_replace_line(self):
+        self.pane.replace_line(2, "x One")
+        self.pane.replace_line(4, "- Last")
+        self.assertEqual(self.pane.text(),
+                         "# Heading\n\nx One\n- Two\n- Last")
+
+    def test_insert_line_after(self):
+        self.pane.insert_line_after(-1, "Top")
+        self.pane.insert_line_after(5, "Bottom")
+        self.pane.insert_line_after(3, "Middle")
+        self.assertEqual(
+            self.pane.text(),
+            "Top\n# Heading\n\n- One\nMiddle\n- Two\n- Ünïcode\nBottom")
+
+    def test_delete_line(self):
+        self.pane.delete_line(4)
+        self.pane.delete_line(0)
+        self.assertEqual(self.pane.text(), "\n- One\n- Two")
+
+    def test_swap_lines(self):
+        self.pane.swap_lines(4, 2)
+        self.assertEqual(self.pane.text(),
+                         "# Heading\n\n- Ünïcode\n- Two\n- One")
+
+    def test_append_line(self):
+        self.pane.append_line("- Three")
+        self.assertEqual(self.pane.line(5), "- Three")
+        self.pane.setText("- One\n")
+        self.pane.append_line("- Two")
+        self.assertEqual(self.pane.text(), "- One\n- Two")
+
+    def test_set_lines(self):
+        self.assertFalse(self.pane.set_lines(TEXT.split('\n')))
+        self.assertTrue(self.pane.set_lines(["# Heading", "- Two"]))
+        self.assertEqual(self.pane.text(), "# Heading\n- Two")
+        self.assertTrue(self.pane.set_lines(["a", "b", "c"]))
+        self.assertEqual(self.pane.text(), "a\nb\nc")
+
+    # Edits are undone as a whole, and the earlier history is kept
+    def test_undo(self):
+        self.pane.replace_line(0, "# Renamed")
+        with self.pane.undo_action():
+            self.pane.delete_line(2)
+            self.pane.append_line("x One")
+        self.pane.undo()
+        self.assertEqual(self.pane.text(), TEXT.replace("Heading", "Renamed"))
+        self.pane.undo()
+        self.assertEqual(self.pane.text(), TEXT)
+
+    # Reloading keeps the cursor and scroll position, and is not a change
+    def test_reload(self):
+        self.pane.setCursorPosition(3, 2)
+        self.pane.replace_line(0, "Edited")
+        self.assertTrue(self.pane.reload("# New heading\n\n- One\n- Two"))
+        self.assertEqual(self.pane.text(), "# New heading\n\n- One\n- Two")
+        self.assertEqual(self.pane.getCursorPosition(), (3, 2))
+        self.assertFalse(self.pane.isModified())
+        self.assertFalse(self.pane.reload("# New heading\n\n- One\n- Two"))
+
+    # Replaying the changes reported on a copy of the lines gives the text
+    def test_lines_changed(self):
+        lines = TEXT.split('\n')
+
+        def replay(first, removed, added):
+            lines[first:first + removed] = [
+                self.pane.line(row) for row in range(first, first + added)]
+
+        self.pane.lines_changed.connect(replay)
+        self.pane.insertAt("new\nlines\n", 2, 2)
+        self.pane.swap_lines(0, 3)
+        self.pane.setSelection(1, 0, 4, 1)
+        self.pane.removeSelectedText()
+        self.pane.undo()
+        self.pane.append_line("- Last")
+        self.assertEqual('\n'.join(lines), self.pane.text())
+
+    def setUp(self):
+        self.pane = EditorPane(None, TEXT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+from model.file_writer import atomic_write  # noqa: E402
+from view.top_level_window import TopLevelWindow  # noqa: E402
+
+APP = QApplication.instance() or QApplication(sys.argv[:1])
+
+
+class FileWatcherTest(unittest.TestCase):
+
+    def test_change(self):
+        self.window.watch_file(self.path)
+        self.write("changed")
+        self.assertEqual(self.wait_for_changes(), [self.path])
+
+    # Several changes in a row are reported once
+    def test_changes_are_coalesced(self):
+        self.window.watch_file(self.path)
+        self.write("changed")
+        self.write("changed again")
+        self.assertEqual(self.wait_for_changes(), [self.path])
+
+    # A file replaced by a new one (as by `atomic_write()`) is still watched
+    def test_replaced_file(self):
+        self.window.watch_file(self.path)
+        atomic_write(self.path, "replaced", 'UTF-8')
+        self.assertEqual(self.wait_for_changes(), [self.path])
+        atomic_write(self.path, "replaced again", 'UTF-8')
+        self.assertEqual(self.wait_for_changes(), [self.path])
+
+    def test_unwatch(self):
+        self.window.watch_file(self.path)
+        self.window.unwatch_file(self.path)
+        self.write("changed")
+        self.assertEqual(self.wait_for_changes(timeout=0.5), [])
+
+    # Utility functions
+    def write(self, text):
+        with open(self.path, 'w') as file_:
+            file_.write(text)
+
+    def wait_for_changes(self, timeout=2):
+        deadline = time.monotonic() + timeout
+        while not self.changed and time.monotonic() < deadline:
+            APP.processEvents()
+            time.sleep(0.01)
+        changed = list(self.changed)
+        self.changed.clear()
+        return changed
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'file.txt')
+        self.write("text")
+        self.window = TopLevelWindow()
+        self.window.file_change_delay = 0
+        self.changed = []
+        self.window.file_changed_on_disk.connect(self.changed.append)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+from model.file_writer import atomic_write, FileWriter  # noqa: E402
+
+
+class AtomicWriteTest(unittest.TestCase):
+
+    def test_write(self):
+        atomic_write(self.path, "new\ntext", 'UTF-8')
+        self.assertEqual(self.read(), "new\ntext")
+        self.assertEqual(os.listdir(self.folder), ['file.txt'])
+
+    def test_permissions_are_kept(self):
+        atomic_write(self.path, "old", 'UTF-8')
+        os.chmod(self.path, 0o640)
+        atomic_write(self.path, "new", 'UTF-8')
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o640)
+
+    # A failed write leaves the file as it was, and no temporary file
+    def test_failed_write(self):
+        atomic_write(self.path, "old", 'UTF-8')
+        with self.assertRaises(UnicodeEncodeError):
+            atomic_write(self.path, "Ünïcode", 'ascii')
+        self.assertEqual(self.read(), "old")
+        self.assertEqual(os.listdir(self.folder), ['file.txt'])
+
+    # Utility functions
+    def read(self):
+        with open(self.path, encoding='UTF-8') as file_:
+            return file_.read()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'file.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+
+class FileWriterTest(AtomicWriteTest):
+
+    def test_write_in_background(self):
+        self.writer.write(self.path, "text", self.callback)
+        self.assertEqual(self.writer.pending(self.path), "text")
+        self.writer.flush()
+        self.assertEqual(self.read(), "text")
+        self.assertEqual(self.calls, [(self.path, "text", None)])
+
+    # Writes of the same path are coalesced: only the latest text is written
+    def test_coalescing(self):
+        self.release.clear()
+        self.writer.write(self.path, "first", self.callback)
+        self.writer.write(self.path, "second", self.callback)
+        self.writer.write(self.path, "third")
+        self.assertEqual(self.writer.pending(self.path), "third")
+        self.release.set()
+        self.writer.flush()
+        self.assertEqual(self.read(), "third")
+        self.assertEqual(self.calls, [(self.path, "third", None)] * 2)
+        self.assertIsNone(self.writer.pending(self.path))
+
+    def test_error(self):
+        path = os.path.join(self.folder, 'missing', 'file.txt')
+        self.writer.write(path, "text", self.callback)
+        self.writer.flush()
+        self.assertIsInstance(self.calls[0][2], OSError)
+
+    # Utility functions
+    def callback(self, path, text, error):
+        self.calls.append((path, text, error))
+
+    def setUp(self):
+        super().setUp()
+        self.calls = []
+        self.writer = FileWriter('UTF-8', delay=0)
+        # Writes wait for `release`, so that tests can queue them up
+        self.release = threading.Event()
+        self.release.set()
+        write_path = self.writer._write_path
+        self.writer._write_path = lambda path: (self.release.wait(),
+                                                write_path(path))
+
+    def tearDown(self):
+        self.writer.shutdown()
+        super().tearDown()
+
+
+if __name__ == '__main__':
+    unittest.main()
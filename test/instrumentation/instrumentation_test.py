@@ -0,0 +1,103 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+from instrumentation import (BUFFER, CommandInstrumentation,  # noqa: E402
+                             CommandStatistics, DISK)
+
+
+class Buffer:
+
+    def __init__(self):
+        self.lines = ['first', 'second']
+
+    def line(self, row):
+        time.sleep(0.05)
+        return self.lines[row]
+
+    def replace_line(self, row, text):
+        self.line(row)
+        self.lines[row] = text
+
+
+class InstrumentationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.instrumentation = CommandInstrumentation()
+        self.instrumentation.install([Buffer])
+        self.addCleanup(self.instrumentation.uninstall)
+
+    def test_histogram(self):
+        statistics = CommandStatistics()
+        for seconds in (0.0001, 0.0005, 0.03, 0.15):
+            statistics.add(seconds, {BUFFER: 0.0, DISK: 0.0})
+        self.assertEqual(statistics.runs, 4)
+        self.assertEqual(statistics.histogram[0], 2)
+        self.assertEqual(sum(statistics.histogram), 4)
+        self.assertEqual(statistics.over_budget, 1)
+        self.assertEqual(statistics.longest, 0.15)
+        self.instrumentation.commands['pause'] = statistics
+        report = self.instrumentation.format_report()
+        self.assertIn('pause', report)
+        self.assertIn('<=1:2 <=50:1 <=200:1', report)
+
+    def test_extra_arguments_dropped(self):
+        calls = []
+
+        def command():
+            calls.append('command')
+
+        # QAction.triggered passes `checked`
+        self.instrumentation.wrap('command', command)(False)
+        self.assertEqual(calls, ['command'])
+
+    def test_buffer_and_disk_times(self):
+        buffer = Buffer()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'file.txt')
+
+        def command():
+            buffer.replace_line(0, 'changed')
+            with open(path, 'w') as file_:
+                file_.write(buffer.line(1))
+            with open(path) as file_:
+                for line in file_:
+                    self.assertEqual(line, 'second')
+
+        self.instrumentation.wrap('command', command)()
+        self.assertEqual(buffer.lines, ['changed', 'second'])
+        times = self.instrumentation.commands['command'].times
+        # Nested buffer methods are only counted once
+        self.assertGreaterEqual(times[BUFFER], 0.1)
+        self.assertLess(times[BUFFER], 0.14)
+        self.assertGreater(times[DISK], 0)
+        self.instrumentation.uninstall()
+        self.assertFalse(hasattr(Buffer.line, '__wrapped__'))
+
+    def test_command_logged(self):
+        self.instrumentation.uninstall()
+        self.assertFalse(self.instrumentation.hooked)
+        with self.assertLogs('atlas.commands') as logs:
+            self.instrumentation.wrap('command', lambda: None)()
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['command'], 'command')
+        self.assertEqual(record['disk'], 0)
+        self.assertGreaterEqual(record['total'], 0)
+        self.assertIn('Buffer and disk I/O times are only measured',
+                      self.instrumentation.format_report())
+
+    def test_nested_commands(self):
+        inner = self.instrumentation.wrap('inner', lambda: None)
+        outer = self.instrumentation.wrap('outer', inner)
+        outer()
+        self.assertEqual(list(self.instrumentation.commands), ['outer'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+from model.logic import Editor  # noqa: E402
+from model.settings import read_config  # noqa: E402
+from view.editor_pane import EditorPane  # noqa: E402
+from view.tab_placeholder import TabPlaceholder  # noqa: E402
+from view.top_level_window import TopLevelWindow  # noqa: E402
+
+APP = QApplication.instance() or QApplication(sys.argv[:1])
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+
+
+class LazyTabsTest(unittest.TestCase):
+
+    # Placeholders do not load files, not even the first (current) tab
+    def test_placeholders_are_not_loaded(self):
+        self.add_placeholders('a.txt', 'b.txt')
+        self.assertEqual(self.loaded, [])
+        self.assertEqual(self.window.tabs.tabText(1), 'b')
+        self.assertEqual(self.window.widgets[0].text(), 'text of a.txt')
+        self.assertFalse(self.window.modified)
+
+    def test_focus_loads_tab(self):
+        self.add_placeholders('a.txt', 'b.txt', 'c.txt')
+        self.window.tabs.setCurrentIndex(1)
+        widgets = self.window.widgets
+        self.assertIsInstance(widgets[0], TabPlaceholder)
+        self.assertIsInstance(widgets[1], EditorPane)
+        self.assertIsInstance(widgets[2], TabPlaceholder)
+        self.assertEqual(widgets[1].text(), 'text of b.txt')
+        self.assertEqual(self.window.tabs.currentIndex(), 1)
+        self.assertEqual(self.created, [widgets[1]])
+
+    # Loading a tab that is not current leaves the current tab alone
+    def test_materialize(self):
+        self.add_placeholders('a.txt', 'b.txt', 'c.txt')
+        tab = self.window.materialize(self.window.widgets[2])
+        self.assertIs(self.window.widgets[2], tab)
+        self.assertEqual(self.window.tabs.currentIndex(), 0)
+        self.assertIs(self.window.materialize(tab), tab)
+        self.assertEqual(self.loaded, ['c.txt'])
+
+    def test_current_tab_is_loaded(self):
+        self.add_placeholders('a.txt')
+        self.assertIsInstance(self.window.current_tab, EditorPane)
+
+    # Utility functions
+    def add_placeholders(self, *paths):
+        for path in paths:
+            self.window.add_placeholder_tab(path, '\n', self.load)
+
+    def load(self, path):
+        self.loaded.append(path)
+        return 'text of ' + path
+
+    def setUp(self):
+        self.window = TopLevelWindow()
+        self.window.setCentralWidget(self.window.tabs)
+        # File tabs update the title of their native parent window
+        self.window.winId()
+        self.window.tab_created.connect(self.created.append)
+        self.loaded = []
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.created = []
+
+
+class OpenPortfolioTest(unittest.TestCase):
+
+    # Only the tab focused is read; origins are indexed on first lookup
+    def test_open_portfolio_reads_focused_tab_only(self):
+        editor = Editor(self.window, self.config_path)
+        self.window.setup()
+        with mock.patch.object(editor, 'read_file',
+                               wraps=editor.read_file) as read_file:
+            editor.setup()
+            self.assertEqual(
+                [call.args[0] for call in read_file.call_args_list],
+                [self.paths[-1]])
+            self.assertEqual(editor.origin_index.find("- Wash the car"),
+                             (self.paths[0], 1, 'Tasks'))
+        self.assertEqual(read_file.call_count, 2)
+
+    # Edits in a tab update the origins of the lines edited only
+    def test_edits_update_origins(self):
+        editor = Editor(self.window, self.config_path)
+        self.window.setup()
+        editor.setup()
+        index = editor.origin_index
+        self.assertEqual(index.find("- Fix the roof"),
+                         (self.paths[1], 1, 'Tasks'))
+        tab = self.window.current_tab
+        with mock.patch.object(index, 'index_file') as index_file:
+            tab.insert_line_after(0, "- Paint the fence +home")
+            self.assertEqual(index.find("- Paint the fence"),
+                             (self.paths[1], 1, 'Tasks'))
+            self.assertEqual(index.find("- Fix the roof"),
+                             (self.paths[1], 2, 'Tasks'))
+            tab.replace_line(2, "- Fix the gutter +home")
+            self.assertIsNone(index.find("- Fix the roof"))
+            self.assertEqual(index.find("- Fix the gutter"),
+                             (self.paths[1], 2, 'Tasks'))
+        index_file.assert_not_called()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        base = os.path.join(self.folder, '')
+        self.paths = [base + 'car.pmd.txt', base + 'home.pmd.txt']
+        for path, task in zip(self.paths, ("- Wash the car +car",
+                                           "- Fix the roof +home")):
+            with open(path, 'w') as file_:
+                file_.write("# Tasks\n" + task + "\n")
+        config = read_config(CONFIG_FILE)
+        config['USER']['portfolio_base_dir'] = base
+        config['USER']['portfolio_files'] = '\n'.join(self.paths)
+        config['USER']['tab_order'] = '\n'.join(self.paths)
+        self.config_path = base + 'config.ini'
+        with open(self.config_path, 'w') as config_file:
+            config.write(config_file)
+        self.window = TopLevelWindow()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
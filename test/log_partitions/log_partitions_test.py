@@ -0,0 +1,181 @@
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+from model.log_partitions import (LineIndex, LogPartitions,  # noqa: E402
+                                  PagedLines)
+from model.logic import Editor  # noqa: E402
+from model.settings import load_settings, read_config  # noqa: E402
+from view.top_level_window import TopLevelWindow  # noqa: E402
+
+APP = QApplication.instance() or QApplication(sys.argv[:1])
+
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+NOW = datetime.datetime(2020, 3, 1, 8, 0)
+
+
+def entry(stamp, text):
+    return "LOG-{}\n0 days, 0:00:00 from previous entry\n{}\n\n".format(
+        stamp, text)
+
+
+OLD = entry('2018-12-31-10-00-00', "old")
+MID = entry('2019-06-01-10-00-00', "mid")
+LATE = entry('2019-12-31-10-00-00', "late")
+NEW = entry('2020-01-01-10-00-00', "new")
+
+
+class LogPartitionsTest(unittest.TestCase):
+
+    def test_partition_path(self):
+        self.assertEqual(self.partitions.partition_path('2019'),
+                         os.path.join(self.folder, 'log-2019.pmd.txt'))
+        self.assertEqual(self.partitions.key(NOW), '2020')
+
+    # Entries of past years move to partitions, oldest first
+    def test_rotate(self):
+        self.write('log.pmd.txt', OLD + MID + LATE + NEW)
+        self.assertEqual(self.partitions.rotate(NOW, newest_first=False),
+                         ['2018', '2019'])
+        self.assertEqual(self.read('log.pmd.txt'), NEW)
+        self.assertEqual(self.read('log-2018.pmd.txt'), OLD)
+        self.assertEqual(self.read('log-2019.pmd.txt'), MID + LATE)
+        self.assertEqual([key for key, _ in self.partitions.partitions()],
+                         ['2018', '2019'])
+        # Nothing left to move
+        self.assertEqual(self.partitions.rotate(NOW, newest_first=False), [])
+
+    # Entries are added to existing partitions, in the order of the log
+    def test_rotate_newest_first(self):
+        self.write('log-2019.pmd.txt', MID)
+        self.write('log.pmd.txt', NEW + LATE)
+        self.partitions.rotate(NOW, newest_first=True)
+        self.assertEqual(self.read('log.pmd.txt'), NEW)
+        self.assertEqual(self.read('log-2019.pmd.txt'), LATE + MID)
+
+    # Whichever the order of the log, only its first and last entries tell
+    def test_has_past_entries(self):
+        self.assertFalse(self.partitions.has_past_entries(NOW))
+        self.write('log.pmd.txt', NEW)
+        self.assertFalse(self.partitions.has_past_entries(NOW))
+        self.write('log.pmd.txt', OLD + NEW)
+        self.assertTrue(self.partitions.has_past_entries(NOW))
+        self.write('log.pmd.txt', NEW + OLD)
+        self.assertTrue(self.partitions.has_past_entries(NOW))
+
+    def test_rotate_by_month(self):
+        partitions = LogPartitions(os.path.join(self.folder, 'log.pmd.txt'),
+                                   'month', self.settings, 'UTF-8')
+        self.write('log.pmd.txt', MID + LATE)
+        partitions.rotate(NOW, newest_first=False)
+        self.assertEqual(self.read('log.pmd.txt'), "")
+        self.assertEqual(self.read('log-2019-12.pmd.txt'), LATE)
+        self.assertEqual(len(partitions.partitions()), 2)
+
+    # Utility functions
+    def write(self, name, text):
+        with open(os.path.join(self.folder, name), 'w') as file_:
+            file_.write(text)
+
+    def read(self, name):
+        with open(os.path.join(self.folder, name)) as file_:
+            return file_.read()
+
+    def setUp(self):
+        self.settings = load_settings(CONFIG_FILE)
+        self.folder = tempfile.mkdtemp()
+        self.partitions = LogPartitions(
+            os.path.join(self.folder, 'log.pmd.txt'), 'year', self.settings,
+            'UTF-8')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+
+class OpenPartitionedLogTest(unittest.TestCase):
+
+    # A log kept whole until now is partitioned as the portfolio is opened
+    def test_log_partitioned_on_open(self):
+        now = datetime.datetime.now()
+        last_year = now.replace(year=now.year - 1, month=1, day=1)
+        current = entry(now.strftime('%Y-%m-%d-00-00-00'), "current")
+        with open(self.log_path, 'w') as file_:
+            file_.write(current + entry(
+                last_year.strftime('%Y-%m-%d-10-00-00'), "last year"))
+        editor = Editor(self.window, self.config_path)
+        self.window.setup()
+        editor.setup()
+        self.assertEqual(editor.find_widget(self.log_path).text(), current)
+        partition = os.path.join(
+            self.folder, 'log', 'log-{}.pmd.txt'.format(last_year.year))
+        with open(partition) as file_:
+            self.assertIn("last year", file_.read())
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        base = os.path.join(self.folder, '')
+        os.mkdir(base + 'log')
+        self.log_path = os.path.join(base + 'log', 'log.pmd.txt')
+        config = read_config(CONFIG_FILE)
+        config['USER']['portfolio_base_dir'] = base
+        config['USER']['log_partition'] = 'year'
+        config['USER']['portfolio_files'] = ''
+        config['USER']['tab_order'] = self.log_path
+        self.config_path = base + 'config.ini'
+        with open(self.config_path, 'w') as config_file:
+            config.write(config_file)
+        self.window = TopLevelWindow()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+
+class PagedLinesTest(unittest.TestCase):
+
+    def test_lines(self):
+        lines = PagedLines(self.path, 'UTF-8', page_size=3, cached_pages=2)
+        self.assertEqual(len(lines), 10)
+        self.assertEqual([lines.line(row) for row in range(10)], self.lines)
+        self.assertEqual(lines.line(4), "Ünïcode 4")
+        self.assertLessEqual(len(lines._pages), 2)
+
+    def test_last_line_without_line_ending(self):
+        with open(self.path, 'w') as file_:
+            file_.write("one\r\ntwo")
+        lines = PagedLines(self.path, 'UTF-8', page_size=3)
+        self.assertEqual([lines.line(0), lines.line(1)], ["one", "two"])
+
+    # The index is saved, and only rebuilt once the file changes
+    def test_saved_index(self):
+        LineIndex(self.path)
+        with open(self.path + '.idx', 'rb') as file_:
+            saved = file_.read()
+        self.assertEqual(LineIndex(self.path).offsets[:2].tolist(), [0, 7])
+        with open(self.path, 'a') as file_:
+            file_.write("one more\n")
+        self.assertEqual(len(LineIndex(self.path)), 11)
+        with open(self.path + '.idx', 'rb') as file_:
+            self.assertNotEqual(file_.read(), saved)
+
+    # Utility functions
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'log-2019.pmd.txt')
+        self.lines = ["line {}".format(i) for i in range(10)]
+        self.lines[4] = "Ünïcode 4"
+        with open(self.path, 'w', encoding='UTF-8') as file_:
+            file_.write('\n'.join(self.lines) + '\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
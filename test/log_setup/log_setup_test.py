@@ -0,0 +1,54 @@
+import atexit
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+import log_setup  # noqa: E402
+
+
+class LogSetupTest(unittest.TestCase):
+
+    def test_log_file_path(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop(log_setup.ENVIRONMENT_VARIABLE, None)
+            self.assertEqual(
+                log_setup.log_file_path(os.path.join('portfolio', 'a.ini')),
+                os.path.join(os.path.abspath('portfolio'), 'atlas.log'))
+            os.environ[log_setup.ENVIRONMENT_VARIABLE] = 'other.log'
+            self.assertEqual(log_setup.log_file_path('a.ini'), 'other.log')
+
+    def test_rotated_log(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'atlas.log')
+        root = logging.getLogger()
+        handlers, level = root.handlers[:], root.level
+        with mock.patch.object(log_setup, 'MAX_BYTES', 1000):
+            listener = log_setup.start_logging(path)
+        try:
+            for number in range(300):
+                logging.info("Record %s", number)
+        finally:
+            listener.stop()
+            atexit.unregister(listener.stop)
+            for handler in listener.handlers:
+                handler.close()
+            root.handlers[:] = handlers
+            root.setLevel(level)
+        with open(path) as log_file:
+            self.assertTrue(log_file.read().endswith(
+                ":root:INFO:Record 299\n"))
+        self.assertLessEqual(os.path.getsize(path), 1000)
+        self.assertEqual(
+            sorted(os.listdir(directory.name)),
+            ['atlas.log'] + ['atlas.log.{}'.format(number)
+                             for number in range(1, 6)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+from model.origin_index import OriginIndex  # noqa: E402
+from model.settings import load_settings  # noqa: E402
+from model.tokenizer import Tokenizer  # noqa: E402
+
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+
+CAR = """# TTL #
+
+t Wash the car dur:30 +car
+
+# Maintenance
+- Check tyres dur:10 +car
+t Wash the car dur:30 +car
+x Old task dur:5 +car"""
+
+HOME = """# TTL #
+
+# Chores
+- Pay rent due:2019-07-01 rec:1m dur:5 +home
+- Check tyres dur:10 +home"""
+
+
+class OriginIndexTest(unittest.TestCase):
+
+    def test_find(self):
+        self.assertEqual(self.index.find("10:30 - Check tyres dur:10 +car"),
+                         (self.car, 5, 'Maintenance'))
+        self.assertEqual(self.index.find("- Pay rent due:2019-07-01"),
+                         (self.home, 3, 'Chores'))
+
+    def test_ttl_copies_are_not_origins(self):
+        self.assertEqual(self.index.find("t Wash the car +car"),
+                         (self.car, 6, 'Maintenance'))
+
+    def test_done_and_unknown_tasks(self):
+        self.assertIsNone(self.index.find("- Old task dur:5 +car"))
+        self.assertIsNone(self.index.find("- No such task"))
+
+    def test_invalidate(self):
+        self.texts[self.car] = "# Maintenance\n\n- Check tyres dur:10 +car"
+        # Not re-indexed until invalidated
+        self.assertEqual(self.index.find("- Check tyres"),
+                         (self.car, 5, 'Maintenance'))
+        self.index.invalidate(self.car)
+        self.assertEqual(self.index.find("- Check tyres"),
+                         (self.car, 2, 'Maintenance'))
+        self.assertIsNone(self.index.find("- Wash the car"))
+
+    def test_closed_file(self):
+        del self.texts[self.car]
+        self.index.invalidate(self.car)
+        self.assertEqual(self.index.find("- Check tyres"),
+                         (self.home, 4, 'Chores'))
+
+    # Only the lines replaced are parsed again
+    def test_replace_lines(self):
+        with mock.patch.object(self.index, 'index_file') as index_file:
+            self.replace(self.car, 5, 1, ["- Check the tyres dur:10 +car"])
+            self.assertEqual(self.index.find("- Check the tyres"),
+                             (self.car, 5, 'Maintenance'))
+            self.assertEqual(self.index.find("- Check tyres"),
+                             (self.home, 4, 'Chores'))
+        index_file.assert_not_called()
+
+    # Tasks after lines added or removed move with them
+    def test_replace_lines_moves_later_tasks(self):
+        self.replace(self.car, 5, 0, ["- Polish +car", ""])
+        self.assertEqual(self.index.find("- Wash the car"),
+                         (self.car, 8, 'Maintenance'))
+        self.assertEqual(self.index.find("- Check tyres"),
+                         (self.car, 7, 'Maintenance'))
+        self.replace(self.car, 5, 3, ["- Check tyres dur:10 +car"])
+        self.assertEqual(self.index.find("- Wash the car"),
+                         (self.car, 6, 'Maintenance'))
+        self.assertEqual(self.index.find("- Check tyres"),
+                         (self.car, 5, 'Maintenance'))
+        self.assertIsNone(self.index.find("- Polish +car"))
+
+    # A heading changes the section of the lines after it
+    def test_replace_heading(self):
+        self.replace(self.car, 4, 1, ["# Cleaning"])
+        self.assertEqual(self.index.find("- Wash the car"),
+                         (self.car, 6, 'Cleaning'))
+
+    # Edits give the same index as indexing the files again
+    def test_edits_match_rebuild(self):
+        edits = [(self.car, 0, 3, [""]), (self.home, 4, 0, ["- New +home"]),
+                 (self.car, 1, 1, ["x Check tyres", "- Check tyres +car"]),
+                 (self.car, 5, 1, ["- Old task dur:5 +car"]),
+                 (self.home, 0, 1, ["# Errands"]),
+                 (self.home, 2, 2, ["- Pay rent", "", "- Buy milk +home"])]
+        for edit in edits:
+            self.replace(*edit)
+            rebuilt = OriginIndex(self.index.settings, self.index.tokenizer,
+                                  self.texts.get)
+            rebuilt.rebuild()
+            self.index.refresh()
+            self.assertEqual(self.index._locations, rebuilt._locations)
+
+    # Utility functions
+    def replace(self, path, first, removed, lines):
+        text = self.texts[path].split('\n')
+        text[first:first + removed] = lines
+        self.texts[path] = '\n'.join(text)
+        self.index.replace_lines(path, first, removed, lines)
+
+    def setUp(self):
+        settings = load_settings(CONFIG_FILE)
+        self.car = settings.portfolio_files[0]
+        self.home = settings.portfolio_files[5]
+        self.texts = {self.car: CAR, self.home: HOME}
+        self.index = OriginIndex(settings, Tokenizer(settings),
+                                 self.texts.get)
+        self.index.rebuild()
+
+
+if __name__ == '__main__':
+    unittest.main()
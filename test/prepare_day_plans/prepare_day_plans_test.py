@@ -0,0 +1,112 @@
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+from model.settings import read_config  # noqa: E402
+from prepare_day_plans import run  # noqa: E402
+
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+# No auxiliary files: daily, booked and periodic tasks come from here
+PORTFOLIO = """# TTL #
+t Call the bank dur:10 +finad
+# Tasks
+t Call the bank dur:10 +finad
+- Water the plants dur:5 rec:1d +home
+- Pay the rent dur:5 due:2030-01-02 +home
+- Clean the windows dur:30 due:2030-01-01 rec:7d +home
+- Buy milk @shlist +home
+"""
+
+
+class PrepareDayPlansTest(unittest.TestCase):
+
+    def test_plans_for_range(self):
+        output = self.run_plans('--start', '2030-01-01', '--days', '3')
+        self.assertEqual(sorted(os.listdir(self.plans)),
+                         ['20300101.pmd.txt', '20300102.pmd.txt',
+                          '20300103.pmd.txt'])
+        self.assertEqual(output.count("Wrote "), 3)
+        first = self.read_plan('20300101.pmd.txt')
+        self.assertEqual(first[0], "# Tasks proposed for 2030-01-01")
+        self.assertEqual(first[-1], "# Tasks DONE on 2030-01-01")
+        self.assertEqual(
+            sorted(first[1:-1]),
+            ["- Clean the windows dur:30 due:2030-01-01 rec:7d +home",
+             "- Water the plants dur:5 rec:1d +home",
+             "t Call the bank dur:10 +finad"])
+        self.assertIn("- Pay the rent dur:5 due:2030-01-02 +home",
+                      self.read_plan('20300102.pmd.txt'))
+
+    def test_existing_plan_kept_unless_forced(self):
+        path = os.path.join(self.plans, '20300101.pmd.txt')
+        with open(path, 'w') as plan:
+            plan.write("Edited plan\n")
+        output = self.run_plans('--start', '2030-01-01', '--days', '2')
+        self.assertIn("Skipping " + path, output)
+        self.assertEqual(self.read_plan('20300101.pmd.txt'), ["Edited plan"])
+        self.assertEqual(output.count("Wrote "), 1)
+        output = self.run_plans('--start', '2030-01-01', '--force')
+        self.assertEqual(output, "Wrote {}\n".format(path))
+        self.assertEqual(self.read_plan('20300101.pmd.txt')[0],
+                         "# Tasks proposed for 2030-01-01")
+
+    def test_jobs(self):
+        self.run_plans('--start', '2030-01-01', '--days', '4')
+        one_job = {name: self.read_plan(name)
+                   for name in os.listdir(self.plans)}
+        shutil.rmtree(self.plans)
+        os.mkdir(self.plans)
+        self.run_plans('--start', '2030-01-01', '--days', '4', '--jobs', '2')
+        self.assertEqual({name: self.read_plan(name)
+                          for name in os.listdir(self.plans)}, one_job)
+
+    def test_forecast(self):
+        output = self.run_plans('--start', '2030-01-01', '--days', '3',
+                                '--forecast')
+        self.assertEqual(os.listdir(self.plans), [])
+        self.assertEqual(output.splitlines(), [
+            "2030-01-01     2 tasks     35 min (00:35)",
+            "2030-01-02     2 tasks     10 min (00:10)",
+            "2030-01-03     1 tasks      5 min (00:05)",
+        ])
+
+    # Utility functions
+
+    def run_plans(self, *arguments):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = run([self.config_path, '--output-dir', self.plans]
+                         + list(arguments))
+        self.assertEqual(status, 0)
+        return output.getvalue()
+
+    def read_plan(self, name):
+        with open(os.path.join(self.plans, name)) as plan:
+            return plan.read().splitlines()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        base = os.path.join(self.folder, '')
+        self.plans = base + 'plans'
+        os.mkdir(self.plans)
+        with open(base + 'home.pmd.txt', 'w') as portfolio_file:
+            portfolio_file.write(PORTFOLIO)
+        config = read_config(CONFIG_FILE)
+        config['USER']['portfolio_base_dir'] = base
+        config['USER']['portfolio_files'] = base + 'home.pmd.txt'
+        self.config_path = base + 'config.ini'
+        with open(self.config_path, 'w') as config_file:
+            config.write(config_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+from model.progress_log import (AppendOnlyLog,  # noqa: E402
+                                entries_newest_first, format_entry,
+                                parse_stamp)
+from model.settings import load_settings  # noqa: E402
+
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+FIRST = datetime.datetime(2020, 1, 31, 9, 30)
+SECOND = datetime.datetime(2020, 2, 2, 11, 45, 15)
+
+LOG = """LOG-2020-01-31-09-30-00
+0 days, 0:00:00 from previous entry
+first
+
+LOG-2020-02-02-11-45-15
+2 days, 2:15:15 from previous entry
+second
+on two lines
+
+"""
+
+
+class ProgressLogTest(unittest.TestCase):
+
+    def test_format_entry(self):
+        self.assertEqual(
+            format_entry(SECOND, FIRST, "second\non two lines",
+                         self.settings),
+            LOG.split('\n')[4:-1])
+        self.assertEqual(format_entry(FIRST, None, "first", self.settings),
+                         LOG.split('\n')[:4])
+
+    def test_parse_stamp(self):
+        self.assertEqual(parse_stamp("LOG-2020-02-02-11-45-15",
+                                     self.settings), SECOND)
+        self.assertIsNone(parse_stamp("LOG-2020-02", self.settings))
+        self.assertIsNone(parse_stamp("first", self.settings))
+
+    def test_entries_newest_first(self):
+        newest_first = entries_newest_first(LOG, self.settings)
+        self.assertEqual(newest_first.split('\n')[:4],
+                         LOG.split('\n')[4:8])
+        self.assertEqual(entries_newest_first(newest_first, self.settings),
+                         LOG)
+        self.assertEqual(entries_newest_first("# Log\n", self.settings),
+                         "# Log\n")
+
+    # Utility functions
+    def setUp(self):
+        self.settings = load_settings(CONFIG_FILE)
+
+
+class AppendOnlyLogTest(unittest.TestCase):
+
+    def test_append(self):
+        log = AppendOnlyLog(self.path, self.settings, 'UTF-8')
+        self.assertIsNone(log.last_stamp())
+        log.append(format_entry(FIRST, None, "first", self.settings), FIRST)
+        log.append(format_entry(SECOND, FIRST, "second\non two lines",
+                                self.settings), SECOND)
+        self.assertEqual(self.read(), LOG)
+        self.assertEqual(log.last_stamp(), SECOND)
+        self.assertTrue(log.is_own_change())
+        # The sidecar is used by a new instance too
+        self.assertTrue(AppendOnlyLog(self.path, self.settings,
+                                      'UTF-8').is_own_change())
+
+    # The last entry is read from the file changed by another program
+    def test_changed_file(self):
+        log = AppendOnlyLog(self.path, self.settings, 'UTF-8')
+        log.append(format_entry(FIRST, None, "first", self.settings), FIRST)
+        with open(self.path, 'a') as file_:
+            file_.write(LOG[LOG.index("LOG-2020-02"):].rstrip('\n'))
+        self.assertFalse(log.is_own_change())
+        self.assertEqual(log.last_stamp(), SECOND)
+        # Entries start on a line of their own
+        log.append(["LOG-2020-02-03-00-00-00"], SECOND)
+        self.assertTrue(self.read().endswith(
+            "on two lines\nLOG-2020-02-03-00-00-00\n"))
+
+    # A log kept newest first until `log_storage` is set to `append`
+    def test_switch_existing_log(self):
+        with open(self.path, 'w') as file_:
+            file_.write(entries_newest_first(LOG, self.settings))
+        log = AppendOnlyLog(self.path, self.settings, 'UTF-8')
+        self.assertTrue(log.put_oldest_first())
+        self.assertEqual(self.read(), LOG)
+        self.assertEqual(log.last_stamp(), SECOND)
+        third = SECOND + datetime.timedelta(hours=1)
+        log.append(format_entry(third, log.last_stamp(), "third",
+                                self.settings), third)
+        self.assertTrue(self.read().endswith(
+            "LOG-2020-02-02-12-45-15\n0 days, 1:00:00 from previous entry\n"
+            "third\n\n"))
+        # Checked once only
+        self.assertFalse(AppendOnlyLog(self.path, self.settings,
+                                       'UTF-8').put_oldest_first())
+
+    def test_oldest_first_log_kept(self):
+        with open(self.path, 'w') as file_:
+            file_.write(LOG)
+        log = AppendOnlyLog(self.path, self.settings, 'UTF-8')
+        self.assertFalse(log.put_oldest_first())
+        self.assertEqual(self.read(), LOG)
+        self.assertTrue(log.is_own_change())
+        self.assertEqual(log.last_stamp(), SECOND)
+
+    def test_last_stamp_across_chunks(self):
+        with open(self.path, 'w') as file_:
+            file_.write(LOG + ("x" * 100 + "\n") * 100)
+        log = AppendOnlyLog(self.path, self.settings, 'UTF-8')
+        self.assertEqual(log.last_stamp(), SECOND)
+
+    # Utility functions
+    def read(self):
+        with open(self.path) as file_:
+            return file_.read()
+
+    def setUp(self):
+        self.settings = load_settings(CONFIG_FILE)
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'log.pmd.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
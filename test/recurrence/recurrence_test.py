@@ -0,0 +1,82 @@
+import datetime
+import os
+import sys
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+from model.recurrence import Projection  # noqa: E402
+from model.settings import load_settings  # noqa: E402
+from model.tokenizer import Tokenizer  # noqa: E402
+
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+START = datetime.date(2020, 1, 30)
+
+
+class ProjectionTest(unittest.TestCase):
+
+    def test_daily_task(self):
+        self.assertEqual(self.days("- Water plants rec:1d dur:5 +home"),
+                         list(range(10)))
+
+    def test_booked_task(self):
+        self.assertEqual(self.days("- Dentist due:2020-02-03 +home"), [4])
+        self.assertEqual(self.days("- Dentist due:2020-03-03 +home"), [])
+
+    def test_periodic_task_in_days(self):
+        self.assertEqual(self.days("- Gym due:2020-02-01 rec:3d +home"),
+                         [2, 5, 8])
+
+    # Month ends are clamped, leap years included
+    def test_periodic_task_in_months(self):
+        self.assertEqual(self.days("- Rent due:2020-01-31 rec:1m +home", 70),
+                         [1, 30, 61])
+
+    def test_periodic_task_in_years(self):
+        self.assertEqual(
+            self.days("- Licence due:2020-02-29 rec:1y +home", 400), [30, 395])
+
+    # Overdue tasks are proposed on the first day, then rescheduled from it
+    def test_overdue_task(self):
+        self.assertEqual(self.days("- Gym due:2020-01-20 rec:4d +home"),
+                         [0, 4, 8])
+
+    # ... unless they recur from their due date
+    def test_overdue_task_from_due_date(self):
+        self.assertEqual(self.days("- Gym due:2020-01-20 rec:+4d +home"),
+                         [0, 2, 6])
+
+    def test_done_tasks_are_ignored(self):
+        self.assertEqual(self.days("x Gym due:2020-02-01 rec:3d +home"), [])
+
+    def test_queries(self):
+        projection = Projection(
+            ["- Water plants rec:1d dur:5 +home",
+             "- Dentist due:2020-02-03 dur:60 +home",
+             "- Notes +home"],
+            START, 7, self.settings, self.tokenizer)
+        self.assertEqual(list(projection.count_per_day()),
+                         [1, 1, 1, 1, 2, 1, 1])
+        self.assertEqual(list(projection.minutes_per_day()),
+                         [5, 5, 5, 5, 65, 5, 5])
+        self.assertEqual(
+            [task.text for task in projection.due_on(
+                datetime.date(2020, 2, 3))],
+            ["Water plants", "Dentist"])
+        self.assertEqual([len(tasks) for tasks in projection.tasks_per_day()],
+                         [1, 1, 1, 1, 2, 1, 1])
+        self.assertEqual(str(projection.dates()[-1]), '2020-02-05')
+
+    # Utility functions
+    def days(self, task, days=10):
+        projection = Projection([task], START, days, self.settings,
+                                self.tokenizer)
+        return projection.offset.tolist()
+
+    def setUp(self):
+        self.settings = load_settings(CONFIG_FILE)
+        self.tokenizer = Tokenizer(self.settings)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import datetime
+import os
+import sys
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+from model.schedule import Schedule  # noqa: E402
+from model.settings import load_settings  # noqa: E402
+from model.tokenizer import Tokenizer  # noqa: E402
+
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+START = datetime.datetime(2020, 1, 31, 9, 0)
+LINES = [
+    "# Tasks proposed for 2020-01-31",
+    "- Pay rent dur:5 +home",
+    "t Write report dur:90 +work",
+    "08:00 x Clean the kitchen dur:30 +home",
+    "- Call the bank",
+    "- Fix the bike dur:60",
+]
+
+
+class ScheduleTest(unittest.TestCase):
+
+    def test_reschedule(self):
+        self.assertEqual(self.reschedule(START), 5)
+        self.assertEqual(self.lines, [
+            "# Tasks proposed for 2020-01-31",
+            "09:00 - Pay rent dur:5 +home",
+            "09:05 t Write report dur:90 +work",
+            "x Clean the kitchen dur:30 +home",
+            "10:35 - Call the bank",
+            "10:35 - Fix the bike dur:60",
+        ])
+        self.assertEqual(self.schedule.ends, [0, 5, 95, 95, 95, 155])
+        # Nothing changed: nothing is read again
+        self.assertEqual(self.reschedule(START), 0)
+        self.assertEqual(self.read, [])
+
+    # Only the lines from the first one changed on are read again
+    def test_reschedule_changed_suffix(self):
+        self.reschedule(START)
+        self.replace_line(4, "10:35 - Call the bank dur:10")
+        self.assertEqual(self.reschedule(START), 1)
+        self.assertEqual(self.read, [4, 5])
+        self.assertEqual(self.lines[5], "10:45 - Fix the bike dur:60")
+
+    def test_reschedule_inserted_lines(self):
+        self.reschedule(START)
+        self.lines[2:2] = ["- Buy milk dur:15", "- Read"]
+        self.schedule.lines_changed(2, 1, 3)
+        self.assertEqual(self.reschedule(START), 5)
+        self.assertEqual(self.read, [2, 3, 4, 5, 6, 7])
+        self.assertEqual(self.lines[2:5], [
+            "09:05 - Buy milk dur:15", "09:20 - Read",
+            "09:20 t Write report dur:90 +work"])
+
+    # Another start moves every stamp
+    def test_reschedule_later(self):
+        self.reschedule(START)
+        self.assertEqual(
+            self.reschedule(START + datetime.timedelta(minutes=1)), 4)
+        self.assertEqual(self.read, list(range(len(LINES))))
+        self.assertEqual(self.lines[1], "09:01 - Pay rent dur:5 +home")
+
+    def reschedule(self, start):
+        self.read = []
+        return self.schedule.reschedule(start, len(self.lines), self.line,
+                                        self.replace_line)
+
+    def line(self, row):
+        self.read.append(row)
+        return self.lines[row]
+
+    def replace_line(self, row, text):
+        self.lines[row] = text
+        self.schedule.lines_changed(row, 1, 1)
+
+    def setUp(self):
+        tokenizer = Tokenizer(load_settings(CONFIG_FILE))
+        self.schedule = Schedule(tokenizer,
+                                 lambda task: task.duration or 0)
+        self.lines = list(LINES)
+
+
+if __name__ == '__main__':
+    unittest.main()
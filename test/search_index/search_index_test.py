@@ -0,0 +1,104 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+from model.search_index import (INDEX_NAME, LINE_BITS,  # noqa: E402
+                                SearchIndex, indexed_files)
+from model.settings import read_config, Settings  # noqa: E402
+
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+
+
+class IndexedFilesTest(unittest.TestCase):
+
+    def test_indexed_files(self):
+        folder = tempfile.mkdtemp()
+        try:
+            for name in ('home.pmd.txt', 'notes.txt',
+                         'archive/20200131.pmd.txt', 'backup/home.pmd.txt'):
+                path = os.path.join(folder, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                open(path, 'w').close()
+            config = read_config(CONFIG_FILE)
+            config['USER']['portfolio_base_dir'] = folder + '/'
+            config['USER']['backup_dir'] = os.path.join(folder, 'backup')
+            config['USER']['daily_files_archive_dir'] = os.path.join(
+                folder, 'archive')
+            settings = Settings(config['USER'])
+            self.assertEqual(
+                indexed_files(settings),
+                [os.path.join(folder, 'archive', '20200131.pmd.txt'),
+                 os.path.join(folder, 'home.pmd.txt')])
+        finally:
+            shutil.rmtree(folder)
+
+
+class SearchIndexTest(unittest.TestCase):
+
+    def test_search(self):
+        home = self.write('home.pmd.txt', "# Home\n- Pay rent dur:5\n"
+                          "\n- Clean the kitchen\n")
+        work = self.write('work.pmd.txt', "- Write the rent report\n")
+        self.assertEqual(self.index.update([home, work]), 2)
+        self.assertEqual(self.index.search("RENT"),
+                         [(home, 1, "- Pay rent dur:5"),
+                          (work, 0, "- Write the rent report")])
+        # Words are matched anywhere, in any order
+        self.assertEqual(self.index.search("itche clean"),
+                         [(home, 3, "- Clean the kitchen")])
+        # Short words only filter the lines found
+        self.assertEqual(self.index.search("rent py"), [])
+        self.assertEqual(self.index.search("pa"), [])
+        self.assertEqual(len(self.index.search("rent", limit=1)), 1)
+        self.assertEqual(self.index.search('"rent'), [])
+
+    def test_update(self):
+        home = self.write('home.pmd.txt', "- Pay rent\n")
+        work = self.write('work.pmd.txt', "- Write report\n")
+        self.index.update([home, work])
+        self.assertEqual(self.index.update([home, work]), 0)
+        self.write('home.pmd.txt', "- Pay bills\n")
+        os.utime(home, ns=(0, 1))
+        # Files left out are removed from the index
+        self.assertEqual(self.index.update([home]), 1)
+        self.assertEqual(self.index.search("rent"), [])
+        self.assertEqual(self.index.search("report"), [])
+        self.assertEqual(self.index.search("bills"),
+                         [(home, 0, "- Pay bills")])
+
+    # Saved text replaces all the lines of the file
+    def test_update_file(self):
+        home = self.write('home.pmd.txt', "- Pay rent\n- Pay bills\n")
+        work = self.write('work.pmd.txt', "- Pay taxes\n")
+        self.index.update([home, work])
+        self.index.update_file(home, "- Pay the rent\n")
+        self.assertEqual(self.index.search("pay"),
+                         [(work, 0, "- Pay taxes"),
+                          (home, 0, "- Pay the rent")])
+        row_ids = [row_id for row_id, in self.index.connection.execute(
+            "SELECT rowid FROM lines ORDER BY rowid")]
+        self.assertEqual([row_id >> LINE_BITS for row_id in row_ids],
+                         [1, 2])
+
+    def write(self, name, text):
+        path = os.path.join(self.folder, name)
+        with open(path, 'w', encoding='UTF-8') as file_:
+            file_.write(text)
+        return path
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.index = SearchIndex(os.path.join(self.folder, INDEX_NAME),
+                                 'UTF-8')
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
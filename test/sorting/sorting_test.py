@@ -0,0 +1,55 @@
+import os
+import sys
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+from model.settings import load_settings  # noqa: E402
+from model.sorting import sort_tasks  # noqa: E402
+
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+
+
+class SortTasksTest(unittest.TestCase):
+
+    # Tokens are ranked in `tokens_in_sorting_order` order
+    def test_token_order(self):
+        tasks = ["- Car +car", "- Work +work", "- Meeting +work @mr"]
+        self.assertEqual(self.sort(tasks),
+                         ["- Meeting +work @mr", "- Work +work", "- Car +car"])
+
+    # Tasks with categories are ranked by their categories only
+    def test_categories_take_precedence(self):
+        tasks = ["- Errand +work @er", "- Home +home"]
+        self.assertEqual(self.sort(tasks), ["- Home +home",
+                                            "- Errand +work @er"])
+
+    # Tokens are matched exactly, not as substrings
+    def test_exact_tokens(self):
+        tasks = ["- Workshop +workshop", "- Work +work"]
+        self.assertEqual(self.sort(tasks), ["- Work +work"])
+
+    def test_duplicates_are_dropped(self):
+        tasks = ["- Work +work", "- Work +work"]
+        self.assertEqual(self.sort(tasks), ["- Work +work"])
+
+    # Ties are broken by due date, then duration, then original order
+    def test_tie_breaking(self):
+        tasks = ["- A dur:30 +work",
+                 "- B dur:10 +work",
+                 "- C due:2020-01-02 dur:60 +work",
+                 "- D due:2020-01-01 dur:90 +work",
+                 "- E +work"]
+        self.assertEqual([task[2] for task in self.sort(tasks)],
+                         ['D', 'C', 'B', 'A', 'E'])
+
+    # Utility functions
+    def sort(self, tasks):
+        return sort_tasks(tasks, self.settings)
+
+    def setUp(self):
+        self.settings = load_settings(CONFIG_FILE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+from model.settings import load_settings  # noqa: E402
+from model.task_statistics import TaskStatistics  # noqa: E402
+from model.tokenizer import Tokenizer  # noqa: E402
+
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+LINES = [
+    "> Remaining tasks duration (work) = 00:00 (00:00)",
+    "# Tasks proposed for 2020-01-31",
+    "09:00 - Pay rent dur:5 +home",
+    "09:05 t Write report dur:90 +work",
+    "- Call the bank",
+    "# Tasks DONE on 2020-01-31",
+    "x Clean the kitchen dur:30 +home",
+    "x Send invoices dur:15 +work",
+    "r 2020-01-31 - Fix the bike dur:60",
+]
+
+
+class TaskStatisticsTest(unittest.TestCase):
+
+    def test_totals(self):
+        statistics = TaskStatistics(self.tokenizer, LINES)
+        self.assertEqual(len(statistics), len(LINES))
+        self.assertEqual(statistics.totals, [95, 90, 45, 15, 1])
+
+    # Replacing lines gives the totals of the resulting lines
+    def test_replace(self):
+        statistics = TaskStatistics(self.tokenizer, LINES)
+        lines = list(LINES)
+        for first, removed, new_lines in (
+                (2, 1, ["x Pay rent dur:5 +home"]),
+                (4, 0, ["- Buy milk dur:10", "- Read dur:25 +work"]),
+                (0, 3, []),
+                (len(lines) - 1, 1, ["- Fix the bike dur:60"])):
+            statistics.replace(first, removed, new_lines)
+            lines[first:first + removed] = new_lines
+            expected = TaskStatistics(self.tokenizer, lines)
+            self.assertEqual(statistics.totals, expected.totals)
+            self.assertEqual(statistics.values, expected.values)
+        self.assertEqual(statistics.totals, [185, 115, 45, 15, 1])
+
+    def setUp(self):
+        self.tokenizer = Tokenizer(load_settings(CONFIG_FILE))
+
+
+if __name__ == '__main__':
+    unittest.main()
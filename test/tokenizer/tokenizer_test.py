@@ -0,0 +1,80 @@
+import datetime
+import os
+import sys
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+from model.settings import load_settings  # noqa: E402
+from model.tokenizer import Tokenizer  # noqa: E402
+
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+
+
+class TokenizerTest(unittest.TestCase):
+
+    def test_plain_task(self):
+        task = self.tokenizer.parse("- Clean the kitchen dur:30 +home\n")
+        self.assertEqual(task.line, "- Clean the kitchen dur:30 +home")
+        self.assertEqual(task.stamp, '')
+        self.assertEqual(task.prefix, '-')
+        self.assertEqual(task.text, "Clean the kitchen")
+        self.assertEqual(task.duration, 30)
+        self.assertIsNone(task.due)
+        self.assertIsNone(task.rec)
+        self.assertEqual(task.tags, ('+home',))
+        self.assertEqual(task.cats, ())
+
+    def test_scheduled_task(self):
+        task = self.tokenizer.parse("09:30 t Write report dur:90 +work @mr")
+        self.assertEqual(task.stamp, '09:30')
+        self.assertEqual(task.body, "t Write report dur:90 +work @mr")
+        self.assertEqual(task.prefix, 't')
+        self.assertEqual(task.text, "Write report")
+        self.assertEqual(task.cats, ('@mr',))
+        self.assertTrue(self.tokenizer.is_active(task))
+
+    def test_periodic_task(self):
+        task = self.tokenizer.parse(
+            "- Pay rent due:2019-07-01 rec:+2m dur:5 +home")
+        self.assertEqual(task.due, datetime.date(2019, 7, 1).toordinal())
+        self.assertEqual(task.due_date, datetime.date(2019, 7, 1))
+        self.assertEqual(task.rec, (2, 'm', True))
+        self.assertFalse(self.tokenizer.is_daily(task))
+
+    def test_daily_task(self):
+        task = self.tokenizer.parse("- Water plants rec:1d dur:5 +home")
+        self.assertTrue(self.tokenizer.is_daily(task))
+
+    def test_substring_tags_are_distinct(self):
+        task = self.tokenizer.parse("- Go to workshop dur:60 +workshop")
+        self.assertNotIn('+work', task.tags)
+
+    def test_done_task(self):
+        task = self.tokenizer.parse("x 2019-07-01 - Old thing dur:5 +home")
+        self.assertEqual(task.prefix, 'x')
+        self.assertFalse(self.tokenizer.is_active(task))
+
+    def test_malformed_properties(self):
+        task = self.tokenizer.parse("- Task due:someday dur:long")
+        self.assertIsNone(task.due)
+        self.assertIsNone(task.duration)
+
+    def test_blank_and_heading_lines(self):
+        self.assertEqual(self.tokenizer.parse('').prefix, '')
+        heading = self.tokenizer.parse("# TTL #")
+        self.assertEqual(heading.prefix, '#')
+        self.assertFalse(self.tokenizer.is_active(heading))
+
+    def test_cache(self):
+        line = "- Task dur:5 +home"
+        self.assertIs(self.tokenizer.parse(line),
+                      self.tokenizer.parse(line + '\n'))
+
+    # Utility functions
+    def setUp(self):
+        self.tokenizer = Tokenizer(load_settings(CONFIG_FILE))
+
+
+if __name__ == '__main__':
+    unittest.main()
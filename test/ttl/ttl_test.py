@@ -0,0 +1,98 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+from model.logic import Editor  # noqa: E402
+from model.settings import read_config  # noqa: E402
+from view.top_level_window import TopLevelWindow  # noqa: E402
+
+APP = QApplication.instance() or QApplication(sys.argv[:1])
+CONFIG_FILE = os.path.join(HERE, '..', 'config_parser', 'config_file.ini')
+CAR = "# TTL #\n\n# Tasks\nt Wash the car +car\n- Check the oil +car\n"
+HOME = "# TTL #\n\n# Tasks\nt Fix the tap +home\n- Tidy up +home\n"
+
+
+class GenerateTtlTest(unittest.TestCase):
+
+    def test_ttls_generated(self):
+        self.editor.generate_ttls()
+        self.assertEqual(self.status, ["TTLs rebuilt in 2 of 2 portfolio "
+                                       "files."])
+        self.assertEqual(self.read(self.paths[0]).split('\n')[:4],
+                         ["# TTL #", "", "t Wash the car +car", ""])
+
+    def test_unchanged_files_skipped(self):
+        self.editor.generate_ttls()
+        with mock.patch.object(self.editor, 'save_file') as save_file, \
+                mock.patch.object(self.editor, 'write_file') as write_file:
+            self.editor.generate_ttls()
+            self.assertFalse(self.editor.generate_ttl(self.tabs[1]))
+        save_file.assert_not_called()
+        write_file.assert_not_called()
+        self.assertEqual(self.status[-1], "TTLs rebuilt in 0 of 2 portfolio "
+                                          "files.")
+
+    def test_edited_file_regenerated(self):
+        self.editor.generate_ttls()
+        # The last tab is loaded, as it is focused
+        self.tabs[1].append_line("t Paint the fence +home")
+        self.editor.generate_ttls()
+        self.assertEqual(self.status[-1], "TTLs rebuilt in 1 of 2 portfolio "
+                                          "files.")
+        self.assertIn("t Paint the fence +home\n\n# Tasks",
+                      self.read(self.paths[1]))
+
+    def test_reloaded_file_regenerated(self):
+        self.editor.generate_ttls()
+        self.editor.wait_for_saves()
+        with open(self.paths[0], 'a') as file_:
+            file_.write("\nt Change the tyres +car\n")
+        self.editor.file_changed_on_disk(self.paths[0])
+        self.editor.generate_ttls()
+        self.assertEqual(self.status[-1], "TTLs rebuilt in 1 of 2 portfolio "
+                                          "files.")
+        self.assertIn("t Change the tyres +car\n\n# Tasks",
+                      self.read(self.paths[0]))
+
+    # Utility functions
+    def read(self, path):
+        self.editor.wait_for_saves()
+        with open(path) as file_:
+            return file_.read()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        base = os.path.join(self.folder, '')
+        self.paths = [base + 'car.pmd.txt', base + 'home.pmd.txt']
+        for path, text in zip(self.paths, (CAR, HOME)):
+            with open(path, 'w') as file_:
+                file_.write(text)
+        config = read_config(CONFIG_FILE)
+        config['USER']['portfolio_base_dir'] = base
+        config['USER']['portfolio_files'] = '\n'.join(self.paths)
+        config['USER']['tab_order'] = '\n'.join(self.paths)
+        config_path = base + 'config.ini'
+        with open(config_path, 'w') as config_file:
+            config.write(config_file)
+        self.window = TopLevelWindow()
+        self.status = []
+        self.window.show_status_message = self.status.append
+        self.editor = Editor(self.window, config_path)
+        self.window.setup()
+        self.editor.setup()
+        self.tabs = [self.editor.find_widget(path) for path in self.paths]
+
+    def tearDown(self):
+        self.editor.wait_for_saves()
+        shutil.rmtree(self.folder)
+
+
+if __name__ == '__main__':
+    unittest.main()